@@ -1,7 +1,7 @@
 """API v1 路由模块。"""
 
 from fastapi import APIRouter
-from app.api.v1 import users, llm, behavior, notifications
+from app.api.v1 import users, llm, behavior, notifications, stream, dashboard, system
 
 api_router = APIRouter()
 
@@ -10,6 +10,9 @@ api_router.include_router(users.router, prefix="/users", tags=["用户管理"])
 api_router.include_router(llm.router, prefix="/llm", tags=["LLM 服务"])
 api_router.include_router(behavior.router, prefix="/behavior", tags=["行为记录"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["消息中心"])
+api_router.include_router(stream.router, prefix="/stream", tags=["实时推送"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["仪表盘"])
+api_router.include_router(system.router, prefix="/system", tags=["系统状态"])
 
 
 # 在这里添加更多路由
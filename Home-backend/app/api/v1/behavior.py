@@ -14,12 +14,22 @@ import time
 import logging
 from typing import List, Annotated
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, BackgroundTasks, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
 from sqlalchemy import update
 
-from app.infrastructure.dependencies import MySQLSessionDep, LLMServiceDep, EmbeddingServiceDep, MilvusServiceDep
+from app.core.admission import AdmissionRejectedError
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.http_cache import conditional_response
+from app.core.tracing import begin_span, current_span, current_traceparent, finish_span, start_span
+from app.infrastructure.config import get_settings
+from app.infrastructure.dependencies import MySQLSessionDep, MySQLReadSessionDep, LLMServiceDep, EmbeddingServiceDep, MilvusServiceDep
+from app.infrastructure.metrics import background_task_failures, deferred_work, semantic_descriptions
 from app.models.behavior import Behavior
 from app.schemas.behavior import BehaviorCreate, BehaviorResponse
+from app.services.behavior_service import describe_behavior, fallback_description
+from app.services.semantic_batcher import get_description_batcher
+from app.services.change_tracker import get_user_version, notify_user_change
+from app.utils.pagination import apply_keyset, split_page
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -32,15 +42,22 @@ async def process_semantic_memory(
     details: dict,
     llm_service: LLMServiceDep,
     embedding_service: EmbeddingServiceDep,
-    milvus_service: MilvusServiceDep
+    milvus_service: MilvusServiceDep,
+    traceparent: str | None = None,
+    recorded_at: float | None = None
 ):
     """异步处理语义记忆（后台任务）。
 
     此函数在后台异步执行，将原始行为数据转换为语义记忆：
-    1. 调用 LLM 生成自然语言描述
+    1. 调用 LLM 生成自然语言描述（semantic_pack_size > 1 时与并发的其他行为合并为一次调用）
     2. 将描述转换为向量 Embedding
     3. 存入 Milvus 向量数据库
     4. 更新 MySQL 记录
+    5. 推送语义描述更新事件
+
+    每个步骤记录为 semantic_memory 跨度的子跨度，根跨度的
+    behavior.queue_ms / behavior.end_to_end_ms 属性分别为从记录行为到开始处理、
+    到语义描述写入完成的时间。
 
     Args:
         behavior_id: 行为记录 ID
@@ -50,60 +67,95 @@ async def process_semantic_memory(
         llm_service: LLM 服务（依赖注入）
         embedding_service: Embedding 服务（依赖注入）
         milvus_service: Milvus 服务（依赖注入）
+        traceparent: 触发请求的链路上下文
+        recorded_at: 行为记录写入的时间戳（time.time()）
 
     Note:
         此函数在后台任务中执行，不会阻塞主请求响应。
         如果处理失败，仅记录日志而不影响主流程。
+        LLM / Embedding 调用繁忙未获准入或已熔断时放弃本次处理，semantic_content 保持为空，
+        由定时任务 backfill_semantic_memory_task 稍后补处理；开启 semantic_fallback_template 时
+        LLM 熔断改用模板描述。
     """
     import app.infrastructure.database
 
+    attributes = {"behavior.id": behavior_id, "user.id": user_id}
+    if recorded_at is not None:
+        attributes["behavior.queue_ms"] = round((time.time() - recorded_at) * 1000, 3)
+
+    span, token = begin_span("semantic_memory.process", attributes, parent=traceparent)
     try:
-        # 步骤 1: 使用 LLM 生成语义化描述
-        prompt = (
-            f"根据以下信息，生成一句简洁、地道的中文自然语言描述：\n"
-            f"- 原始操作: {raw_content}\n"
-            f"- 详细参数: {details}\n"
-            f"要求：包含动词、设备名、状态及关键参数(如有)。例如：'陈先生开启了空调，温度设为24°C'。"
-        )
-        system_prompt = "你是一个智能家居管家。请描述用户的最新动作。"
-
-        logger.info(f"开始 LLM 语义化处理: behavior_id={behavior_id}")
-        semantic_content = await llm_service.generate(prompt, system_prompt)
-        semantic_content = semantic_content.strip('"').strip("'").strip()
-        logger.info(f"LLM 语义化完成: behavior_id={behavior_id}, content={semantic_content}")
+        # 步骤 1: 使用 LLM 生成语义化描述（合并模式下与其他行为凑批调用）
+        settings = get_settings()
+        logger.debug(f"开始 LLM 语义化处理: behavior_id={behavior_id}")
+        with start_span("semantic_memory.llm") as llm_span:
+            try:
+                if settings.semantic_pack_size > 1:
+                    semantic_content = await get_description_batcher().describe(raw_content, details)
+                else:
+                    semantic_content = await describe_behavior(llm_service, raw_content, details)
+                    semantic_descriptions.labels("single").inc()
+            except CircuitOpenError:
+                if not settings.semantic_fallback_template:
+                    raise
+                semantic_content = fallback_description(raw_content, details)
+                llm_span.set_attribute("semantic_memory.fallback", "template")
+        logger.debug(f"LLM 语义化完成: behavior_id={behavior_id}, content={semantic_content}")
 
         # 步骤 2: 获取文本的 Embedding 向量
         logger.debug(f"开始生成 Embedding: behavior_id={behavior_id}")
-        vector = await embedding_service.get_embeddings(semantic_content)
+        with start_span("semantic_memory.embedding"):
+            vector = await embedding_service.get_embeddings(semantic_content)
 
         # 步骤 3: 存入 Milvus 向量数据库（用于语义搜索）
         timestamp = int(time.time())
-        await milvus_service.insert_behavior(
-            behavior_id=behavior_id,
-            user_id=user_id,
-            content=semantic_content,
-            vector=vector,
-            timestamp=timestamp
-        )
-        logger.info(f"向量已存入 Milvus: behavior_id={behavior_id}")
+        with start_span("semantic_memory.milvus"):
+            await milvus_service.insert_behavior(
+                behavior_id=behavior_id,
+                user_id=user_id,
+                content=semantic_content,
+                vector=vector,
+                timestamp=timestamp
+            )
+        logger.debug(f"向量已存入 Milvus: behavior_id={behavior_id}")
 
         # 步骤 4: 更新 MySQL 记录（补充语义化描述）
         # 注意：需要重新创建数据库会话，因为原会话已关闭
         if app.infrastructure.database.async_session_maker is None:
             app.infrastructure.database.init_mysql()
 
-        async with app.infrastructure.database.async_session_maker() as session:
-            await session.execute(
-                update(Behavior)
-                .where(Behavior.id == behavior_id)
-                .values(semantic_content=semantic_content)
+        with start_span("semantic_memory.mysql_update"):
+            async with app.infrastructure.database.async_session_maker() as session:
+                await session.execute(
+                    update(Behavior)
+                    .where(Behavior.id == behavior_id)
+                    .values(semantic_content=semantic_content)
+                )
+                await session.commit()
+        logger.info(f"语义记忆处理完成: behavior_id={behavior_id}")
+        if recorded_at is not None:
+            span.set_attribute("behavior.end_to_end_ms", round((time.time() - recorded_at) * 1000, 3))
+
+        # 步骤 5: 推送语义描述更新
+        with start_span("semantic_memory.notify"):
+            await notify_user_change(
+                user_id,
+                "behavior.updated",
+                {"id": behavior_id, "semantic_content": semantic_content}
             )
-            await session.commit()
-            logger.info(f"MySQL 记录已更新: behavior_id={behavior_id}")
 
+    except AdmissionRejectedError as e:
+        # 外部服务繁忙，延后到定时任务补处理
+        span.set_attribute("semantic_memory.deferred", e.reason)
+        deferred_work.labels("process_semantic_memory").inc()
+        logger.warning(f"语义记忆处理延后: behavior_id={behavior_id}, reason={e}")
     except Exception as e:
-        # 后台任务失败不应影响主流程，记录日志便于排查问题
+        # 后台任务失败不应影响主流程，记录日志和失败计数便于排查问题
+        span.record_exception(e)
+        background_task_failures.labels("process_semantic_memory").inc()
         logger.error(f"语义记忆处理失败: behavior_id={behavior_id}, error={str(e)}", exc_info=True)
+    finally:
+        finish_span(span, token)
 
 @router.post(
     "/",
@@ -156,11 +208,17 @@ async def record_behavior(
     await db.commit()
     await db.refresh(new_behavior)
     logger.info(f"行为记录已创建: id={new_behavior.id}, user_id={new_behavior.user_id}")
+    await notify_user_change(
+        new_behavior.user_id,
+        "behavior.created",
+        BehaviorResponse.model_validate(new_behavior).model_dump(mode="json")
+    )
 
     # 步骤 2: 触发后台任务（语义记忆处理）
     # 重要：提取基础类型避免 SQLAlchemy 对象的会话闭包问题
     b_id = int(new_behavior.id)
     u_id = int(new_behavior.user_id)
+    current_span().set_attribute("behavior.id", b_id)
     content = str(new_behavior.raw_content or new_behavior.action_type)
     details_dict = dict(new_behavior.details) if new_behavior.details else {}
 
@@ -172,9 +230,11 @@ async def record_behavior(
         details_dict,
         llm_service,
         embedding_service,
-        milvus_service
+        milvus_service,
+        traceparent=current_traceparent(),
+        recorded_at=time.time()
     )
-    logger.info(f"后台任务已触发: behavior_id={b_id}")
+    logger.debug(f"后台任务已触发: behavior_id={b_id}")
 
     # 步骤 3: 模式识别与关怀推送 —— 深夜回家模式
     # 规则：设备是 door/unlock_door，且时间在晚上20:00之后到次日凌晨04:00之前
@@ -183,7 +243,7 @@ async def record_behavior(
     now_shanghai = datetime.now(shanghai_tz)
     hour = now_shanghai.hour
     
-    logger.info(f"检查深夜回家模式: device_id={behavior_in.device_id}, action_type={behavior_in.action_type}, hour={hour}")
+    logger.debug(f"检查深夜回家模式: device_id={behavior_in.device_id}, action_type={behavior_in.action_type}, hour={hour}")
     
     if (behavior_in.action_type in ["unlock_door", "open"]) and (behavior_in.device_id in ["door", "unlock_door"]):
         if hour >= 20 or hour < 4:
@@ -191,9 +251,9 @@ async def record_behavior(
             send_late_night_care_notification.delay(u_id)
             logger.info(f"深夜回家模式触发成功: 触发关怀任务 for user_id={u_id}")
         else:
-            logger.info(f"深夜回家模式未触发: 当前小时({hour})不在 20:00-04:00 范围内")
+            logger.debug(f"深夜回家模式未触发: 当前小时({hour})不在 20:00-04:00 范围内")
     else:
-        logger.info(f"深夜回家模式未触发: 动作或设备不匹配 (expected: door or unlock_door, got: {behavior_in.device_id}/{behavior_in.action_type})")
+        logger.debug(f"深夜回家模式未触发: 动作或设备不匹配 (expected: door or unlock_door, got: {behavior_in.device_id}/{behavior_in.action_type})")
 
     return new_behavior
 
@@ -202,34 +262,57 @@ async def record_behavior(
     "/",
     response_model=List[BehaviorResponse],
     summary="查询行为记录",
-    description="从数据库查询用户行为记录，支持按用户筛选和限制数量"
+    description="从数据库查询用户行为记录，支持按用户筛选、限制数量和游标翻页"
 )
 async def get_behaviors(
-    db: MySQLSessionDep,
+    db: MySQLReadSessionDep,
+    request: Request,
+    response: Response,
     user_id: Annotated[int | None, Query(description="用户ID，不传则查询所有用户")] = None,
-    limit: Annotated[int, Query(ge=1, le=100, description="返回的最大记录数")] = 10
+    limit: Annotated[int, Query(ge=1, le=100, description="返回的最大记录数")] = 10,
+    cursor: Annotated[str | None, Query(description="上一页响应头 X-Next-Cursor 返回的游标")] = None
 ):
     """从数据库查询行为记录。
 
+    按 (timestamp, id) 倒序做键集分页，下一页游标通过响应头 X-Next-Cursor 返回，
+    没有更多记录时不返回该响应头。
+    指定 user_id 时返回 ETag，客户端携带 If-None-Match 且数据未变化时直接返回 304。
+
     Args:
         user_id: 可选的用户ID筛选条件
         limit: 返回记录的最大数量（1-100）
+        cursor: 可选的分页游标
         db: 数据库会话
+        request: 请求对象（用于读取 If-None-Match）
+        response: 响应对象（用于写入分页和缓存响应头）
 
     Returns:
         List[BehaviorResponse]: 行为记录列表，按时间倒序排列
+
+    Raises:
+        HTTPException: 游标格式非法时返回 400 错误
     """
     from sqlalchemy import select
 
+    if user_id:
+        not_modified = conditional_response(request, response, await get_user_version(user_id))
+        if not_modified:
+            return not_modified
+
     query = select(Behavior)
     if user_id:
         query = query.where(Behavior.user_id == user_id)
 
     # 按时间倒序排列，最新的在前
-    query = query.order_by(Behavior.timestamp.desc()).limit(limit)
+    try:
+        query = apply_keyset(query, Behavior.timestamp, Behavior.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     result = await db.execute(query)
-    behaviors = result.scalars().all()
+    behaviors, next_cursor = split_page(result.scalars().all(), limit, "timestamp")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    logger.info(f"查询行为记录: user_id={user_id}, count={len(behaviors)}")
+    logger.debug(f"查询行为记录: user_id={user_id}, count={len(behaviors)}")
     return behaviors
@@ -0,0 +1,62 @@
+"""仪表盘聚合 API。
+
+H5 仪表盘首屏原本需要分别请求用户信息、最近动态和通知接口，
+此接口一次返回全部数据，把多次往返合并为一次。
+"""
+
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.core.http_cache import conditional_response
+from app.infrastructure.dependencies import resolve_read_session_maker
+from app.schemas.dashboard import DashboardResponse
+from app.services.change_tracker import get_user_version
+from app.services.dashboard_service import DashboardService
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get(
+    "",
+    response_model=DashboardResponse,
+    summary="获取仪表盘数据",
+    description="一次返回用户信息、最近动态、未读数和最新通知"
+)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    user_id: Annotated[int, Query(description="用户ID")],
+    behavior_limit: Annotated[int, Query(ge=1, le=50, description="最近动态条数")] = 5,
+    notification_limit: Annotated[int, Query(ge=1, le=50, description="最新通知条数")] = 5
+):
+    """获取仪表盘聚合数据。
+
+    支持 ETag 条件请求，数据未变化时返回 304 且不访问数据库。
+
+    Args:
+        request: 请求对象
+        response: 响应对象
+        user_id: 用户ID
+        behavior_limit: 最近动态条数
+        notification_limit: 最新通知条数
+
+    Returns:
+        DashboardResponse: 仪表盘数据
+
+    Raises:
+        HTTPException: 用户不存在时返回 404 错误
+    """
+    not_modified = conditional_response(request, response, await get_user_version(user_id))
+    if not_modified:
+        return not_modified
+
+    # 只读聚合查询走只读副本（读己之写窗口内走主库）
+    service = DashboardService(await resolve_read_session_maker(user_id))
+    data = await service.get_dashboard(user_id, behavior_limit, notification_limit)
+    if data is None:
+        raise HTTPException(status_code=404, detail="用户不存在")
+
+    return data
@@ -1,12 +1,35 @@
 """LLM 路由模块。"""
 
+import logging
+import math
+from contextlib import aclosing
 from typing import Annotated
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 
+from app.api.v1.stream import format_sse
+from app.core.admission import AdmissionRejectedError
 from app.infrastructure.dependencies import LLMServiceDep
-from app.schemas.llm import LLMRequest, LLMResponse
+from app.schemas.llm import (
+    LLMBatchItem,
+    LLMBatchRequest,
+    LLMBatchResponse,
+    LLMRequest,
+    LLMResponse,
+    LLMStreamStats,
+)
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _busy_error(e: AdmissionRejectedError) -> HTTPException:
+    """LLM 繁忙或熔断时的 503 响应。"""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
 
 
 @router.post(
@@ -30,7 +53,7 @@ async def generate_text(
         LLM 生成的回复
 
     Raises:
-        HTTPException: LLM 调用失败时
+        HTTPException: LLM 繁忙或熔断时返回 503（带 Retry-After），调用失败时返回 500
     """
     try:
         response = await llm_service.generate(
@@ -42,8 +65,122 @@ async def generate_text(
             response=response,
             model=llm_service.settings.llm_model
         )
+    except AdmissionRejectedError as e:
+        raise _busy_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"LLM 调用失败: {str(e)}"
         )
+
+
+@router.post(
+    "/batch",
+    response_model=LLMBatchResponse,
+    status_code=200,
+    summary="批量生成文本",
+    description="一次提交多个生成请求，按有限并发调用 LLM，结果按请求顺序返回"
+)
+async def generate_batch(
+    request: LLMBatchRequest,
+    llm_service: LLMServiceDep
+):
+    """批量调用 LLM 生成文本。
+
+    单个请求失败不影响整个批次，失败原因记录在对应位置的结果中；
+    因繁忙或熔断失败的结果带有 retry_after，调用方可只重试这些请求。
+
+    Args:
+        request: 批量生成请求
+        llm_service: LLM 服务依赖
+
+    Returns:
+        LLMBatchResponse: 与请求顺序一致的结果
+    """
+    outcomes = await llm_service.generate_batch(
+        [(item.prompt, item.system_prompt) for item in request.requests]
+    )
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, AdmissionRejectedError):
+            results.append(LLMBatchItem(index=index, error=str(outcome), retry_after=outcome.retry_after))
+        elif isinstance(outcome, Exception):
+            results.append(LLMBatchItem(index=index, error=f"LLM 调用失败: {str(outcome)}"))
+        else:
+            results.append(LLMBatchItem(index=index, response=outcome))
+    failed = sum(1 for item in results if item.error is not None)
+    if failed:
+        logger.warning(f"LLM 批量生成部分失败: total={len(results)}, failed={failed}")
+
+    return LLMBatchResponse(
+        model=llm_service.settings.llm_model,
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+@router.post(
+    "/generate/stream",
+    summary="流式生成文本",
+    description="调用 LLM 生成文本，以 Server-Sent Events 逐段返回"
+)
+async def generate_text_stream(
+    request: LLMRequest,
+    llm_service: LLMServiceDep
+):
+    """调用 LLM 流式生成文本。
+
+    等到第一个文本片段生成后才开始响应，未获准入或调用失败时仍能返回对应的状态码。
+    之后依次推送事件：
+    - token: 生成的文本片段（text）
+    - done: 生成统计（LLMStreamStats：首个 token 延迟、token 数、生成速度）
+    - error: 生成中途失败（detail）
+
+    客户端断开时关闭生成器，上游的流式请求随之取消。
+
+    Args:
+        request: LLM 请求数据
+        llm_service: LLM 服务依赖
+
+    Returns:
+        StreamingResponse: text/event-stream 响应
+
+    Raises:
+        HTTPException: LLM 繁忙或熔断时返回 503（带 Retry-After），调用失败时返回 500
+    """
+    stats = LLMStreamStats(model=llm_service.settings.llm_model)
+    tokens = llm_service.stream(request.prompt, request.system_prompt, stats)
+    try:
+        first = await anext(tokens, None)
+    except AdmissionRejectedError as e:
+        raise _busy_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"LLM 调用失败: {str(e)}"
+        )
+
+    async def event_source():
+        async with aclosing(tokens):
+            try:
+                if first is not None:
+                    yield format_sse("token", {"text": first})
+                    async for text in tokens:
+                        yield format_sse("token", {"text": text})
+            except Exception as e:
+                logger.warning(f"LLM 流式生成中断: {e}")
+                yield format_sse("error", {"detail": f"LLM 调用失败: {str(e)}"})
+                return
+            yield format_sse("done", stats.model_dump())
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 关闭 Nginx 代理缓冲，保证文本片段即时到达
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Query, HTTPException
-from sqlalchemy import select, update, desc, func
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from sqlalchemy import select, desc
 from typing import Any
 import logging
 
-from app.infrastructure.dependencies import MySQLSessionDep
+from app.core.http_cache import conditional_response
+from app.infrastructure.dependencies import AdminUserDep, MySQLReadSessionDep, MySQLSessionDep
 from app.models.notification import Notification
-from app.schemas.notification import NotificationDTO, NotificationCategory
+from app.schemas.notification import (
+    NotificationBroadcast,
+    NotificationCategory,
+    NotificationCreate,
+    NotificationDTO,
+    NotificationReadRequest,
+)
+from app.services.change_tracker import get_user_version
+from app.services.notification_service import NotificationService
+from app.utils.pagination import apply_keyset, split_page
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -13,39 +23,81 @@ logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=list[NotificationDTO])
 async def read_notifications(
-    db: MySQLSessionDep,
+    db: MySQLReadSessionDep,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category: NotificationCategory = None,
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor"),
     user_id: int = Query(..., description="User ID")
 ) -> Any:
     """
     Retrieve notifications.
+
+    Keyset pagination on (created_at, id): pass the `X-Next-Cursor` header of the
+    previous page as `cursor`. `skip` is kept for compatibility with offset clients.
+    Answers `If-None-Match` with 304 while the user's data is unchanged.
     """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="cursor and skip cannot be combined")
+
+    not_modified = conditional_response(request, response, await get_user_version(user_id))
+    if not_modified:
+        return not_modified
+
     query = select(Notification).where(Notification.user_id == user_id)
 
     if category:
         query = query.where(Notification.category == category)
 
-    query = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit)
+    if skip:
+        query = query.order_by(desc(Notification.created_at), desc(Notification.id)).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    try:
+        query = apply_keyset(query, Notification.created_at, Notification.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     result = await db.execute(query)
-    notifications = result.scalars().all()
+    notifications, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return notifications
 
 @router.get("/unread-count", response_model=int)
 async def get_unread_count(
-    db: MySQLSessionDep,
+    db: MySQLReadSessionDep,
+    request: Request,
+    response: Response,
     user_id: int = Query(..., description="User ID")
 ) -> Any:
     """
     Get unread notification count.
+
+    Answers `If-None-Match` with 304 while the user's data is unchanged.
     """
-    query = select(func.count()).select_from(Notification).where(
-        Notification.user_id == user_id,
-        Notification.is_read == False
-    )
-    result = await db.execute(query)
-    return result.scalar() or 0
+    not_modified = conditional_response(request, response, await get_user_version(user_id))
+    if not_modified:
+        return not_modified
+
+    return await NotificationService(db).get_unread_count(user_id)
+
+@router.put("/read")
+async def mark_notifications_read(
+    payload: NotificationReadRequest,
+    db: MySQLSessionDep,
+    user_id: int = Query(..., description="User ID")
+) -> Any:
+    """
+    Mark the given notifications as read with a single UPDATE.
+
+    Ids that do not belong to the user or are already read are ignored.
+    """
+    updated = await NotificationService(db).mark_many_as_read(user_id, payload.ids)
+    return {"updated": updated}
 
 @router.put("/{notification_id}/read", response_model=NotificationDTO)
 async def mark_notification_read(
@@ -56,17 +108,9 @@ async def mark_notification_read(
     """
     Mark a notification as read.
     """
-    result = await db.execute(select(Notification).where(
-        Notification.id == notification_id,
-        Notification.user_id == user_id
-    ))
-    notification = result.scalars().first()
+    notification = await NotificationService(db).mark_as_read(notification_id, user_id)
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
-
-    notification.is_read = True
-    await db.commit()
-    await db.refresh(notification)
     return notification
 
 @router.put("/read-all")
@@ -77,11 +121,34 @@ async def mark_all_read(
     """
     Mark all notifications as read.
     """
-    stmt = update(Notification).where(
-        Notification.user_id == user_id,
-        Notification.is_read == False
-    ).values(is_read=True)
-
-    await db.execute(stmt)
-    await db.commit()
-    return {"status": "success"}
+    updated = await NotificationService(db).mark_all_as_read(user_id)
+    return {"status": "success", "updated": updated}
+
+@router.post("/bulk", status_code=201)
+async def create_notifications_bulk(
+    items: list[NotificationCreate],
+    db: MySQLSessionDep,
+    admin: AdminUserDep
+) -> Any:
+    """
+    Create many notifications with multi-row INSERTs (admin only).
+    """
+    created = await NotificationService(db).create_many(items)
+    return {"created": created}
+
+@router.post("/broadcast", status_code=201)
+async def broadcast_notification(
+    payload: NotificationBroadcast,
+    db: MySQLSessionDep,
+    admin: AdminUserDep
+) -> Any:
+    """
+    Send a notification to every active user (admin only).
+
+    Rows are generated server-side with INSERT ... SELECT in user-id chunks.
+    """
+    created = await NotificationService(db).broadcast(
+        payload.category, payload.title, payload.content
+    )
+    logger.info(f"Broadcast by admin {admin.id}: created={created}")
+    return {"created": created}
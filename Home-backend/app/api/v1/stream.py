@@ -0,0 +1,93 @@
+"""实时事件推送 API。
+
+通过 Server-Sent Events 向前端推送新行为、语义描述更新和新通知，
+替代仪表盘和消息页的定时轮询。连接建立后不再查询数据库，
+空闲连接只有周期性的心跳注释行。
+
+事件类型：
+- behavior.created: 新的行为记录（BehaviorResponse）
+- behavior.updated: 语义化描述已生成（id, semantic_content）
+- notification.created: 新通知（NotificationDTO）
+- notification.updated: 重复提醒折叠到已有未读通知（NotificationDTO）
+- notification.read: 通知已读（ids 或 all）
+"""
+
+import asyncio
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.json_codec import dumps_str
+from app.infrastructure.dependencies import EventBusDep, SettingsDep
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """格式化一条 SSE 消息。
+
+    Args:
+        event: 事件类型
+        data: 事件数据
+
+    Returns:
+        符合 text/event-stream 格式的消息文本
+    """
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+
+@router.get(
+    "",
+    summary="订阅实时事件",
+    description="以 Server-Sent Events 推送指定用户的新行为、语义更新和通知"
+)
+async def stream_events(
+    request: Request,
+    event_bus: EventBusDep,
+    settings: SettingsDep,
+    user_id: Annotated[int, Query(description="用户ID")],
+):
+    """建立 SSE 连接并持续推送用户事件。
+
+    Args:
+        request: 请求对象（用于检测客户端断开）
+        event_bus: 事件总线
+        settings: 应用配置
+        user_id: 用户ID
+
+    Returns:
+        StreamingResponse: text/event-stream 响应
+    """
+    queue = event_bus.subscribe(user_id)
+    heartbeat = settings.sse_heartbeat_seconds
+    logger.info(f"SSE 连接建立: user_id={user_id}, connections={event_bus.subscriber_count}")
+
+    async def event_source():
+        try:
+            # 客户端断线后 3 秒重连
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(message["event"], message["data"])
+        finally:
+            event_bus.unsubscribe(user_id, queue)
+            logger.info(f"SSE 连接关闭: user_id={user_id}")
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 关闭 Nginx 代理缓冲，保证事件即时到达
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,37 @@
+"""系统运行状态 API。
+
+提供缓存命中率、数据库连接池等运行指标，便于观察和调优。
+"""
+
+from fastapi import APIRouter
+
+from app.infrastructure.pool_metrics import pool_stats
+from app.services.user_cache import get_user_cache
+
+router = APIRouter()
+
+
+@router.get("/cache", summary="缓存统计", description="返回当前进程用户资料缓存的命中率与计数")
+async def get_cache_stats():
+    """获取当前进程的缓存统计。
+
+    多 worker 部署时每个进程分别统计。
+
+    Returns:
+        dict: 用户资料缓存统计
+    """
+    return {"user_cache": get_user_cache().stats()}
+
+
+@router.get("/pool", summary="连接池统计", description="返回当前进程各数据库连接池的配置、占用与等待时间")
+async def get_pool_stats():
+    """获取当前进程的数据库连接池统计。
+
+    包含借出/空闲/溢出连接数、借出等待时间与持有时长分位数、
+    连接失效次数、连接存活时长和 pre-ping 耗时。
+    多 worker 部署时每个进程分别统计。
+
+    Returns:
+        dict: 以连接池名称（primary、replica0 ...）为键的统计
+    """
+    return {"pools": pool_stats()}
@@ -6,15 +6,42 @@
 
 from typing import Annotated
 from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.infrastructure.dependencies import MySQLSessionDep
+from app.core.security import PasswordHasherBusyError, hash_password_async
+from app.infrastructure.dependencies import MySQLReadSessionDep, MySQLSessionDep
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
 from app.models.user import User
+from app.services.change_tracker import bump_user_version
+from app.services.user_cache import get_user_cache, get_user_profile
+from app.services.user_total import adjust_user_total, estimate_users, get_user_total
+from app.utils.pagination import apply_keyset, split_page
 
 router = APIRouter()
 
 
+async def _hash_password(password: str) -> str:
+    """在进程池中加密密码，进程池繁忙时返回 503。
+
+    Args:
+        password: 明文密码
+
+    Returns:
+        哈希后的密码
+
+    Raises:
+        HTTPException: 密码哈希进程池排队已满时返回 503 错误
+    """
+    try:
+        return await hash_password_async(password)
+    except PasswordHasherBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"}
+        )
+
+
 @router.post("/", response_model=UserResponse, status_code=201, summary="创建用户")
 async def create_user(
     user_data: UserCreate,
@@ -36,7 +63,7 @@ async def create_user(
         创建的用户信息（不包含密码）
 
     Raises:
-        HTTPException: 用户名或邮箱已存在时返回 400 错误
+        HTTPException: 用户名或邮箱已存在时返回 400 错误，密码哈希繁忙时返回 503 错误
     """
     # 检查用户名是否已存在
     result = await db.execute(
@@ -59,9 +86,8 @@ async def create_user(
         )
 
     # 使用 bcrypt 加密密码
-    # bcrypt 会自动加盐并生成哈希值，安全性很高
-    from app.core.security import hash_password
-    hashed_password = hash_password(user_data.password)
+    # bcrypt 会自动加盐并生成哈希值，安全性很高；计算在进程池中完成，不阻塞事件循环
+    hashed_password = await _hash_password(user_data.password)
 
     # 创建用户记录
     new_user = User(
@@ -74,52 +100,86 @@ async def create_user(
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    # 清除该 ID 可能残留的"用户不存在"缓存
+    await get_user_cache().invalidate(new_user.id)
+    await adjust_user_total(1)
 
     return new_user
 
 
 @router.get("/", response_model=UserListResponse, summary="获取用户列表")
 async def list_users(
-    db: MySQLSessionDep,
+    db: MySQLReadSessionDep,
     page: Annotated[int, Query(ge=1, description="页码")] = 1,
     page_size: Annotated[int, Query(ge=1, le=100, description="每页数量")] = 20,
+    cursor: Annotated[str | None, Query(description="上一页返回的 next_cursor")] = None,
+    estimate: Annotated[bool, Query(description="总数使用表统计信息估算值（不扫描表）")] = False,
 ):
     """获取用户列表（分页）。
 
+    支持两种分页方式：
+    - 游标分页：传入上一页的 next_cursor，按 (created_at, id) 键集定位，深度翻页成本不变
+    - 页码分页：page > 1 且不传 cursor 时使用 OFFSET，保留以兼容旧客户端
+
+    总数读取缓存计数（创建/删除时增量维护，定期校准），不再每次 COUNT(*)；
+    estimate=true 时读取 InnoDB 表统计信息的估算值。
+
     Args:
         db: 数据库会话
         page: 页码（从1开始）
         page_size: 每页数量
+        cursor: 可选的分页游标
+        estimate: 是否使用估算总数
 
     Returns:
         用户列表响应
+
+    Raises:
+        HTTPException: 同时传入 cursor 与 page，或游标非法时返回 400 错误
     """
-    # 计算总数
-    count_result = await db.execute(select(func.count()).select_from(User))
-    total = count_result.scalar()
+    if cursor and page > 1:
+        raise HTTPException(status_code=400, detail="cursor 与 page 不能同时使用")
 
-    # 分页查询
-    offset = (page - 1) * page_size
-    result = await db.execute(
-        select(User)
-        .offset(offset)
-        .limit(page_size)
-        .order_by(User.created_at.desc())
-    )
-    users = result.scalars().all()
+    # 计算总数
+    total = await estimate_users(db) if estimate else None
+    total_estimated = total is not None
+    if total is None:
+        total = await get_user_total(db)
+
+    next_cursor = None
+    if page > 1:
+        # 页码分页（兼容模式）
+        offset = (page - 1) * page_size
+        result = await db.execute(
+            select(User)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .offset(offset)
+            .limit(page_size)
+        )
+        users = result.scalars().all()
+    else:
+        # 游标分页
+        try:
+            query = apply_keyset(select(User), User.created_at, User.id, cursor, page_size)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result = await db.execute(query)
+        users, next_cursor = split_page(result.scalars().all(), page_size, "created_at")
 
     return UserListResponse(
         total=total,
+        total_estimated=total_estimated,
         items=users,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{user_id}", response_model=UserResponse, summary="获取用户详情")
 async def get_user(
     user_id: int,
-    db: MySQLSessionDep
+    db: MySQLReadSessionDep
 ):
     """根据ID获取用户详情。
 
@@ -133,8 +193,8 @@ async def get_user(
     Raises:
         HTTPException: 用户不存在时
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
+    # 仪表盘每次加载都会请求，走用户资料缓存
+    user = await get_user_profile(db, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
@@ -162,7 +222,7 @@ async def update_user(
         更新后的用户信息
 
     Raises:
-        HTTPException: 用户不存在时返回 404 错误
+        HTTPException: 用户不存在时返回 404 错误，密码哈希繁忙时返回 503 错误
     """
     # 查询用户
     result = await db.execute(select(User).where(User.id == user_id))
@@ -179,14 +239,17 @@ async def update_user(
     for field, value in update_data.items():
         if field == "password" and value:
             # 密码需要加密后存储到 hashed_password 字段
-            from app.core.security import hash_password
-            hashed_password = hash_password(value)
+            hashed_password = await _hash_password(value)
             setattr(user, "hashed_password", hashed_password)
         else:
             setattr(user, field, value)
 
     await db.commit()
     await db.refresh(user)
+    # 用户信息是仪表盘 ETag 的一部分；先开启读己之写窗口，再让缓存失效，
+    # 避免失效后的回源查询读到尚未同步的只读副本
+    await bump_user_version(user_id)
+    await get_user_cache().invalidate(user_id)
 
     return user
 
@@ -213,3 +276,6 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    await bump_user_version(user_id)
+    await get_user_cache().invalidate(user_id)
+    await adjust_user_total(-1)
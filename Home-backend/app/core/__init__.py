@@ -1,14 +1,32 @@
 """核心功能模块。
 
 提供安全、异步处理等核心功能。
+包级导出按需导入，导入 app.core.tracing 等子模块不会加载 passlib。
 """
 
-from app.core.security import pwd_context, verify_password, hash_password
-from app.core.async_helpers import run_async
+import importlib
 
-__all__ = [
-    "pwd_context",
-    "verify_password",
-    "hash_password",
-    "run_async",
-]
+_EXPORTS = {
+    "pwd_context": "app.core.security",
+    "verify_password": "app.core.security",
+    "hash_password": "app.core.security",
+    "verify_password_async": "app.core.security",
+    "hash_password_async": "app.core.security",
+    "PasswordHasherBusyError": "app.core.security",
+    "run_async": "app.core.async_helpers",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """首次访问导出名称时再导入对应模块（PEP 562）。"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(module), name)
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,285 @@
+"""外部调用准入控制模块。
+
+为 LLM、Embedding 等按量计费且有速率限制的外部服务提供自适应并发限制：
+- 同时进行的调用数不超过当前并发上限，超出的调用按先后顺序排队等待
+- 等待队列有长度上限和等待超时，超出时立即拒绝（抛出 AdmissionRejectedError），
+  由调用方决定丢弃或延后处理，不再向服务商堆积请求
+- 并发上限按 AIMD 调整：调用成功且耗时未超过目标时缓慢增加（每轮 +1），
+  收到 429 限流、超时或耗时超过目标时减半（同一冷却期内只减一次）
+- 流式生成等耗时取决于输出长度的调用不以总耗时作为延迟信号，
+  由调用方在收到首个 token 时标记延迟（slot(measure_latency=False)）
+
+限制器为进程内单例，多 worker 部署时服务商看到的总并发约为 进程数 × 并发上限。
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from app.infrastructure.config import get_settings
+from app.infrastructure.metrics import (
+    admission_concurrency,
+    admission_limit_decreases,
+    admission_rejected,
+    admission_wait,
+)
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+RATE_LIMITED = "rate_limited"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+class AdmissionRejectedError(Exception):
+    """调用未获准入（等待队列已满或等待超时）。"""
+
+    def __init__(self, name: str, reason: str, retry_after: float):
+        """初始化异常。
+
+        Args:
+            name: 限制器名称
+            reason: 拒绝原因（queue_full、timeout）
+            retry_after: 建议的重试等待时间（秒）
+        """
+        super().__init__(f"{name} 调用繁忙（{reason}），请稍后重试")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def classify_exception(exc: BaseException) -> str:
+    """根据外部调用抛出的异常判断是否为拥塞信号。
+
+    OpenAI SDK 和 httpx 的异常都带有 status_code 或 response.status_code。
+
+    Args:
+        exc: 调用抛出的异常
+
+    Returns:
+        rate_limited、timeout 或 error
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return RATE_LIMITED
+    if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+        return TIMEOUT
+    return ERROR
+
+
+class SlotTimer:
+    """一个并发名额内调用的计时，决定归还名额时使用的延迟信号。"""
+
+    __slots__ = ("start", "latency")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.latency: float | None = None
+
+    def mark(self) -> None:
+        """以当前时刻作为调用延迟（如流式生成收到首个 token 时），只有第一次标记生效。"""
+        if self.latency is None:
+            self.latency = time.perf_counter() - self.start
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应并发限制器。"""
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int = 1,
+        max_queue: int = 100,
+        queue_timeout: float = 30.0,
+        latency_target: float = 10.0,
+        backoff: float = 0.5,
+        decrease_interval: float = 1.0,
+    ):
+        """初始化限制器。
+
+        Args:
+            name: 名称（指标标签）
+            max_limit: 并发上限的最大值（初始值）
+            min_limit: 并发上限的最小值
+            max_queue: 等待队列长度上限
+            queue_timeout: 排队等待的最长时间（秒）
+            latency_target: 目标调用耗时（秒），超过时视为服务商过载
+            backoff: 拥塞时并发上限的缩减比例
+            decrease_interval: 两次缩减之间的最短间隔（秒），避免一批并发失败把上限连续减到底
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = -decrease_interval
+
+    @property
+    def capacity(self) -> int:
+        """当前允许的并发数。"""
+        return max(self.min_limit, int(self.limit))
+
+    @property
+    def queued(self) -> int:
+        """正在排队的调用数。"""
+        return sum(1 for f in self._waiters if not f.done())
+
+    def _prune(self) -> None:
+        """移除已结束的等待者，以及属于已关闭事件循环（Celery 每个任务一个循环）的等待者。"""
+        if any(f.done() or f.get_loop().is_closed() for f in self._waiters):
+            self._waiters = deque(f for f in self._waiters if not (f.done() or f.get_loop().is_closed()))
+
+    async def acquire(self) -> None:
+        """获取一个并发名额，需要排队时等待。
+
+        Raises:
+            AdmissionRejectedError: 等待队列已满或等待超时
+        """
+        self._prune()
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return
+        if self.queued >= self.max_queue:
+            self._reject("queue_full")
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except asyncio.CancelledError:
+            # 名额已分配但调用方被取消，交给下一个等待者
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        admission_wait.labels(self.name).observe(time.perf_counter() - start)
+
+    def release(self, outcome: str, latency: float | None) -> None:
+        """归还名额并根据调用结果调整并发上限。
+
+        Args:
+            outcome: success、rate_limited、timeout 或 error
+            latency: 调用耗时（秒），None 表示没有延迟信号（不因耗时下调上限）
+        """
+        if outcome in (RATE_LIMITED, TIMEOUT):
+            self._decrease(outcome)
+        elif outcome == SUCCESS:
+            if latency is not None and latency > self.latency_target:
+                self._decrease("latency")
+            elif self.limit < self.max_limit:
+                # 加性增加：约每完成 limit 次调用（一轮）上限 +1
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self, measure_latency: bool = True):
+        """在一个并发名额内执行外部调用。
+
+        Args:
+            measure_latency: 是否以整个调用的耗时作为延迟信号。为 False 时只使用
+                调用方通过 SlotTimer.mark() 标记的延迟，未标记则不按耗时调整上限
+
+        Yields:
+            SlotTimer: 本次调用的计时
+
+        Raises:
+            AdmissionRejectedError: 未获准入
+
+        Example:
+            async with get_limiter("llm").slot():
+                response = await client.ainvoke(messages)
+        """
+        await self.acquire()
+        timer = SlotTimer()
+        try:
+            yield timer
+        except BaseException as e:
+            if measure_latency:
+                timer.mark()
+            self.release(classify_exception(e), timer.latency)
+            raise
+        if measure_latency:
+            timer.mark()
+        self.release(SUCCESS, timer.latency)
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_interval:
+            return
+        self._last_decrease = now
+        previous = self.capacity
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        admission_limit_decreases.labels(self.name, reason).inc()
+        logger.warning(f"{self.name} 并发上限下调: {previous} -> {self.capacity}, reason={reason}")
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if waiter.done() or waiter.get_loop().is_closed():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _reject(self, reason: str):
+        admission_rejected.labels(self.name, reason).inc()
+        raise AdmissionRejectedError(self.name, reason, retry_after=self.latency_target)
+
+
+# 名称 -> (并发上限配置项, 目标耗时配置项)
+_LIMITER_SETTINGS = {
+    "llm": ("llm_max_concurrency", "llm_latency_target"),
+    "embedding": ("embedding_max_concurrency", "embedding_latency_target"),
+}
+
+
+@lru_cache()
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """获取外部服务的限制器单例。
+
+    Args:
+        name: llm 或 embedding
+
+    Returns:
+        AdaptiveLimiter: 当前进程的限制器
+    """
+    settings = get_settings()
+    max_field, latency_field = _LIMITER_SETTINGS[name]
+    return AdaptiveLimiter(
+        name,
+        max_limit=getattr(settings, max_field),
+        max_queue=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout,
+        latency_target=getattr(settings, latency_field),
+    )
+
+
+def _collect_concurrency():
+    for name in _LIMITER_SETTINGS:
+        limiter = get_limiter(name)
+        yield (name, "limit"), limiter.capacity
+        yield (name, "in_flight"), limiter.in_flight
+        yield (name, "queued"), limiter.queued
+
+
+admission_concurrency.set_function(_collect_concurrency)
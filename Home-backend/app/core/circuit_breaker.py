@@ -0,0 +1,202 @@
+"""外部服务熔断器模块。
+
+服务商故障时每次调用都要等到超时（LLM 60 秒、Embedding 30 秒）才失败，
+后台任务会在等待中堆积。熔断器在连续失败达到阈值后打开，打开期间的调用立即失败
+（抛出 CircuitOpenError），调用方按繁忙处理：延后到定时任务补处理或使用降级结果。
+打开一段时间后进入半开状态，放行少量探测调用：探测成功则关闭，失败则重新打开。
+
+只有服务端故障（连接失败、超时、5xx）计为失败；4xx 说明服务商可用，
+429 限流由准入控制的并发上限处理，不触发熔断；调用方自身的错误
+（解析响应时的 ValueError / KeyError、数据校验失败等）也不计入。
+
+熔断器为进程内单例，每个进程独立判断。
+"""
+
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from app.core.admission import AdmissionRejectedError
+from app.infrastructure.config import get_settings
+from app.infrastructure.metrics import circuit_state, circuit_transitions
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 指标中的状态取值
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(AdmissionRejectedError):
+    """熔断器打开，调用未执行。"""
+
+    def __init__(self, name: str, retry_after: float):
+        """初始化异常。
+
+        Args:
+            name: 熔断器名称
+            retry_after: 距离下次探测的时间（秒）
+        """
+        super().__init__(name, "circuit_open", retry_after)
+
+
+def _transport_errors() -> tuple[type[BaseException], ...]:
+    """连接失败和超时的异常类型。
+
+    只取已导入的 SDK 的异常类：异常来自某个 SDK 时该 SDK 必然已经导入，
+    不必为了判断异常而加载 httpx / openai。
+    """
+    types: list[type[BaseException]] = [TimeoutError, ConnectionError]
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        types.append(httpx.TransportError)
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        types.extend((openai.APIConnectionError, openai.APITimeoutError))
+    return tuple(types)
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """判断异常是否说明服务商不可用。
+
+    Args:
+        exc: 调用抛出的异常
+
+    Returns:
+        连接失败、超时（httpx.TransportError、openai.APIConnectionError / APITimeoutError、
+        TimeoutError、ConnectionError）或 5xx 时返回 True，其他异常返回 False
+    """
+    if isinstance(exc, AdmissionRejectedError) or not isinstance(exc, Exception):
+        return False
+    if isinstance(exc, _transport_errors()):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+class CircuitBreaker:
+    """三态熔断器（关闭、打开、半开）。"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        """初始化熔断器。
+
+        Args:
+            name: 名称（指标标签）
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多久（秒）进入半开状态
+            half_open_max_calls: 半开状态同时放行的探测调用数
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态，打开超过 recovery_timeout 后视为半开。"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def before_call(self) -> None:
+        """调用前检查是否放行。
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态的探测名额已用完
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return
+        retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after=retry_after or self.recovery_timeout)
+
+    def record_success(self) -> None:
+        """记录一次成功调用。"""
+        self.failures = 0
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """记录一次服务商故障。"""
+        self.failures += 1
+        if self._state == HALF_OPEN or (self._state == CLOSED and self.failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    @contextmanager
+    def call(self):
+        """在熔断器保护下执行外部调用。
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+
+        Example:
+            with get_breaker("llm").call():
+                response = await client.ainvoke(messages)
+        """
+        self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            if is_provider_failure(e):
+                self.record_failure()
+            elif self._state == HALF_OPEN:
+                # 探测调用因其他原因结束（如被取消、4xx），释放探测名额
+                self._probes = max(0, self._probes - 1)
+            raise
+        self.record_success()
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        self._probes = 0
+        circuit_transitions.labels(self.name, state).inc()
+        if state == OPEN:
+            logger.warning(f"{self.name} 熔断器打开: 连续失败 {self.failures} 次，{self.recovery_timeout} 秒后探测")
+        else:
+            logger.info(f"{self.name} 熔断器状态变化: {previous} -> {state}")
+
+
+@lru_cache()
+def get_breaker(name: str) -> CircuitBreaker:
+    """获取外部服务的熔断器单例。
+
+    Args:
+        name: llm 或 embedding
+
+    Returns:
+        CircuitBreaker: 当前进程的熔断器
+    """
+    settings = get_settings()
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.circuit_failure_threshold,
+        recovery_timeout=settings.circuit_recovery_timeout,
+    )
+
+
+def _collect_state():
+    for name in ("llm", "embedding"):
+        yield (name,), _STATE_VALUES[get_breaker(name).state]
+
+
+circuit_state.set_function(_collect_state)
@@ -0,0 +1,65 @@
+"""HTTP 条件请求模块。
+
+根据数据版本号生成 ETag，并处理 If-None-Match 条件请求。
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+
+def build_etag(request: Request, version: str) -> str:
+    """根据请求 URL 和数据版本号生成弱 ETag。
+
+    同一份数据在不同查询参数下（分页、筛选）内容不同，因此 URL 也参与计算。
+
+    Args:
+        request: 请求对象
+        version: 数据版本号
+
+    Returns:
+        ETag 字符串（形如 W/"..."）
+    """
+    raw = f"{version}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """判断请求携带的 If-None-Match 是否与 ETag 匹配。
+
+    Args:
+        request: 请求对象
+        etag: 当前 ETag
+
+    Returns:
+        匹配时返回 True
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def conditional_response(request: Request, response: Response, version: str) -> Response | None:
+    """处理条件 GET 请求。
+
+    匹配时返回 304 响应；否则把 ETag 写入正常响应并返回 None，由调用方继续查询数据。
+
+    Args:
+        request: 请求对象
+        response: FastAPI 注入的响应对象
+        version: 数据版本号
+
+    Returns:
+        304 响应或 None
+    """
+    etag = build_etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,67 @@
+"""JSON 编解码模块。
+
+安装了 orjson 时使用 orjson，否则退回标准库 json，两者输出相同的紧凑 UTF-8 JSON。
+用于：
+- FastAPI 响应（旧版本 FastAPI 的默认响应类，见 app.core.json_response）
+- SQLAlchemy 引擎的 json_serializer / json_deserializer（JSON 列读写）
+- Celery 消息序列化（fastjson 序列化器）
+- 事件总线、SSE 和缓存中的 JSON 负载
+
+本模块不导入 FastAPI（Celery beat 也会导入），响应类见 app.core.json_response。
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+
+# 当前使用的实现名称，便于在日志和基准测试中确认
+BACKEND = "orjson" if orjson is not None else "json"
+
+# Celery 序列化器名称与内容类型
+CELERY_SERIALIZER = "fastjson"
+CELERY_CONTENT_TYPE = "application/x-fastjson"
+
+if orjson is not None:
+    # OPT_NON_STR_KEYS: 与标准库一致，允许 int 等非字符串键
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """编码为 JSON 字节。"""
+        return orjson.dumps(obj, option=_OPTIONS)
+
+    def dumps_str(obj: Any) -> str:
+        """编码为 JSON 字符串。"""
+        return orjson.dumps(obj, option=_OPTIONS).decode()
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> bytes:
+        """编码为 JSON 字节。"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def dumps_str(obj: Any) -> str:
+        """编码为 JSON 字符串。"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    loads = json.loads
+
+
+def register_celery_serializer() -> None:
+    """向 kombu 注册 fastjson 序列化器（可重复调用）。
+
+    与 Celery 自带的 json 序列化器输出相同格式的 JSON，只是编解码更快；
+    任务参数应为 JSON 基本类型（本项目的任务只传 ID）。
+    """
+    from kombu.serialization import register
+
+    register(
+        CELERY_SERIALIZER,
+        dumps_str,
+        loads,
+        content_type=CELERY_CONTENT_TYPE,
+        content_encoding="utf-8",
+    )
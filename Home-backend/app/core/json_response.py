@@ -0,0 +1,40 @@
+"""JSON 响应类。
+
+较早版本的 FastAPI 把 response_model 的结果先转换为 dict，再由响应类用标准库 json 编码，
+此时以 FastJSONResponse 作为默认响应类可以省掉大部分编码时间。
+较新的版本在路由未显式指定响应类时直接用 Pydantic（Rust）把 response_model 序列化为 JSON 字节，
+比 dict + orjson 更快，显式指定任何响应类都会关闭这条路径，因此保留 FastAPI 的默认值。
+"""
+
+import inspect
+from typing import Any
+
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+
+from app.core.json_codec import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 json_codec 编码的 JSON 响应。"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fastapi_serializes_models() -> bool:
+    """当前 FastAPI 是否直接用 Pydantic 把 response_model 序列化为 JSON 字节。"""
+    from fastapi.routing import serialize_response
+
+    return "dump_json" in inspect.signature(serialize_response).parameters
+
+
+def default_response_class():
+    """选择应用的默认响应类。
+
+    Returns:
+        支持 Pydantic 直接序列化的 FastAPI 返回其默认值（不改变行为），否则返回 FastJSONResponse
+    """
+    if fastapi_serializes_models():
+        return Default(JSONResponse)
+    return FastJSONResponse
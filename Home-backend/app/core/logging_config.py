@@ -0,0 +1,198 @@
+"""日志配置模块。
+
+日志记录不在调用方线程（事件循环）中写出：
+- 根 logger 只挂一个 QueueHandler，调用 logger.info(...) 时把日志记录放入内存队列后立即返回
+- 后台线程中的 QueueListener 从队列取出记录，再进行格式化（文本或 JSON）并写入 stderr
+- 同一代码位置的 INFO 及以下日志按时间窗口采样，超过配额的记录在入队前丢弃，
+  窗口结束后的下一条记录带上被丢弃的条数（WARNING 及以上不采样）
+
+uvicorn 的日志 logger 也改为经过同一队列输出。
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.tracing import current_context
+from app.infrastructure.config import get_settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# uvicorn 默认给这些 logger 配置自己的同步 handler 且不向上传播
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# 日志记录的标准属性，其余属性（logger.info(..., extra={...}) 传入的）输出到 JSON
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "trace_id", "span_id", "sampled_dropped",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """单行 JSON 格式化器。
+
+    输出字段：time、level、logger、message、pid，以及链路 trace_id/span_id、
+    采样丢弃条数和 extra 传入的字段；有异常时附带 exc_info 文本。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        for key in ("trace_id", "span_id", "sampled_dropped"):
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """按代码位置采样重复日志。
+
+    每个代码位置（logger 名称 + 文件 + 行号）在每个时间窗口内最多放行 burst 条
+    INFO 及以下的日志，超出的丢弃；下一个窗口放行的第一条日志带上
+    sampled_dropped 属性，记录上个窗口丢弃的条数。
+    """
+
+    def __init__(self, burst: int, window: float):
+        """初始化采样过滤器。
+
+        Args:
+            burst: 每个代码位置每个窗口放行的条数，0 表示不采样
+            window: 时间窗口（秒）
+        """
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # 代码位置 -> [窗口开始时间, 窗口内条数, 上个窗口丢弃条数]
+        self._sites: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno > logging.INFO:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self._sites.get(key)
+        if site is None:
+            self._sites[key] = [now, 1, 0]
+            return True
+        if now - site[0] >= self.window:
+            dropped = max(0, site[1] - self.burst)
+            site[0], site[1] = now, 1
+            if dropped:
+                record.sampled_dropped = dropped
+            return True
+        site[1] += 1
+        return site[1] <= self.burst
+
+
+class LazyQueueHandler(QueueHandler):
+    """不在调用方线程中格式化的 QueueHandler。
+
+    标准库的 QueueHandler.prepare 会在入队前格式化消息（为了跨进程传递），
+    这里的队列只在本进程内使用，直接传递原始记录，由监听线程格式化；
+    入队前只记录当前链路上下文（contextvar 在监听线程中不可见）。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        context = current_context()
+        if context is not None:
+            record.trace_id = context.trace_id
+            record.span_id = context.span_id
+        return record
+
+
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+
+
+def _build_handler(settings) -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def setup_logging() -> None:
+    """配置进程日志（可重复调用，重复调用时替换之前的配置）。
+
+    在 API 进程启动和 Celery worker 启动时调用。
+    """
+    global _listener
+
+    settings = get_settings()
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_burst, settings.log_sample_window))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(settings.log_level.upper())
+
+        for name in _UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(log_queue, _build_handler(settings), respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """停止监听线程，写出队列中剩余的日志。
+
+    根 logger 上的队列 handler 换成监听线程原来使用的输出 handler，
+    之后（如应用关闭后、atexit 期间）的日志在调用方线程中直接写出，不会丢失。
+    """
+    global _listener
+
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, LazyQueueHandler):
+                root.removeHandler(handler)
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """fork 出的子进程（gunicorn、Celery prefork）中没有监听线程，重新配置。"""
+    global _listener, _lock
+
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        setup_logging()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
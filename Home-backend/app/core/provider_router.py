@@ -0,0 +1,265 @@
+"""多服务商路由模块。
+
+同一种外部服务（LLM、Embedding）可以配置多个服务商，路由器为每个服务商维护
+延迟和错误率的指数滑动平均（EWMA），按权重 (1 - 错误率)² / 延迟 随机选择主服务商：
+快且稳定的服务商承担大部分请求，故障的服务商权重接近 0 但仍有少量探测流量，恢复后自动回升。
+
+- 故障转移：主服务商出现服务端故障（连接失败、超时、5xx）时改用下一个服务商重试一次
+- 对冲（可选）：主服务商超过其 p95 延迟仍未返回时，向下一个服务商发送相同请求，
+  采用先返回的结果并取消另一个，用少量重复请求换取更低的尾延迟。
+  被取消的调用按已等待的时间记录延迟样本（真实延迟的下界），否则慢调用总被取消、
+  只有快调用留下样本，p95 会持续偏低。
+  对冲请求与主请求共用调用方的一个准入名额，额外负载不受并发上限约束，
+  因此用令牌桶限制对冲比例：每次调用补充 hedge_budget 个令牌，每次对冲消耗 1 个，
+  令牌不足时不对冲（服务商整体变慢时不会把请求量翻倍）
+
+路由器为进程内对象，统计只反映当前进程的调用；多进程部署时 provider_routing 指标
+带 pid 标签按进程输出（错误率、延迟是比例和平均值，不能跨进程相加）。
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from app.core.circuit_breaker import is_provider_failure
+from app.infrastructure.metrics import (
+    provider_failovers,
+    provider_hedges,
+    provider_hedges_throttled,
+    provider_requests,
+    provider_routing,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ProviderStats:
+    """单个服务商的延迟与错误率估计。"""
+
+    def __init__(self, alpha: float, window: int = 200):
+        """初始化统计。
+
+        Args:
+            alpha: EWMA 平滑系数，越大越偏重最近的调用
+            window: 计算 p95 时保留的最近延迟样本数
+        """
+        self.alpha = alpha
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float | None, ok: bool) -> None:
+        """记录一次调用结果。
+
+        Args:
+            latency: 成功调用的耗时（秒），None 表示只更新错误率
+            ok: 是否成功
+        """
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok and latency is not None:
+            self.record_latency(latency)
+
+    def record_latency(self, latency: float) -> None:
+        """只记录延迟样本，不影响错误率（如被取消的调用已等待的时间）。
+
+        Args:
+            latency: 耗时（秒）
+        """
+        self.samples.append(latency)
+        self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+
+    def p95(self) -> float | None:
+        """最近调用的 p95 延迟，没有样本时为 None。"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class ProviderRouter(Generic[T]):
+    """按延迟和错误率加权的多服务商路由器。"""
+
+    def __init__(
+        self,
+        name: str,
+        providers: dict[str, T],
+        alpha: float = 0.2,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.1,
+        hedge_min_samples: int = 20,
+        hedge_budget: float = 0.1,
+        hedge_burst: float = 10,
+    ):
+        """初始化路由器。
+
+        Args:
+            name: 服务名称（指标标签），如 llm、embedding
+            providers: 服务商名称 -> 客户端，按配置顺序
+            alpha: 延迟和错误率 EWMA 的平滑系数
+            hedge: 是否开启对冲请求
+            hedge_min_delay: 发送对冲请求前的最短等待时间（秒）
+            hedge_min_samples: 主服务商至少有多少个延迟样本后才按其 p95 对冲
+            hedge_budget: 对冲请求最多占调用次数的比例（每次调用补充的令牌数）
+            hedge_burst: 令牌桶容量，即允许连续对冲的次数
+        """
+        if not providers:
+            raise ValueError(f"{name} 至少需要配置一个服务商")
+        self.name = name
+        self.providers = providers
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_budget = hedge_budget
+        self.hedge_burst = hedge_burst
+        self.hedge_tokens = float(hedge_burst)
+        self.stats = {provider: ProviderStats(alpha) for provider in providers}
+        _routers[name] = self
+
+    def weight(self, provider: str) -> float:
+        """服务商的路由权重。
+
+        尚无成功调用的服务商按已知最低延迟估计，保证新加入或刚恢复的服务商能获得流量。
+        """
+        stats = self.stats[provider]
+        latency = stats.latency
+        if latency is None:
+            known = [s.latency for s in self.stats.values() if s.latency is not None]
+            latency = min(known) if known else 1.0
+        return max(1.0 - stats.error_rate, 0.01) ** 2 / max(latency, 1e-3)
+
+    def order(self) -> list[str]:
+        """本次调用尝试服务商的顺序：按权重随机选出主服务商，其余按权重从高到低。"""
+        names = list(self.providers)
+        if len(names) == 1:
+            return names
+        weights = {provider: self.weight(provider) for provider in names}
+        primary = random.choices(names, weights=[weights[p] for p in names])[0]
+        rest = sorted((p for p in names if p != primary), key=weights.__getitem__, reverse=True)
+        return [primary, *rest]
+
+    def hedge_delay(self, provider: str) -> float | None:
+        """向下一个服务商发送对冲请求前等待的时间，None 表示不对冲。"""
+        if not self.hedge or len(self.providers) < 2:
+            return None
+        stats = self.stats[provider]
+        if len(stats.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, stats.p95())
+
+    def _take_hedge_token(self) -> bool:
+        """从对冲预算中取出一个令牌，预算用尽时返回 False。"""
+        if self.hedge_tokens < 1:
+            provider_hedges_throttled.labels(self.name).inc()
+            return False
+        self.hedge_tokens -= 1
+        return True
+
+    def record(self, provider: str, latency: float | None, ok: bool) -> None:
+        """记录在路由器外完成的调用结果（如流式生成）。"""
+        self.stats[provider].record(latency, ok)
+        provider_requests.labels(self.name, provider, "success" if ok else "error").inc()
+
+    async def call(self, func: Callable[[T], Awaitable[R]]) -> R:
+        """按路由策略调用服务商。
+
+        Args:
+            func: 接收服务商客户端、执行一次调用的协程函数
+
+        Returns:
+            先成功返回的结果
+
+        Raises:
+            Exception: 所有尝试的服务商都失败时抛出主服务商的异常；
+                非服务端故障（如 4xx）不重试，直接抛出
+        """
+        order = self.order()
+        primary = asyncio.ensure_future(self._attempt(order[0], func))
+        if len(order) == 1:
+            return await primary
+
+        delay = self.hedge_delay(order[0])
+        if self.hedge:
+            self.hedge_tokens = min(self.hedge_tokens + self.hedge_budget, self.hedge_burst)
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done and not self._take_hedge_token():
+                # 对冲预算用尽：不发送对冲请求，继续等待主服务商
+                done, _ = await asyncio.wait({primary})
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            error = primary.exception()
+            if error is None:
+                return primary.result()
+            if not is_provider_failure(error):
+                raise error
+            provider_failovers.labels(self.name).inc()
+            logger.warning(f"{self.name} 服务商 {order[0]} 调用失败，改用 {order[1]}: {error}")
+            try:
+                return await self._attempt(order[1], func)
+            except Exception:
+                raise error
+
+        # 主服务商超过 p95 仍未返回，发送对冲请求
+        backup = asyncio.ensure_future(self._attempt(order[1], func))
+        pending = {primary, backup}
+        errors: dict[asyncio.Future, BaseException] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        provider_hedges.labels(self.name, "primary" if task is primary else "hedge").inc()
+                        return task.result()
+                    errors[task] = task.exception()
+            provider_hedges.labels(self.name, "none").inc()
+            raise errors[primary]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _attempt(self, provider: str, func: Callable[[T], Awaitable[R]]) -> R:
+        start = time.perf_counter()
+        try:
+            result = await func(self.providers[provider])
+        except asyncio.CancelledError:
+            # 对冲落败或调用方取消：已等待的时间是该服务商延迟的下界
+            self.stats[provider].record_latency(time.perf_counter() - start)
+            provider_requests.labels(self.name, provider, "cancelled").inc()
+            raise
+        except Exception as e:
+            if is_provider_failure(e):
+                self.stats[provider].record(None, False)
+                provider_requests.labels(self.name, provider, "error").inc()
+            else:
+                provider_requests.labels(self.name, provider, "client_error").inc()
+            raise
+        self.stats[provider].record(time.perf_counter() - start, True)
+        provider_requests.labels(self.name, provider, "success").inc()
+        return result
+
+
+# 服务名称 -> 最近创建的路由器（供指标采集）
+_routers: dict[str, ProviderRouter] = {}
+
+
+def _collect_routing():
+    for name, router in list(_routers.items()):
+        for provider, stats in router.stats.items():
+            yield (name, provider, "weight"), router.weight(provider)
+            yield (name, provider, "error_rate"), stats.error_rate
+            if stats.latency is not None:
+                yield (name, provider, "latency_ewma"), stats.latency
+                yield (name, provider, "latency_p95"), stats.p95()
+
+
+provider_routing.set_function(_collect_routing)
@@ -0,0 +1,87 @@
+"""HTTP 请求指标中间件。
+
+按路由模板（如 /api/v1/users/{user_id}）统计请求数和处理时间，
+不使用实际路径，避免路径参数导致标签数量无限增长。
+
+以纯 ASGI 中间件实现，不经过 BaseHTTPMiddleware 的请求/响应对象包装，
+每个请求只做一次计时和两次子指标查找。
+"""
+
+import time
+
+from starlette.routing import get_route_path
+
+from app.infrastructure.metrics import http_request_duration, http_requests
+
+# 未匹配任何路由的请求（404、扫描器等）统一归入同一标签
+UNMATCHED_ROUTE = "<unmatched>"
+
+# (路由对象 id, 前缀) -> 完整路由模板（路由对象在应用生命周期内不会释放）
+_templates: dict[tuple[int, str], str] = {}
+
+
+def route_template(scope) -> str:
+    """获取请求匹配的完整路由模板。
+
+    较新版本的 FastAPI 写入 scope 的是子路由器中的原始路由，其 path_format 不含
+    include_router 的前缀。这里用路由的正则在请求路径上寻找匹配的后缀，
+    其前面的部分即为前缀（本项目的路由前缀都是静态路径）。
+
+    Args:
+        scope: ASGI scope
+
+    Returns:
+        路由模板，如 /api/v1/users/{user_id}
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+
+    path = get_route_path(scope)
+    regex = route.path_regex
+    start = 0
+    while start != -1:
+        # 正则以 ^ 开头，match 的 pos 参数不会让 ^ 在 pos 处匹配，需要切片
+        if regex.match(path[start:] if start else path):
+            prefix = path[:start]
+            key = (id(route), prefix)
+            template = _templates.get(key)
+            if template is None:
+                template = _templates[key] = prefix + path_format
+            return template
+        start = path.find("/", start + 1)
+    return path_format
+
+
+class RequestMetricsMiddleware:
+    """记录每个 HTTP 请求的路由模板、状态码和处理时间。
+
+    SSE 等流式响应的处理时间为整个连接的持续时间，按路由单独统计，不影响其他路由。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 路由匹配后 FastAPI 会把路由对象写入 scope
+            template = route_template(scope)
+            method = scope["method"]
+            http_request_duration.labels(method, template).observe(time.perf_counter() - start)
+            http_requests.labels(method, template, str(status_code)).inc()
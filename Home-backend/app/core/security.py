@@ -1,13 +1,54 @@
 """安全模块。
 
 提供密码哈希和验证等安全相关功能。
+
+bcrypt 每次计算约 100–300 ms，在协程中直接调用会阻塞事件循环，
+期间同一 worker 上的其他请求全部停顿。异步接口应使用
+hash_password_async / verify_password_async，由有界进程池完成计算。
 """
 
-from passlib.context import CryptContext
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.infrastructure.config import get_settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """密码哈希进程池排队已满。"""
+
+
+@lru_cache()
+def get_pwd_context() -> "CryptContext":
+    """获取密码加密上下文（首次使用时加载 passlib）。
+
+    使用 bcrypt 算法，这是目前最安全的密码哈希算法之一。
+
+    Returns:
+        CryptContext: 密码加密上下文
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
-# 密码加密上下文
-# 使用 bcrypt 算法，这是目前最安全的密码哈希算法之一
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def __getattr__(name: str):
+    # 兼容旧代码中的 security.pwd_context
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,7 +61,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         密码是否匹配
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def hash_password(password: str) -> str:
@@ -32,4 +73,124 @@ def hash_password(password: str) -> str:
     Returns:
         哈希后的密码
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def _warmup() -> None:
+    """预热工作进程（加载 passlib 与 bcrypt 后端）。"""
+    get_pwd_context().hash("warmup")
+
+
+def get_password_executor() -> ProcessPoolExecutor:
+    """获取密码哈希进程池（首次调用时创建）。
+
+    使用 spawn 启动工作进程，避免 fork 继承事件循环、数据库连接等运行时状态。
+
+    Returns:
+        ProcessPoolExecutor: 密码哈希进程池
+    """
+    global _executor
+
+    if _executor is None:
+        workers = get_settings().password_hash_workers
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"密码哈希进程池已创建: workers={workers}")
+    return _executor
+
+
+async def start_password_hasher() -> None:
+    """启动进程池并预热所有工作进程，避免首个注册请求承担进程启动开销。"""
+    settings = get_settings()
+    if settings.password_hash_workers <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    executor = get_password_executor()
+    await asyncio.gather(*[
+        loop.run_in_executor(executor, _warmup) for _ in range(settings.password_hash_workers)
+    ])
+
+
+def shutdown_password_hasher() -> None:
+    """关闭密码哈希进程池。"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("密码哈希进程池已关闭")
+
+
+async def _run_in_pool(func, *args):
+    """在进程池中执行计算，排队数超过上限时立即拒绝。
+
+    Raises:
+        PasswordHasherBusyError: 正在执行和排队的任务数已达上限时
+        BrokenProcessPool: 重建进程池后仍然失败时
+    """
+    global _pending
+
+    settings = get_settings()
+    if settings.password_hash_workers <= 0:
+        # 未启用进程池时退回在事件循环中直接计算
+        return func(*args)
+
+    limit = settings.password_hash_workers + settings.password_hash_queue_limit
+    if _pending >= limit:
+        raise PasswordHasherBusyError(f"密码哈希任务已达上限: pending={_pending}")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        executor = get_password_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # 工作进程异常退出（如被 OOM 杀死）后进程池不可再用，重建后重试一次
+            logger.warning("密码哈希进程池已损坏，正在重建")
+            _reset_executor(executor)
+            return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    """丢弃已损坏的进程池（并发请求可能已经重建过，只重置同一个实例）。"""
+    global _executor
+
+    if _executor is broken:
+        _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def hash_password_async(password: str) -> str:
+    """在进程池中对密码进行哈希，不阻塞事件循环。
+
+    Args:
+        password: 明文密码
+
+    Returns:
+        哈希后的密码
+
+    Raises:
+        PasswordHasherBusyError: 进程池排队已满时
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在进程池中验证密码，不阻塞事件循环。
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希后的密码
+
+    Returns:
+        密码是否匹配
+
+    Raises:
+        PasswordHasherBusyError: 进程池排队已满时
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
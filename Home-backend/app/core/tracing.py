@@ -0,0 +1,395 @@
+"""轻量链路追踪模块。
+
+与 OpenTelemetry 兼容的最小实现：
+- 跨度（Span）保存在 contextvar 中，同步和异步代码都用 `with start_span(...)` 嵌套
+- 跨进程传播使用 W3C Trace Context 的 traceparent 格式，
+  HTTP 请求从请求头读取，后台任务和 Celery 任务通过参数或消息头传递
+- 结束的跨度以 OpenTelemetry ConsoleSpanExporter 相同的字段（name、context、
+  parent_id、start_time、end_time、status、attributes、events）按 JSON 行
+  输出到控制台或本地文件，可直接用脚本或 otel 工具链分析
+
+TRACING_EXPORTER=none（默认）时 start_span 返回空跨度，不生成 ID、不记录时间。
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterator, NamedTuple
+
+from app.infrastructure.config import get_settings
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext(NamedTuple):
+    """跨度上下文（可跨进程传递的部分）。"""
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    def to_traceparent(self) -> str:
+        """格式化为 W3C traceparent。"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: str | None) -> SpanContext | None:
+    """解析 W3C traceparent。
+
+    Args:
+        value: traceparent 字符串
+
+    Returns:
+        跨度上下文，格式不合法时返回 None
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+class Span:
+    """一次操作的跨度。"""
+
+    __slots__ = (
+        "name", "context", "parent_id", "kind", "attributes", "events",
+        "start_ns", "end_ns", "status", "status_message",
+    )
+
+    def __init__(self, name: str, context: SpanContext, parent_id: str | None, kind: str = "INTERNAL"):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: dict[str, Any] = {}
+        self.events: list[dict] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status = "UNSET"
+        self.status_message: str | None = None
+
+    @property
+    def recording(self) -> bool:
+        return self.end_ns is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """设置跨度属性。"""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: dict | None = None) -> None:
+        """记录跨度内的时间点事件。"""
+        self.events.append({"name": name, "timestamp": _iso(time.time_ns()), "attributes": attributes or {}})
+
+    def record_exception(self, exc: BaseException) -> None:
+        """记录异常并把状态置为 ERROR。"""
+        self.status = "ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", {
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc),
+        })
+
+    def end(self) -> None:
+        """结束跨度并导出（重复调用无效）。"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.status == "UNSET":
+            self.status = "OK"
+        if self.context.sampled:
+            get_tracer().export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self, resource: dict) -> dict:
+        """转换为 OpenTelemetry ConsoleSpanExporter 格式的字典。"""
+        status = {"status_code": self.status}
+        if self.status_message:
+            status["description"] = self.status_message
+        return {
+            "name": self.name,
+            "context": {
+                "trace_id": f"0x{self.context.trace_id}",
+                "span_id": f"0x{self.context.span_id}",
+                "trace_state": "[]",
+            },
+            "kind": f"SpanKind.{self.kind}",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": status,
+            "attributes": self.attributes,
+            "events": self.events,
+            "resource": {"attributes": resource, "schema_url": ""},
+        }
+
+
+class _NoopSpan:
+    """未启用追踪时使用的空跨度。"""
+
+    __slots__ = ()
+    context = None
+    recording = False
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: dict | None = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# 当前跨度（或从其他进程传入的上下文）
+_current: ContextVar[Span | SpanContext | None] = ContextVar("current_span", default=None)
+
+
+def _iso(ns: int | None) -> str | None:
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Tracer:
+    """跨度创建与导出。"""
+
+    def __init__(self, exporter: str = "none", path: str = "", sample_ratio: float = 1.0, service_name: str = ""):
+        """初始化追踪器。
+
+        Args:
+            exporter: 导出方式（none、console、file）
+            path: file 导出时的文件路径
+            sample_ratio: 新建链路的采样比例（0-1），传入的上下文沿用其采样标记
+            service_name: 资源属性 service.name
+        """
+        self.enabled = exporter in ("console", "file")
+        self.exporter = exporter
+        self.path = path
+        self.sample_ratio = sample_ratio
+        self.resource = {"service.name": service_name, "process.pid": os.getpid()}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def new_span(self, name: str, parent: SpanContext | None, kind: str = "INTERNAL") -> Span:
+        """创建跨度（不修改当前上下文）。"""
+        if parent is None:
+            trace_id = os.urandom(16).hex()
+            sampled = self.sample_ratio >= 1 or int(trace_id[:8], 16) / 0xFFFFFFFF < self.sample_ratio
+            parent_id = None
+        else:
+            trace_id, sampled, parent_id = parent.trace_id, parent.sampled, parent.span_id
+        return Span(name, SpanContext(trace_id, os.urandom(8).hex(), sampled), parent_id, kind)
+
+    def export(self, span: Span) -> None:
+        """输出一个已结束的跨度。"""
+        # fork 出的子进程（如 Celery worker）使用自己的 pid
+        self.resource["process.pid"] = os.getpid()
+        line = json.dumps(span.to_dict(self.resource), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self.exporter == "console":
+                sys.stdout.write(line)
+                sys.stdout.flush()
+                return
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+
+@lru_cache()
+def get_tracer() -> Tracer:
+    """获取追踪器单例。
+
+    Returns:
+        Tracer: 根据配置创建的追踪器
+    """
+    settings = get_settings()
+    return Tracer(
+        exporter=settings.tracing_exporter,
+        path=settings.tracing_file,
+        sample_ratio=settings.tracing_sample_ratio,
+        service_name=settings.tracing_service_name,
+    )
+
+
+def current_context() -> SpanContext | None:
+    """获取当前跨度上下文。"""
+    value = _current.get()
+    if isinstance(value, Span):
+        return value.context
+    return value
+
+
+def current_span() -> Span | _NoopSpan:
+    """获取当前跨度，不在跨度中时返回空跨度。"""
+    value = _current.get()
+    return value if isinstance(value, Span) else NOOP_SPAN
+
+
+def current_traceparent() -> str | None:
+    """获取当前上下文的 traceparent，用于传给后台任务或写入消息头。"""
+    context = current_context()
+    return context.to_traceparent() if context is not None else None
+
+
+def begin_span(
+    name: str,
+    attributes: dict | None = None,
+    parent: SpanContext | str | None = None,
+    kind: str = "INTERNAL"
+):
+    """开始跨度并设为当前跨度，需要配对调用 finish_span。
+
+    用于开始和结束不在同一代码块中的场景（如中间件、Celery 信号），
+    其他情况使用 start_span。
+
+    Args:
+        name: 跨度名称
+        attributes: 初始属性
+        parent: 父上下文或 traceparent，None 时使用当前上下文
+        kind: 跨度类型（INTERNAL、SERVER、CLIENT、PRODUCER、CONSUMER）
+
+    Returns:
+        (跨度, contextvar 令牌)
+    """
+    tracer = get_tracer()
+    if not tracer.enabled:
+        return NOOP_SPAN, None
+    if isinstance(parent, str):
+        parent = parse_traceparent(parent)
+    if parent is None:
+        parent = current_context()
+    span = tracer.new_span(name, parent, kind)
+    if attributes:
+        span.attributes.update(attributes)
+    return span, _current.set(span)
+
+
+def finish_span(span, token) -> None:
+    """结束 begin_span 开始的跨度并恢复之前的上下文。"""
+    span.end()
+    if token is not None:
+        _current.reset(token)
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: dict | None = None,
+    parent: SpanContext | str | None = None,
+    kind: str = "INTERNAL"
+) -> Iterator[Span | _NoopSpan]:
+    """在跨度中执行代码块，异常会记录到跨度上后继续抛出。
+
+    Args:
+        name: 跨度名称
+        attributes: 初始属性
+        parent: 父上下文或 traceparent，None 时使用当前上下文
+        kind: 跨度类型
+
+    Example:
+        with start_span("llm.generate", {"behavior.id": behavior_id}):
+            text = await llm_service.generate(prompt)
+    """
+    span, token = begin_span(name, attributes, parent, kind)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        finish_span(span, token)
+
+
+class TracingMiddleware:
+    """为每个 HTTP 请求创建 SERVER 跨度。
+
+    请求头带有 traceparent 时沿用调用方的链路，响应头返回本次请求的 traceparent。
+    跨度在响应发送完毕时结束；之后运行的后台任务仍可作为它的子跨度。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_tracer().enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # 服务层模块也会导入本模块，这里延迟导入避免循环依赖
+        from app.core.request_metrics import route_template
+
+        parent = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        span, token = begin_span(
+            f"{scope['method']} {scope['path']}",
+            {"http.method": scope["method"], "http.target": scope["path"]},
+            parent=parent,
+            kind="SERVER",
+        )
+
+        def _finish(status_code: int | None) -> None:
+            if not span.recording:
+                return
+            template = route_template(scope)
+            span.name = f"{scope['method']} {template}"
+            span.set_attribute("http.route", template)
+            if status_code is not None:
+                span.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    span.status = "ERROR"
+            span.end()
+
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", span.context.to_traceparent().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                _finish(status_code)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _finish(status_code)
+            _current.reset(token)
@@ -4,46 +4,62 @@
 - config: 配置管理
 - database: 数据库连接
 - dependencies: 依赖注入
+- event_bus: 实时事件发布/订阅
+- cache: 进程内 / Redis 缓存
 - celery_app: Celery 任务队列配置
+
+包级导出按需导入，导入任一子模块不会连带加载其他子模块。
 """
 
-from app.infrastructure.config import get_settings, Settings
-from app.infrastructure.database import (
-    init_databases,
-    close_databases,
-    Base,
-    engine,
-    async_session_maker,
-)
-from app.infrastructure.dependencies import (
-    SettingsDep,
-    MySQLSessionDep,
-    MilvusDep,
-    LLMServiceDep,
-    EmbeddingServiceDep,
-    MilvusServiceDep,
-    PasswordServiceDep,
-)
-from app.infrastructure.celery_app import celery_app
-
-__all__ = [
+import importlib
+
+# 导出名称 -> 所在模块。按需导入：只用到配置的进程（如 Celery beat）
+# 不会因为导入本包而加载依赖注入、LLM/Milvus SDK 或 Celery 应用
+_EXPORTS = {
     # Config
-    "get_settings",
-    "Settings",
+    "get_settings": "app.infrastructure.config",
+    "Settings": "app.infrastructure.config",
     # Database
-    "init_databases",
-    "close_databases",
-    "Base",
-    "engine",
-    "async_session_maker",
+    "init_databases": "app.infrastructure.database",
+    "close_databases": "app.infrastructure.database",
+    "Base": "app.infrastructure.database",
+    "engine": "app.infrastructure.database",
+    "async_session_maker": "app.infrastructure.database",
     # Dependencies
-    "SettingsDep",
-    "MySQLSessionDep",
-    "MilvusDep",
-    "LLMServiceDep",
-    "EmbeddingServiceDep",
-    "MilvusServiceDep",
-    "PasswordServiceDep",
+    "SettingsDep": "app.infrastructure.dependencies",
+    "MySQLSessionDep": "app.infrastructure.dependencies",
+    "MySQLReadSessionDep": "app.infrastructure.dependencies",
+    "MilvusDep": "app.infrastructure.dependencies",
+    "LLMServiceDep": "app.infrastructure.dependencies",
+    "EmbeddingServiceDep": "app.infrastructure.dependencies",
+    "MilvusServiceDep": "app.infrastructure.dependencies",
+    "PasswordServiceDep": "app.infrastructure.dependencies",
+    "EventBusDep": "app.infrastructure.dependencies",
+    "AdminUserDep": "app.infrastructure.dependencies",
+    # Event bus
+    "EventBus": "app.infrastructure.event_bus",
+    "get_event_bus": "app.infrastructure.event_bus",
+    "publish_user_event": "app.infrastructure.event_bus",
+    # Cache
+    "get_cache": "app.infrastructure.cache",
     # Celery
-    "celery_app",
-]
+    "celery_app": "app.infrastructure.celery_app",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """首次访问导出名称时再导入对应模块（PEP 562）。"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # engine / async_session_maker 在 init_mysql() 后才有值，不缓存，每次读取最新值
+    if name not in ("engine", "async_session_maker"):
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,197 @@
+"""缓存模块。
+
+提供统一的异步键值缓存接口，支持两种后端：
+- memory: 进程内 TTL + LRU 缓存，零网络开销，只在当前进程可见
+- redis: 多进程/多 worker 共享，Celery 任务中的写入也能立即可见
+
+所有值均为字符串，调用方负责序列化。
+"""
+
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.infrastructure.config import get_settings
+
+
+class MemoryCache:
+    """进程内 TTL-LRU 缓存。"""
+
+    def __init__(self, max_entries: int = 10000):
+        """初始化缓存。
+
+        Args:
+            max_entries: 最大条目数，超出后淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """当前条目数（含尚未清理的过期条目）。"""
+        return len(self._data)
+
+    def get_nowait(self, key: str) -> str | None:
+        """同步读取缓存（供热点路径避免创建协程）。"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set_nowait(self, key: str, value: str, ttl: float | None = None) -> None:
+        """同步写入缓存。"""
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def get(self, key: str) -> str | None:
+        """读取缓存。
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，不存在或已过期时返回 None
+        """
+        return self.get_nowait(key)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        """批量读取缓存。
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            与 keys 顺序一致的缓存值列表
+        """
+        return [self.get_nowait(key) for key in keys]
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """写入缓存。
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒），None 表示不过期
+        """
+        self.set_nowait(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """删除缓存。
+
+        Args:
+            key: 缓存键
+        """
+        self._data.pop(key, None)
+
+    async def incr_if_exists(self, key: str, delta: int) -> int | None:
+        """对已存在的整数值做增量调整，保留原有过期时间。
+
+        键不存在时不创建，下次读取会回源重新计算。
+
+        Args:
+            key: 缓存键
+            delta: 增量（可为负数）
+
+        Returns:
+            调整后的值，键不存在时返回 None
+        """
+        value = self.get_nowait(key)
+        if value is None:
+            return None
+        new_value = int(value) + delta
+        self._data[key] = (str(new_value), self._data[key][1])
+        return new_value
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """删除指定前缀的所有缓存。
+
+        Args:
+            prefix: 键前缀
+        """
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+
+_INCR_IF_EXISTS_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+class RedisCache:
+    """基于 Redis 的共享缓存。"""
+
+    def __init__(self, prefix: str = "home:cache:"):
+        """初始化缓存。
+
+        Args:
+            prefix: 键前缀，避免与 Celery 等其他用途冲突
+        """
+        self.prefix = prefix
+
+    async def get(self, key: str) -> str | None:
+        """读取缓存。"""
+        from app.infrastructure.redis_client import get_redis
+
+        return await get_redis().get(self.prefix + key)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        """批量读取缓存（单次 MGET 往返）。"""
+        from app.infrastructure.redis_client import get_redis
+
+        return await get_redis().mget([self.prefix + key for key in keys])
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """写入缓存。"""
+        from app.infrastructure.redis_client import get_redis
+
+        await get_redis().set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    async def delete(self, key: str) -> None:
+        """删除缓存。"""
+        from app.infrastructure.redis_client import get_redis
+
+        await get_redis().delete(self.prefix + key)
+
+    async def incr_if_exists(self, key: str, delta: int) -> int | None:
+        """对已存在的整数值做原子增量调整（Lua 脚本，保留 TTL）。"""
+        from app.infrastructure.redis_client import get_redis
+
+        result = await get_redis().eval(_INCR_IF_EXISTS_SCRIPT, 1, self.prefix + key, delta)
+        return int(result) if result is not None else None
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """删除指定前缀的所有缓存（SCAN + UNLINK，不阻塞 Redis）。"""
+        from app.infrastructure.redis_client import get_redis
+
+        redis = get_redis()
+        batch = []
+        async for key in redis.scan_iter(match=f"{self.prefix}{prefix}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                await redis.unlink(*batch)
+                batch.clear()
+        if batch:
+            await redis.unlink(*batch)
+
+
+@lru_cache()
+def get_cache() -> MemoryCache | RedisCache:
+    """获取缓存单例。
+
+    Returns:
+        根据 CACHE_BACKEND 配置创建的缓存实例
+    """
+    settings = get_settings()
+    if settings.cache_backend == "redis":
+        return RedisCache()
+    return MemoryCache(max_entries=settings.cache_max_entries)
@@ -1,21 +1,35 @@
 from celery import Celery
+from celery.signals import setup_logging as celery_setup_logging
+from app.core.json_codec import CELERY_SERIALIZER, register_celery_serializer
 from app.infrastructure.config import get_settings
 
 settings = get_settings()
 
+# 注册 fastjson 序列化器（API 进程发布任务和 worker 消费任务都会导入本模块）
+register_celery_serializer()
+
+# 任务模块由 worker/beat 启动时按 include 导入，导入本模块本身不加载任务和服务代码
 celery_app = Celery(
     "home_backend",
     broker=settings.celery_broker_url,
-    backend=settings.celery_result_backend
+    backend=settings.celery_result_backend,
+    include=[
+        "app.tasks.hydration_tasks",
+        "app.tasks.care_tasks",
+        "app.tasks.retention_tasks",
+        "app.tasks.user_tasks",
+        "app.tasks.semantic_tasks",
+    ],
 )
 
 from celery.schedules import crontab
 
 # 可选：配置 Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=settings.celery_serializer,
+    # 两种格式都接受，切换序列化器时新旧进程发布的任务都能消费
+    accept_content=["json", CELERY_SERIALIZER],
+    result_serializer=settings.celery_serializer,
     timezone="Asia/Shanghai",
     enable_utc=False,
     # 增加重连设置和超时设置，应对远程 Redis 连接不稳定的问题
@@ -35,11 +49,29 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.hydration_tasks.trigger_daily_hydration_checks",
         "schedule": crontab(minute="*/10"),  # 每10分钟执行一次，以配合10小时提醒窗口
     },
+    "daily-notification-purge": {
+        "task": "app.tasks.retention_tasks.purge_expired_notifications",
+        "schedule": crontab(hour=3, minute=30),  # 每天凌晨低峰期归档并清理过期通知
+    },
+    "user-total-reconcile": {
+        "task": "app.tasks.user_tasks.reconcile_user_total_task",
+        "schedule": crontab(minute="*/15"),  # 每15分钟校准一次用户总数缓存
+    },
+    "semantic-memory-backfill": {
+        "task": "app.tasks.semantic_tasks.backfill_semantic_memory_task",
+        "schedule": crontab(minute="*/5"),  # 每5分钟补处理因繁忙延后或中断的语义描述
+    },
 }
 
-# 自动发现任务
-celery_app.autodiscover_tasks(["app.tasks"], force=True)
 
-# 显式导入任务模块以确保注册
-import app.tasks.hydration_tasks  # noqa: F401
-import app.tasks.care_tasks       # noqa: F401
+@celery_setup_logging.connect
+def _configure_logging(**kwargs):
+    """使用应用的队列日志配置（连接此信号后 Celery 不再接管根 logger）。"""
+    from app.core.logging_config import setup_logging
+
+    setup_logging()
+
+
+# 任务执行时间与失败次数指标、链路追踪
+import app.infrastructure.celery_metrics  # noqa: F401
+import app.infrastructure.celery_tracing  # noqa: F401
@@ -0,0 +1,47 @@
+"""Celery 任务指标模块。
+
+通过 Celery 信号记录任务执行时间和失败次数，
+并在任务结束后按间隔把本 worker 进程的指标快照写入 METRICS_DIR，
+由 API 的 /metrics 端点合并输出。
+"""
+
+import time
+
+from celery.signals import task_failure, task_postrun, task_prerun, worker_process_shutdown
+
+from app.infrastructure.metrics import background_task_failures, get_exporter, task_duration
+
+# 执行中任务的开始时间：task_id -> perf_counter
+_started: dict[str, float] = {}
+
+
+def task_label(name: str | None) -> str:
+    """任务指标标签（去掉模块路径的任务函数名）。"""
+    return (name or "unknown").rsplit(".", 1)[-1]
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    start = _started.pop(task_id, None)
+    if start is not None:
+        task_duration.labels(task_label(task.name), state or "UNKNOWN").observe(time.perf_counter() - start)
+    get_exporter().maybe_write()
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, task_id=None, **kwargs):
+    background_task_failures.labels(task_label(getattr(sender, "name", None))).inc()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    # 子进程退出前写入最后一次快照，保留累计计数
+    try:
+        get_exporter().write()
+    except OSError:
+        pass
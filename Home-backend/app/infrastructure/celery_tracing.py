@@ -0,0 +1,54 @@
+"""Celery 任务链路追踪模块。
+
+发布任务时把当前链路上下文写入消息头 traceparent，
+worker 执行任务时以它为父上下文创建 CONSUMER 跨度，任务内的跨度都挂在其下。
+"""
+
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun
+
+from app.core.tracing import TRACEPARENT_HEADER, begin_span, current_traceparent, finish_span
+from app.infrastructure.celery_metrics import task_label
+
+# 执行中任务的跨度：task_id -> (跨度, contextvar 令牌)
+_spans: dict[str, tuple] = {}
+
+
+@before_task_publish.connect
+def _inject_trace_context(headers=None, **kwargs):
+    traceparent = current_traceparent()
+    if traceparent and headers is not None:
+        headers.setdefault(TRACEPARENT_HEADER, traceparent)
+
+
+@task_prerun.connect
+def _start_task_span(task_id=None, task=None, **kwargs):
+    # 自定义消息头会合并到 task.request 上
+    parent = getattr(task.request, TRACEPARENT_HEADER, None)
+    span, token = begin_span(
+        f"celery.task {task_label(task.name)}",
+        {"celery.task_name": task.name, "celery.task_id": task_id},
+        parent=parent,
+        kind="CONSUMER",
+    )
+    _spans[task_id] = (span, token)
+
+
+@task_failure.connect
+def _record_task_failure(task_id=None, exception=None, **kwargs):
+    entry = _spans.get(task_id)
+    if entry is not None and exception is not None:
+        entry[0].record_exception(exception)
+
+
+@task_postrun.connect
+def _finish_task_span(task_id=None, state=None, **kwargs):
+    entry = _spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("celery.state", state)
+    try:
+        finish_span(span, token)
+    except ValueError:
+        # 令牌来自其他上下文（如任务在线程池中执行），只结束跨度
+        span.end()
@@ -4,6 +4,7 @@
 配置项包括：应用信息、数据库连接、LLM 服务、Embedding 服务等。
 """
 
+import json
 from functools import lru_cache
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -33,7 +34,7 @@ class Settings(BaseSettings):
     # ============== 应用配置 ==============
     app_name: str = Field(default="Home Backend API", description="应用名称")
     app_version: str = Field(default="1.0.0", description="应用版本号")
-    debug: bool = Field(default=True, description="调试模式（开启后会打印 SQL 语句）")
+    debug: bool = Field(default=True, description="调试模式（直接运行 main.py 时开启代码热重载）")
     api_v1_prefix: str = Field(default="/api/v1", description="API v1 路径前缀")
     timezone: str = Field(default="Asia/Shanghai", description="应用时区")
 
@@ -80,6 +81,40 @@ class Settings(BaseSettings):
             f"@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
         )
 
+    # 连接池参数（每个进程、每个引擎各自一个连接池，API 与 Celery worker 可分别配置）
+    db_pool_size: int = Field(default=10, ge=1, description="连接池常驻连接数")
+    db_max_overflow: int = Field(default=20, ge=0, description="连接池满时允许额外创建的连接数")
+    db_pool_timeout: float = Field(default=30, gt=0, description="借出连接的最长等待时间（秒）")
+    db_pool_recycle: int = Field(
+        default=3600,
+        description="连接最长存活时间（秒），应小于 MySQL wait_timeout，-1 表示不回收"
+    )
+    db_pool_pre_ping: bool = Field(default=True, description="借出连接前是否先 ping 检查连接有效性")
+
+    mysql_replica_urls: str = Field(
+        default="",
+        description="MySQL 只读副本连接 URL（逗号分隔，留空表示所有读请求走主库）"
+    )
+    replica_health_check_interval: float = Field(
+        default=5,
+        gt=0,
+        description="只读副本健康检查间隔（秒）"
+    )
+    read_your_writes_seconds: float = Field(
+        default=5,
+        ge=0,
+        description="用户写入后的读己之写窗口（秒），窗口内该用户的读请求走主库，应大于副本复制延迟"
+    )
+
+    @property
+    def mysql_replica_url_list(self) -> list[str]:
+        """将只读副本 URL 字符串转换为列表。
+
+        Returns:
+            list[str]: 只读副本连接 URL 列表
+        """
+        return [url.strip() for url in self.mysql_replica_urls.split(",") if url.strip()]
+
     # ============== Milvus 向量数据库配置 ==============
     milvus_host: str = Field(default="localhost", description="Milvus 服务器地址")
     milvus_port: int = Field(default=19530, description="Milvus 服务器端口")
@@ -106,6 +141,14 @@ class Settings(BaseSettings):
         default="INFO",
         description="日志级别（DEBUG, INFO, WARNING, ERROR, CRITICAL）"
     )
+    log_format: str = Field(default="text", description="日志格式（text: 文本; json: 每行一个 JSON 对象）")
+    log_sample_burst: int = Field(
+        default=20,
+        ge=0,
+        description="同一代码位置每个采样窗口最多输出的 INFO 及以下日志条数（0 表示不采样）"
+    )
+    log_sample_window: float = Field(default=1.0, gt=0, description="日志采样窗口（秒）")
+    sql_echo: bool = Field(default=False, description="是否打印 SQLAlchemy 执行的 SQL 语句（仅排查问题时开启）")
 
     # ============== LLM 服务配置 ==============
     llm_provider: str = Field(default="openai", description="LLM 提供商（openai, zhipuai 等）")
@@ -149,12 +192,271 @@ class Settings(BaseSettings):
         description="Embedding 向量维度（必须与模型输出维度匹配）"
     )
 
+    # ============== 多服务商路由 ==============
+    llm_extra_providers: str = Field(
+        default="",
+        description=(
+            "额外的 LLM 服务商（JSON 数组，元素字段 name、api_base、api_key、model，省略的字段沿用主配置），"
+            "与主配置一起按延迟和错误率加权路由"
+        )
+    )
+    embedding_extra_providers: str = Field(
+        default="",
+        description="额外的 Embedding 服务商（JSON 数组，格式同 LLM_EXTRA_PROVIDERS）"
+    )
+    provider_ewma_alpha: float = Field(
+        default=0.2,
+        gt=0,
+        le=1,
+        description="服务商延迟和错误率滑动平均的平滑系数，越大越偏重最近的调用"
+    )
+    llm_hedge: bool = Field(
+        default=False,
+        description="LLM 主服务商超过其 p95 延迟仍未返回时，是否向下一个服务商发送对冲请求"
+    )
+    embedding_hedge: bool = Field(
+        default=False,
+        description="Embedding 主服务商超过其 p95 延迟仍未返回时，是否向下一个服务商发送对冲请求"
+    )
+    hedge_min_delay: float = Field(
+        default=0.1,
+        ge=0,
+        description="发送对冲请求前的最短等待时间（秒）"
+    )
+    hedge_budget: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description=(
+            "对冲请求最多占调用次数的比例。对冲请求与主请求共用一个准入名额，"
+            "预算限制其带来的额外负载，超出时只等待主服务商"
+        )
+    )
+    hedge_min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="主服务商至少有多少个延迟样本（成功或被取消的调用）后才按其 p95 延迟对冲"
+    )
+
+    @property
+    def llm_provider_list(self) -> list[dict]:
+        """LLM 服务商列表，第一个为主配置。
+
+        Returns:
+            list[dict]: 每个服务商的 name、api_base、api_key、model
+        """
+        primary = {
+            "name": self.llm_provider,
+            "api_base": self.llm_api_base,
+            "api_key": self.llm_api_key,
+            "model": self.llm_model,
+        }
+        return _provider_list(primary, self.llm_extra_providers)
+
+    @property
+    def embedding_provider_list(self) -> list[dict]:
+        """Embedding 服务商列表，第一个为主配置。
+
+        Returns:
+            list[dict]: 每个服务商的 name、api_base、api_key、model
+        """
+        primary = {
+            "name": self.embedding_provider,
+            "api_base": self.embedding_api_base,
+            "api_key": self.embedding_api_key,
+            "model": self.embedding_model,
+        }
+        return _provider_list(primary, self.embedding_extra_providers)
+
+    # ============== 外部调用准入控制 ==============
+    llm_max_concurrency: int = Field(
+        default=16,
+        gt=0,
+        description="每个进程同时进行的 LLM 调用数上限（遇到限流或变慢时自动下调）"
+    )
+    llm_latency_target: float = Field(
+        default=15,
+        gt=0,
+        description="LLM 调用的目标耗时（秒），超过时下调并发上限"
+    )
+    llm_batch_concurrency: int = Field(
+        default=12,
+        gt=0,
+        description="单个批量生成请求同时进行的 LLM 调用数，略低于 llm_max_concurrency 为其他请求留出余量"
+    )
+    embedding_max_concurrency: int = Field(
+        default=32,
+        gt=0,
+        description="每个进程同时进行的 Embedding 调用数上限"
+    )
+    embedding_latency_target: float = Field(
+        default=3,
+        gt=0,
+        description="Embedding 调用的目标耗时（秒），超过时下调并发上限"
+    )
+    admission_queue_size: int = Field(
+        default=200,
+        ge=0,
+        description="超过并发上限时允许排队的调用数，超出后立即拒绝"
+    )
+    admission_queue_timeout: float = Field(
+        default=30,
+        gt=0,
+        description="排队等待的最长时间（秒），超时后拒绝"
+    )
+    circuit_failure_threshold: int = Field(
+        default=5,
+        gt=0,
+        description="LLM / Embedding 连续失败多少次后熔断，熔断期间调用立即失败"
+    )
+    circuit_recovery_timeout: float = Field(
+        default=30,
+        gt=0,
+        description="熔断多久后（秒）放行探测调用，探测成功则恢复"
+    )
+    semantic_pack_size: int = Field(
+        default=1,
+        ge=1,
+        le=50,
+        description="合并到一次 LLM 调用中生成语义描述的行为数，1 表示逐条生成"
+    )
+    semantic_pack_wait_ms: int = Field(
+        default=200,
+        ge=0,
+        description="合并模式下凑批的最长等待时间（毫秒），达到 semantic_pack_size 时立即发送"
+    )
+    semantic_fallback_template: bool = Field(
+        default=False,
+        description="LLM 熔断时是否用模板生成语义描述（否则留空由定时任务补处理）"
+    )
+    semantic_backfill_batch_size: int = Field(
+        default=50,
+        gt=0,
+        description="定时补处理语义描述时每次处理的行为记录数"
+    )
+    semantic_backfill_delay: int = Field(
+        default=120,
+        ge=0,
+        description="行为记录写入多久后（秒）仍没有语义描述才由定时任务补处理，避免与后台任务重复"
+    )
+    semantic_backfill_max_age_hours: int = Field(
+        default=24,
+        gt=0,
+        description="只补处理最近多少小时内的行为记录"
+    )
+
     # ============== Redis 配置 ==============
     redis_host: str = Field(default="localhost", description="Redis 服务器地址")
     redis_port: int = Field(default=6379, description="Redis 服务器端口")
     redis_password: str | None = Field(default=None, description="Redis 密码")
     redis_db: int = Field(default=0, description="Redis 数据库编号")
 
+    @property
+    def redis_url(self) -> str:
+        """构建 Redis 连接 URL。
+
+        Returns:
+            str: redis-py 可识别的连接 URL
+        """
+        auth = f":{self.redis_password}@" if self.redis_password else ""
+        return f"redis://{auth}{self.redis_host}:{self.redis_port}/{self.redis_db}"
+
+    # ============== 密码哈希配置 ==============
+    password_hash_workers: int = Field(
+        default=2,
+        ge=0,
+        description="bcrypt 哈希进程池大小（0 表示在事件循环中直接计算，仅用于调试）"
+    )
+    password_hash_queue_limit: int = Field(
+        default=16,
+        ge=0,
+        description="进程池繁忙时允许排队的哈希任务数，超出后直接返回 503"
+    )
+
+    # ============== 缓存配置 ==============
+    cache_backend: str = Field(
+        default="memory",
+        description="缓存后端（memory: 进程内; redis: 多 worker 与 Celery 共享）"
+    )
+    cache_max_entries: int = Field(default=10000, gt=0, description="进程内缓存最大条目数")
+    change_version_ttl: int = Field(
+        default=30,
+        gt=0,
+        description="用户数据版本号有效期（秒），memory 后端下也是跨进程写入的最大可见延迟"
+    )
+
+    user_cache_local_ttl: float = Field(
+        default=30,
+        gt=0,
+        description="用户资料进程内缓存有效期（秒），也是其他进程写入后本进程的最大可见延迟"
+    )
+    user_cache_ttl: int = Field(
+        default=300,
+        gt=0,
+        description="用户资料 Redis 缓存有效期（秒），仅 CACHE_BACKEND=redis 时启用"
+    )
+    user_cache_max_entries: int = Field(default=10000, gt=0, description="用户资料进程内缓存最大条目数")
+    user_total_ttl: int = Field(
+        default=900,
+        gt=0,
+        description="用户总数缓存有效期（秒），过期后重新 COUNT 校准"
+    )
+
+    # ============== 通知配置 ==============
+    notification_broadcast_chunk_size: int = Field(
+        default=5000,
+        gt=0,
+        description="系统广播按用户 ID 区间分批写入的区间大小，每批单独提交以缩短锁持有时间"
+    )
+
+    notification_retention_days: int = Field(
+        default=90,
+        ge=0,
+        description="已读通知保留天数，超期后归档并从通知表删除（0 表示不清理）"
+    )
+    notification_unread_retention_days: int = Field(
+        default=0,
+        ge=0,
+        description="未读通知保留天数（0 表示未读通知永不清理）"
+    )
+    notification_archive_enabled: bool = Field(
+        default=True,
+        description="清理前是否先把通知复制到 notifications_archive 归档表"
+    )
+    notification_purge_batch_size: int = Field(
+        default=1000,
+        gt=0,
+        description="每批归档/删除的通知条数，每批单独提交以缩短锁持有时间"
+    )
+    notification_purge_pause_seconds: float = Field(
+        default=0.2,
+        ge=0,
+        description="批次之间的暂停时间（秒），给在线写入和主从复制留出余量"
+    )
+
+    unread_count_ttl: int = Field(
+        default=60,
+        gt=0,
+        description="未读数缓存有效期（秒），memory 后端下也是跨进程写入的最大可见延迟"
+    )
+
+    # ============== 实时事件推送配置 ==============
+    event_bus_backend: str = Field(
+        default="memory",
+        description="事件总线后端（memory: 仅进程内; redis: 跨进程/多 worker 广播）"
+    )
+    event_bus_channel: str = Field(default="home:events", description="Redis 事件频道名称")
+    sse_heartbeat_seconds: int = Field(
+        default=15,
+        gt=0,
+        description="SSE 心跳间隔（秒），防止代理断开空闲连接"
+    )
+    sse_queue_size: int = Field(
+        default=100,
+        gt=0,
+        description="每个 SSE 连接的待发送事件上限，超出后丢弃（慢消费者保护）"
+    )
+
     # ============== Celery 配置 ==============
     celery_broker_url: str = Field(
         default="redis://localhost:6379/1",
@@ -164,7 +466,66 @@ class Settings(BaseSettings):
         default="redis://localhost:6379/1",
         description="Celery 结果后端 URL (Result Backend)"
     )
+    celery_serializer: str = Field(
+        default="json",
+        description=(
+            "Celery 任务与结果的序列化器（json: Celery 自带; fastjson: orjson 编码的 JSON）。"
+            "所有 worker 都升级到支持 fastjson 的版本后再切换，否则旧 worker 无法解析新任务"
+        )
+    )
+
+    # ============== 链路追踪配置 ==============
+    tracing_exporter: str = Field(
+        default="none",
+        description="跨度导出方式（none: 关闭; console: 输出到标准输出; file: 追加写入 TRACING_FILE）"
+    )
+    tracing_file: str = Field(default="logs/traces.jsonl", description="file 导出方式的输出文件（每行一个 JSON 跨度）")
+    tracing_sample_ratio: float = Field(
+        default=1.0,
+        ge=0,
+        le=1,
+        description="新建链路的采样比例，上游传入的 traceparent 沿用其采样标记"
+    )
+    tracing_service_name: str = Field(default="home-backend", description="跨度资源属性 service.name")
+
+    # ============== 指标配置 ==============
+    metrics_dir: str = Field(
+        default="",
+        description="多进程指标快照目录（所有 uvicorn/Celery worker 共享，部署启动前清空；留空时 /metrics 只输出当前进程）"
+    )
+    metrics_snapshot_interval: float = Field(
+        default=5,
+        gt=0,
+        description="各进程写入指标快照的间隔（秒），仪表类指标超过 3 倍间隔未更新视为进程已退出"
+    )
+
+    # ============== 启动预热配置 ==============
+    warmup_db_connections: int = Field(
+        default=5,
+        ge=1,
+        description="启动时为主库和每个只读副本预先建立的连接数（不超过 DB_POOL_SIZE）"
+    )
+    warmup_timeout: float = Field(
+        default=30,
+        gt=0,
+        description="单个依赖的预热超时时间（秒），超时视为预热失败"
+    )
+    warmup_retry_interval: float = Field(
+        default=5,
+        gt=0,
+        description="必需依赖预热失败后在后台重试的间隔（秒），重试成功后 /ready 恢复为就绪"
+    )
+
 
+def _provider_list(primary: dict, extra: str) -> list[dict]:
+    """合并主服务商与额外服务商配置，额外服务商省略的字段沿用主配置。"""
+    providers = [primary]
+    for i, item in enumerate(json.loads(extra) if extra.strip() else [], start=2):
+        provider = {**primary, "name": f"{primary['name']}-{i}", **item}
+        if any(p["name"] == provider["name"] for p in providers):
+            raise ValueError(f"服务商名称重复: {provider['name']}")
+        providers.append(provider)
+    return providers
 
 
 @lru_cache()
@@ -4,18 +4,27 @@
 提供了数据库会话的依赖注入功能，确保连接的正确管理和释放。
 """
 
+import asyncio
+import itertools
+import logging
+from typing import Optional
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
-    create_async_engine,
     async_sessionmaker,
+    create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
-from pymilvus import connections, MilvusException
-from typing import Optional
-import logging
 
+from app.core.json_codec import dumps_str, loads
 from app.infrastructure.config import get_settings
+from app.infrastructure.pool_metrics import (
+    InstrumentedAsyncQueuePool,
+    instrument_engine,
+    unregister_engine,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -30,43 +39,189 @@ engine: Optional[AsyncEngine] = None
 async_session_maker: Optional[async_sessionmaker[AsyncSession]] = None
 
 
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    """按配置的连接池参数创建异步引擎，并注册连接池指标。
+
+    Args:
+        url: 数据库连接 URL
+        name: 指标中的连接池名称
+    """
+    new_engine = create_async_engine(
+        url,
+        echo=settings.sql_echo,  # 打印 SQL 语句（与 DEBUG 无关，单独开启）
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        # JSON 列（如 Behavior.details）的编解码
+        json_serializer=dumps_str,
+        json_deserializer=loads,
+        # 设置数据库连接的会话时区为东八区（北京时间）
+        connect_args={"init_command": "SET time_zone='+08:00'"}
+    )
+    instrument_engine(new_engine, name)
+    return new_engine
+
+
+def _create_session_maker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """创建会话工厂。"""
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,  # 提交后不过期对象，避免延迟加载问题
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+class ReplicaRouter:
+    """只读副本路由。
+
+    按轮询顺序在健康的副本之间分配只读会话，
+    后台任务定期对每个副本执行 SELECT 1，失败的副本暂时移出轮询，恢复后自动加回。
+    没有健康副本时由调用方退回主库。
+    """
+
+    def __init__(self, engines: list[AsyncEngine], check_interval: float = 5):
+        """初始化副本路由。
+
+        Args:
+            engines: 副本引擎列表
+            check_interval: 健康检查间隔（秒）
+        """
+        self.engines = engines
+        self.session_makers = [_create_session_maker(e) for e in engines]
+        self.healthy = [True] * len(engines)
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def pick(self) -> async_sessionmaker[AsyncSession] | None:
+        """按轮询顺序选择一个健康副本。
+
+        Returns:
+            副本会话工厂，没有健康副本时返回 None
+        """
+        candidates = [i for i, ok in enumerate(self.healthy) if ok]
+        if not candidates:
+            return None
+        return self.session_makers[candidates[next(self._counter) % len(candidates)]]
+
+    def mark_unhealthy(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        """请求中发现副本连接失败时立即移出轮询，等待下次健康检查恢复。"""
+        for i, maker in enumerate(self.session_makers):
+            if maker is session_maker and self.healthy[i]:
+                self.healthy[i] = False
+                logger.warning(f"MySQL 只读副本不可用，已移出轮询: {self.engines[i].url.host}")
+
+    async def check(self) -> None:
+        """检查所有副本的可用性。"""
+        for i, replica in enumerate(self.engines):
+            try:
+                async with replica.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.check_interval)
+                ok = True
+            except Exception as e:
+                ok = False
+                if self.healthy[i]:
+                    logger.warning(f"MySQL 只读副本健康检查失败: {replica.url.host}, error={e}")
+            if ok and not self.healthy[i]:
+                logger.info(f"MySQL 只读副本已恢复: {replica.url.host}")
+            self.healthy[i] = ok
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def start(self) -> None:
+        """启动后台健康检查任务。"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """停止健康检查并关闭副本连接池。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for i, replica in enumerate(self.engines):
+            await replica.dispose()
+            unregister_engine(f"replica{i}")
+
+
+# 只读副本路由（未配置副本时为 None）
+replica_router: Optional[ReplicaRouter] = None
+
+
 def init_mysql() -> None:
     """初始化 MySQL 数据库连接。
 
     创建异步引擎和会话工厂，配置连接池参数。
-    连接池配置:
-    - pool_size=10: 保持 10 个连接在池中
-    - max_overflow=20: 最多可以额外创建 20 个连接
-    - pool_pre_ping=True: 使用连接前先 ping，确保连接有效
+    连接池配置（见 Settings 中的 db_pool_* 参数）:
+    - db_pool_size: 池中常驻的连接数（默认 10）
+    - db_max_overflow: 池满时最多额外创建的连接数（默认 20）
+    - db_pool_timeout: 借出连接的最长等待时间
+    - db_pool_recycle: 连接最长存活时间，避免使用被服务端关闭的连接
+    - db_pool_pre_ping: 使用连接前先 ping，确保连接有效
+
+    连接池的借出、等待、失效等指标由 pool_metrics 模块记录。
+
+    配置了 MYSQL_REPLICA_URLS 时同时为每个只读副本创建引擎；此时缓存后端不是 redis
+    会记录警告，因为读己之写标记无法跨进程共享。
 
     Raises:
         Exception: 数据库连接初始化失败时抛出异常
     """
-    global engine, async_session_maker
+    global engine, async_session_maker, replica_router
 
     try:
-        engine = create_async_engine(
-            settings.mysql_url,
-            echo=settings.debug,  # 调试模式下打印 SQL 语句
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            # 设置数据库连接的会话时区为东八区（北京时间）
-            connect_args={"init_command": "SET time_zone='+08:00'"}
-        )
-        async_session_maker = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False,  # 提交后不过期对象，避免延迟加载问题
-            autocommit=False,
-            autoflush=False,
-        )
+        engine = _create_engine(settings.mysql_url, "primary")
+        async_session_maker = _create_session_maker(engine)
         logger.info(f"MySQL 连接已初始化: {settings.mysql_host}:{settings.mysql_port}")
+
+        replica_urls = settings.mysql_replica_url_list
+        if replica_urls:
+            replica_router = ReplicaRouter(
+                [_create_engine(url, f"replica{i}") for i, url in enumerate(replica_urls)],
+                check_interval=settings.replica_health_check_interval,
+            )
+            logger.info(f"MySQL 只读副本已初始化: count={len(replica_urls)}")
+            if settings.cache_backend != "redis":
+                # 读己之写标记保存在 get_cache() 中，进程内缓存无法在 worker 之间共享
+                logger.warning(
+                    f"已配置 MySQL 只读副本但 CACHE_BACKEND={settings.cache_backend}，"
+                    f"读己之写窗口仅在写入所在进程内生效，多 worker 部署请使用 CACHE_BACKEND=redis"
+                )
     except Exception as e:
         logger.error(f"MySQL 连接初始化失败: {e}")
         raise
 
 
+def get_read_session_maker(prefer_primary: bool = False) -> async_sessionmaker[AsyncSession]:
+    """获取只读查询使用的会话工厂。
+
+    Args:
+        prefer_primary: 是否强制使用主库（如读己之写窗口内）
+
+    Returns:
+        健康副本的会话工厂；未配置副本、没有健康副本或 prefer_primary 时返回主库会话工厂
+
+    Raises:
+        RuntimeError: 数据库未初始化时抛出异常
+    """
+    if async_session_maker is None:
+        raise RuntimeError("MySQL 未初始化，请先调用 init_mysql()")
+    if replica_router is not None and not prefer_primary:
+        return replica_router.pick() or async_session_maker
+    return async_session_maker
+
+
 async def get_mysql_session() -> AsyncSession:
     """获取 MySQL 数据库会话（依赖注入函数）。
 
@@ -101,9 +256,13 @@ async def get_mysql_session() -> AsyncSession:
 
 async def close_mysql():
     """关闭 MySQL 数据库连接。"""
-    global engine
+    global engine, replica_router
+    if replica_router:
+        await replica_router.close()
+        replica_router = None
     if engine:
         await engine.dispose()
+        unregister_engine("primary")
         logger.info("MySQL 连接已关闭")
 
 
@@ -124,6 +283,8 @@ def init_milvus() -> bool:
         这允许应用在没有向量数据库的情况下继续运行基本功能。
     """
     global milvus_connected
+    # pymilvus 导入较慢，只在需要连接 Milvus 的进程中加载
+    from pymilvus import MilvusException, connections
 
     try:
         connections.connect(
@@ -150,12 +311,18 @@ def get_milvus_connection():
     """
     if not milvus_connected:
         raise RuntimeError("Milvus 未连接，请先调用 init_milvus()")
+    from pymilvus import connections
+
     return connections
 
 
 def close_milvus():
     """关闭 Milvus 连接。"""
     global milvus_connected
+    if not milvus_connected:
+        return
+    from pymilvus import MilvusException, connections
+
     try:
         connections.disconnect("default")
         milvus_connected = False
@@ -171,6 +338,8 @@ async def init_databases() -> None:
     注意：init_mysql() 虽然不是异步函数，但可以同步调用。
     """
     init_mysql()
+    if replica_router is not None:
+        replica_router.start()
     init_milvus()
 
 
@@ -1,17 +1,20 @@
 """依赖注入模块。"""
 
+from functools import lru_cache
 from typing import Annotated, AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from passlib.context import CryptContext
+from sqlalchemy.exc import InterfaceError, OperationalError
 
-from app.infrastructure.database import get_mysql_session, get_milvus_connection
+import app.infrastructure.database as database
+from app.infrastructure.database import get_mysql_session, get_milvus_connection, get_read_session_maker
 from app.infrastructure.config import Settings, get_settings
+from app.infrastructure.event_bus import EventBus, get_event_bus
 from app.services.llm_service import LLMService
 from app.services.embedding_service import EmbeddingService
 from app.services.milvus_service import MilvusService
-from app.core.security import pwd_context
+from app.core.security import get_pwd_context
 
 # 配置依赖
 SettingsDep = Annotated[Settings, Depends(get_settings)]
@@ -19,6 +22,53 @@ SettingsDep = Annotated[Settings, Depends(get_settings)]
 # MySQL 会话依赖
 MySQLSessionDep = Annotated[AsyncSession, Depends(get_mysql_session)]
 
+
+async def resolve_read_session_maker(user_id: int | None = None):
+    """为只读查询选择会话工厂。
+
+    配置了只读副本时按轮询分配到健康副本；user_id 对应的用户刚刚写入过数据
+    （读己之写窗口内）时走主库，保证用户能立即看到自己的修改。
+
+    Args:
+        user_id: 发起请求的用户 ID（可选）
+
+    Returns:
+        副本或主库的会话工厂
+    """
+    prefer_primary = False
+    if database.replica_router is not None and user_id is not None:
+        from app.services.change_tracker import has_recent_write
+
+        prefer_primary = await has_recent_write(user_id)
+    return get_read_session_maker(prefer_primary)
+
+
+async def get_mysql_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """获取只读数据库会话（依赖注入函数）。
+
+    根据请求的 user_id 路径或查询参数选择副本或主库，只能用于不写数据库的接口。
+
+    Args:
+        request: 请求对象（读取 user_id 参数）
+
+    Yields:
+        AsyncSession: 副本或主库的异步数据库会话
+    """
+    user_id = str(request.path_params.get("user_id") or request.query_params.get("user_id") or "")
+    session_maker = await resolve_read_session_maker(
+        int(user_id) if user_id and user_id.isdigit() else None
+    )
+    async with session_maker() as session:
+        try:
+            yield session
+        except (OperationalError, InterfaceError):
+            if database.replica_router is not None:
+                database.replica_router.mark_unhealthy(session_maker)
+            raise
+
+
+MySQLReadSessionDep = Annotated[AsyncSession, Depends(get_mysql_read_session)]
+
 # Milvus 连接依赖
 
 
@@ -58,9 +108,41 @@ async def get_current_user(
     return {"id": user_id, "name": "示例用户"}
 
 
+async def get_admin_user(
+    db: MySQLSessionDep,
+    admin_id: int = Query(..., description="管理员用户ID")
+):
+    """校验管理员身份（依赖注入函数）。
+
+    Args:
+        db: 数据库会话
+        admin_id: 管理员用户ID
+
+    Returns:
+        管理员用户对象
+
+    Raises:
+        HTTPException: 用户不存在、未激活或不是超级用户时返回 403 错误
+    """
+    from app.models.user import User
+
+    result = await db.execute(select(User).where(User.id == admin_id))
+    user = result.scalars().first()
+    if not user or not user.is_active or not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    return user
+
+
+AdminUserDep = Annotated[object, Depends(get_admin_user)]
+
+
 # LLM 服务依赖
+@lru_cache()
 def get_llm_service() -> LLMService:
-    """获取 LLM 服务单例。"""
+    """获取 LLM 服务单例（复用 HTTP 连接，启动预热时创建）。"""
     return LLMService()
 
 
@@ -68,6 +150,7 @@ LLMServiceDep = Annotated[LLMService, Depends(get_llm_service)]
 
 
 # Embedding 服务依赖
+@lru_cache()
 def get_embedding_service() -> EmbeddingService:
     """获取 Embedding 服务单例。"""
     return EmbeddingService()
@@ -77,8 +160,13 @@ EmbeddingServiceDep = Annotated[EmbeddingService, Depends(get_embedding_service)
 
 
 # Milvus 服务依赖
+@lru_cache()
 def get_milvus_service_obj() -> MilvusService:
-    """获取 Milvus 服务单例。"""
+    """获取 Milvus 服务单例。
+
+    首次创建时连接 Milvus 并检查集合，之后的请求直接复用；
+    创建失败时不缓存，下次请求重试。
+    """
     return MilvusService()
 
 
@@ -86,10 +174,13 @@ MilvusServiceDep = Annotated[MilvusService, Depends(get_milvus_service_obj)]
 
 
 # 密码服务依赖
-def get_password_service() -> CryptContext:
-    """获取密码服务（密码哈希上下文）。"""
-    return pwd_context
+def get_password_service():
+    """获取密码服务（密码哈希上下文，首次使用时加载 passlib）。"""
+    return get_pwd_context()
+
 
+PasswordServiceDep = Annotated[object, Depends(get_password_service)]
 
-PasswordServiceDep = Annotated[CryptContext, Depends(get_password_service)]
 
+# 事件总线依赖
+EventBusDep = Annotated[EventBus, Depends(get_event_bus)]
@@ -0,0 +1,191 @@
+"""事件总线模块。
+
+为 SSE 推送提供按用户分发的发布/订阅通道：
+- memory 后端：事件只在当前进程内分发，适合单进程部署
+- redis 后端：事件经 Redis Pub/Sub 广播，每个 API 进程的监听任务再分发给本地订阅者，
+  Celery worker 中产生的事件（如喝水提醒）也能推送到浏览器
+
+事件格式：{"user_id": int | None, "event": str, "data": dict}，user_id 为 None 表示广播给所有连接。
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any
+
+from app.core.json_codec import dumps_str, loads
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """进程内事件总线，可选 Redis 跨进程广播。"""
+
+    def __init__(self, backend: str = "memory", channel: str = "home:events", queue_size: int = 100):
+        """初始化事件总线。
+
+        Args:
+            backend: 后端类型（memory 或 redis）
+            channel: Redis 频道名称
+            queue_size: 每个订阅者的队列上限
+        """
+        self.backend = backend
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._listener_task: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前进程内的订阅连接数。"""
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """订阅某个用户的事件。
+
+        Args:
+            user_id: 用户 ID
+
+        Returns:
+            接收事件的队列，使用完毕后需调用 unsubscribe
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        """取消订阅。
+
+        Args:
+            user_id: 用户 ID
+            queue: subscribe 返回的队列
+        """
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    async def publish(self, user_id: int | None, event: str, data: dict[str, Any]) -> None:
+        """发布事件。
+
+        redis 后端下事件由各进程的监听任务统一分发（包括本进程）；
+        Redis 不可用时退化为仅本进程分发，避免事件完全丢失。
+
+        Args:
+            user_id: 目标用户 ID，None 表示广播给所有订阅者
+            event: 事件类型（如 behavior.created）
+            data: 事件数据（需可 JSON 序列化）
+        """
+        message = {"user_id": user_id, "event": event, "data": data}
+
+        if self.backend == "redis":
+            from app.infrastructure.redis_client import get_redis
+
+            try:
+                await get_redis().publish(self.channel, dumps_str(message))
+                return
+            except Exception as e:
+                logger.warning(f"事件发布到 Redis 失败，改为进程内分发: event={event}, error={e}")
+
+        self.dispatch(message)
+
+    def dispatch(self, message: dict[str, Any]) -> None:
+        """把事件投递给本进程内的订阅者。
+
+        队列已满的订阅者（慢消费者）会丢弃本条事件，不阻塞发布方。
+
+        Args:
+            message: 事件消息
+        """
+        user_id = message.get("user_id")
+        if user_id is None:
+            targets = [q for queues in self._subscribers.values() for q in queues]
+        else:
+            targets = list(self._subscribers.get(user_id, ()))
+
+        for queue in targets:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning(f"SSE 订阅队列已满，丢弃事件: user_id={user_id}, event={message.get('event')}")
+
+    async def start(self) -> None:
+        """启动 Redis 监听任务（memory 后端无需启动）。"""
+        if self.backend == "redis" and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+            logger.info(f"事件总线已启动: backend=redis, channel={self.channel}")
+
+    async def stop(self) -> None:
+        """停止 Redis 监听任务。"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+            logger.info("事件总线已停止")
+
+    async def _listen(self) -> None:
+        """订阅 Redis 频道并分发事件，连接断开后自动重连。"""
+        from app.infrastructure.redis_client import get_redis
+
+        backoff = 1.0
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 1.0
+                async for raw in pubsub.listen():
+                    if raw.get("type") != "message":
+                        continue
+                    try:
+                        self.dispatch(loads(raw["data"]))
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"忽略无法解析的事件: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis 事件监听中断，{backoff:.0f}s 后重连: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+@lru_cache()
+def get_event_bus() -> EventBus:
+    """获取事件总线单例。
+
+    Returns:
+        EventBus: 根据配置创建的事件总线
+    """
+    settings = get_settings()
+    return EventBus(
+        backend=settings.event_bus_backend,
+        channel=settings.event_bus_channel,
+        queue_size=settings.sse_queue_size,
+    )
+
+
+async def publish_user_event(user_id: int | None, event: str, data: dict[str, Any]) -> None:
+    """发布用户事件（尽力而为）。
+
+    推送失败只记录日志，不影响调用方已经提交的写操作。
+
+    Args:
+        user_id: 目标用户 ID，None 表示广播
+        event: 事件类型
+        data: 事件数据
+    """
+    try:
+        await get_event_bus().publish(user_id, event, data)
+    except Exception as e:
+        logger.warning(f"事件推送失败: user_id={user_id}, event={event}, error={e}")
@@ -0,0 +1,636 @@
+"""指标采集模块。
+
+提供计数器、仪表和预分桶直方图三类指标，以及 Prometheus 文本格式输出。
+
+热点路径开销：
+- 标签组合对应的子指标在首次使用时创建并缓存，之后 labels() 只是一次字典查找，
+  调用方也可以把子指标保存下来直接调用 inc()/observe()
+- 直方图的桶边界在创建时固定，observe() 只做一次二分查找和两次加法
+
+多进程部署时通过 SnapshotExporter 把各进程的快照写入共享目录，采集时合并。
+仪表默认按进程求和（连接数、进行中请求数等总量）；状态、比例和平均值这类不能相加的仪表
+在创建时指定合并方式：max（取最大值，如熔断器状态）、avg（取平均）或 pid（按进程分别输出，
+附加 pid 标签）。
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 仪表跨进程的合并方式
+GAUGE_MERGE_MODES = ("sum", "max", "avg", "pid")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """指标基类，按标签值缓存子指标。"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """获取标签值对应的子指标（首次调用时创建）。
+
+        Args:
+            *values: 与 labelnames 顺序一致的标签值
+
+        Returns:
+            子指标
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def dump(self) -> dict:
+        """导出为可序列化的快照，用于跨进程合并。"""
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self._dump_samples(),
+        }
+
+    def _dump_samples(self) -> list:
+        return [[list(k), c.value] for k, c in self._children.items()]
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """单调递增计数器（名称按惯例以 _total 结尾）。"""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """无标签计数器加一。"""
+        self._default.inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """可增可减的仪表，也可以注册回调在采集时计算当前值。"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), merge: str = "sum"):
+        """初始化仪表。
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名称
+            merge: 多进程快照的合并方式（sum / max / avg / pid）
+        """
+        if merge not in GAUGE_MERGE_MODES:
+            raise ValueError(f"仪表 {name} 的合并方式 {merge} 无效，可选 {GAUGE_MERGE_MODES}")
+        self.merge = merge
+        self._callbacks: list[Callable[[], Iterable[tuple[tuple[str, ...], float]]]] = []
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """设置无标签仪表的值。"""
+        self._default.set(value)
+
+    def set_function(self, func: Callable[[], Iterable[tuple[tuple[str, ...], float]]]) -> None:
+        """注册采集回调，返回 [(标签值元组, 数值), ...]。"""
+        self._callbacks.append(func)
+
+    def dump(self):
+        data = super().dump()
+        data["merge"] = self.merge
+        return data
+
+    def _dump_samples(self):
+        result = super()._dump_samples()
+        for func in self._callbacks:
+            for values, value in func():
+                result.append([list(values), value])
+        return result
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # 最后一个桶对应 +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """按桶上界估算分位数（偏保守）。"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            cumulative += c
+            if cumulative >= target:
+                return self.bounds[i] if i < len(self.bounds) else math.inf
+        return math.inf
+
+    def summary(self) -> dict:
+        """导出计数、均值和分位数估算值。"""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Histogram(_Metric):
+    """预分桶直方图。"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        self.bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """记录无标签直方图的一次观测。"""
+        self._default.observe(value)
+
+    def dump(self):
+        data = super().dump()
+        data["buckets"] = list(self.bounds)
+        return data
+
+    def _dump_samples(self):
+        return [[list(k), list(c.counts), c.sum, c.count] for k, c in self._children.items()]
+
+
+class MetricsRegistry:
+    """指标注册表。同名指标只创建一次。"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"指标 {name} 已注册为 {metric.type_name}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """获取或创建计数器。"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        merge: str = "sum"
+    ) -> Gauge:
+        """获取或创建仪表。
+
+        Args:
+            merge: 多进程快照的合并方式，见 GAUGE_MERGE_MODES
+        """
+        return self._get_or_create(Gauge, name, documentation, labelnames, merge)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """获取或创建直方图。"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> _Metric | None:
+        """按名称获取指标。"""
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict:
+        """导出全部指标的快照。
+
+        Returns:
+            包含进程号、时间戳和各指标数据的字典
+        """
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {name: metric.dump() for name, metric in self._metrics.items()},
+        }
+
+    def render(self) -> str:
+        """渲染本进程的全部指标为 Prometheus 文本格式。"""
+        return render_snapshots([self.snapshot()])
+
+
+def merge_snapshots(snapshots: list[dict], gauge_max_age: float | None = None) -> dict:
+    """合并多个进程的指标快照。
+
+    计数器和直方图按标签累加；仪表按各自的合并方式（sum / max / avg / pid）合并，
+    且只合并 gauge_max_age 秒内写入的快照，已退出进程的连接数等瞬时值不再计入，
+    而它们的累计计数仍然保留。
+
+    Args:
+        snapshots: registry.snapshot() 的结果列表
+        gauge_max_age: 仪表快照的最大有效期（秒），None 表示不限制
+
+    Returns:
+        指标名 -> 合并后的指标数据
+    """
+    now = time.time()
+    merged: dict[str, dict] = {}
+    for snap in snapshots:
+        fresh = gauge_max_age is None or now - snap.get("time", 0) <= gauge_max_age
+        for name, data in snap.get("metrics", {}).items():
+            if data["type"] == "gauge" and not fresh:
+                continue
+            mode = data.get("merge", "sum")
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**data, "samples": {}}
+                if mode == "pid":
+                    target["labelnames"] = [*data["labelnames"], "pid"]
+            elif (
+                target["type"] != data["type"]
+                or target.get("buckets") != data.get("buckets")
+                or target.get("merge", "sum") != mode
+            ):
+                logger.warning(f"指标 {name} 在不同进程中的定义不一致，已跳过 pid={snap.get('pid')}")
+                continue
+            samples = target["samples"]
+            for sample in data["samples"]:
+                key = tuple(sample[0])
+                if mode == "pid":
+                    samples[(*key, str(snap.get("pid")))] = sample[1]
+                elif mode == "max":
+                    samples[key] = max(samples.get(key, -math.inf), sample[1])
+                elif mode == "avg":
+                    total, count = samples.get(key, (0.0, 0))
+                    samples[key] = (total + sample[1], count + 1)
+                elif data["type"] == "histogram":
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = [list(sample[1]), sample[2], sample[3]]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], sample[1])]
+                        current[1] += sample[2]
+                        current[2] += sample[3]
+                else:
+                    samples[key] = samples.get(key, 0) + sample[1]
+    for data in merged.values():
+        if data.get("merge") == "avg":
+            data["samples"] = {key: total / count for key, (total, count) in data["samples"].items()}
+    return merged
+
+
+def render_snapshots(snapshots: list[dict], gauge_max_age: float | None = None) -> str:
+    """合并快照并渲染为 Prometheus 文本格式。
+
+    Args:
+        snapshots: registry.snapshot() 的结果列表
+        gauge_max_age: 仪表快照的最大有效期（秒）
+
+    Returns:
+        Prometheus 文本格式（version 0.0.4）
+    """
+    lines: list[str] = []
+    for name, data in merge_snapshots(snapshots, gauge_max_age).items():
+        labelnames = tuple(data["labelnames"])
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        for key, value in data["samples"].items():
+            if data["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, c in zip(list(data["buckets"]) + [math.inf], counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotExporter:
+    """多进程指标导出。
+
+    每个进程（uvicorn worker、Celery worker 子进程）定期把本进程的指标快照
+    写入共享目录下的 metrics-<pid>.json，/metrics 请求时读取目录中的全部快照合并输出。
+    未配置目录时只输出本进程的指标。
+    """
+
+    def __init__(self, directory: str = "", interval: float = 5, source: MetricsRegistry | None = None):
+        """初始化导出器。
+
+        Args:
+            directory: 快照目录，留空表示单进程模式
+            interval: 快照写入间隔（秒）
+            source: 指标注册表，默认为进程级注册表
+        """
+        self.directory = directory
+        self.interval = interval
+        self.registry = source or registry
+        self._last_write = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def write(self, snapshot: dict | None = None) -> None:
+        """写入本进程快照（先写临时文件再替换，读取方不会读到半个文件）。
+
+        Args:
+            snapshot: 已导出的快照，None 时当场导出
+        """
+        if not self.directory:
+            return
+        if snapshot is None:
+            snapshot = self.registry.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._last_write = time.monotonic()
+
+    def maybe_write(self) -> None:
+        """距上次写入超过间隔时写入快照，供没有事件循环的 Celery worker 在任务结束时调用。"""
+        if self.directory and time.monotonic() - self._last_write >= self.interval:
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"写入指标快照失败: {e}")
+
+    def read_others(self) -> list[dict]:
+        """读取其他进程写入的快照。"""
+        own = os.path.basename(self.path)
+        snapshots = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return snapshots
+        for name in names:
+            if not name.startswith("metrics-") or not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取指标快照失败: file={name}, error={e}")
+        return snapshots
+
+    async def collect(self) -> str:
+        """合并本进程实时指标与其他进程的快照，渲染为 Prometheus 文本格式。
+
+        本进程的快照在事件循环中导出（指标只在事件循环中修改，无需加锁），
+        读取快照文件和合并渲染放到线程中执行。
+        """
+        own = self.registry.snapshot()
+        if not self.directory:
+            return render_snapshots([own])
+
+        def _merge() -> str:
+            return render_snapshots([own, *self.read_others()], gauge_max_age=self.interval * 3)
+
+        return await asyncio.to_thread(_merge)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write, self.registry.snapshot())
+            except OSError as e:
+                logger.warning(f"写入指标快照失败: {e}")
+
+    def start(self) -> None:
+        """启动定期写入快照的后台任务（单进程模式下不启动）。"""
+        if self.directory and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台任务并写入最后一次快照，保留本进程的累计计数。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            self.write()
+        except OSError as e:
+            logger.warning(f"写入指标快照失败: {e}")
+
+
+# 进程级默认注册表
+registry = MetricsRegistry()
+
+
+@lru_cache()
+def get_exporter() -> SnapshotExporter:
+    """获取指标导出器单例。
+
+    Returns:
+        SnapshotExporter: 根据配置创建的导出器
+    """
+    settings = get_settings()
+    return SnapshotExporter(settings.metrics_dir, settings.metrics_snapshot_interval)
+
+
+# ============== 通用指标 ==============
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP 请求数", ["method", "route", "status"]
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP 请求处理时间（秒）", ["method", "route"]
+)
+dependency_duration = registry.histogram(
+    "dependency_call_duration_seconds",
+    "外部依赖调用耗时（秒）",
+    ["dependency", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+task_duration = registry.histogram(
+    "celery_task_duration_seconds",
+    "Celery 任务执行时间（秒）",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+background_task_failures = registry.counter(
+    "background_task_failures_total", "后台任务失败次数", ["task"]
+)
+deferred_work = registry.counter(
+    "deferred_work_total", "因外部服务繁忙延后处理的工作数", ["task"]
+)
+admission_concurrency = registry.gauge(
+    "admission_concurrency", "外部调用准入控制的并发上限、进行中和排队数", ["dependency", "state"]
+)
+admission_rejected = registry.counter(
+    "admission_rejected_total", "外部调用准入被拒绝次数", ["dependency", "reason"]
+)
+admission_limit_decreases = registry.counter(
+    "admission_limit_decreases_total", "外部调用并发上限下调次数", ["dependency", "reason"]
+)
+admission_wait = registry.histogram(
+    "admission_wait_seconds",
+    "外部调用排队等待时间（秒）",
+    ["dependency"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+semantic_descriptions = registry.counter(
+    "semantic_descriptions_total",
+    "生成的语义描述数（single 逐条，packed 合并生成，fallback 合并结果无效后逐条补生成）",
+    ["mode"],
+)
+llm_time_to_first_token = registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "流式生成的首个 token 延迟（秒）",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+llm_tokens_per_second = registry.histogram(
+    "llm_tokens_per_second",
+    "流式生成首个 token 之后的生成速度（token/秒）",
+    buckets=(1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300),
+)
+provider_requests = registry.counter(
+    "provider_requests_total", "按服务商统计的外部调用次数", ["dependency", "provider", "outcome"]
+)
+provider_routing = registry.gauge(
+    "provider_routing",
+    "服务商路由估计值（权重、错误率、延迟 EWMA、p95 延迟），路由器为进程内对象，按进程分别输出",
+    ["dependency", "provider", "stat"],
+    merge="pid",
+)
+provider_hedges = registry.counter(
+    "provider_hedges_total", "发送对冲请求的次数，按先返回的一方统计", ["dependency", "winner"]
+)
+provider_hedges_throttled = registry.counter(
+    "provider_hedges_throttled_total", "超过对冲预算而未发送对冲请求的次数", ["dependency"]
+)
+provider_failovers = registry.counter(
+    "provider_failovers_total", "主服务商故障后改用其他服务商重试的次数", ["dependency"]
+)
+circuit_state = registry.gauge(
+    "circuit_breaker_state",
+    "外部服务熔断器状态（0 关闭，1 半开，2 打开；多进程取最严重的状态）",
+    ["dependency"],
+    merge="max",
+)
+circuit_transitions = registry.counter(
+    "circuit_breaker_transitions_total", "外部服务熔断器状态变化次数", ["dependency", "state"]
+)
+
+
+@contextmanager
+def track_dependency(name: str):
+    """记录一次外部依赖调用的耗时，按成功/失败分别统计。
+
+    Args:
+        name: 依赖名称（如 llm_generate、milvus_search）
+
+    Example:
+        with track_dependency("milvus_search"):
+            collection.search(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        dependency_duration.labels(name, "error").observe(time.perf_counter() - start)
+        raise
+    dependency_duration.labels(name, "success").observe(time.perf_counter() - start)
@@ -0,0 +1,187 @@
+"""数据库连接池指标模块。
+
+通过 SQLAlchemy 连接池事件和自定义连接池类记录：
+- 借出次数、借出等待时间（含池满排队和新建连接）、等待超时次数
+- 连接被借出的持有时长
+- 新建连接数、连接失效次数、连接关闭时的存活时长
+- pre-ping 耗时
+- 当前池大小、已借出、空闲和溢出连接数（采集时读取）
+
+这些数据用于按实际负载调整 API 进程与 Celery worker 的连接池参数。
+"""
+
+import time
+
+from greenlet import getcurrent
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.metrics import registry
+
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AGE_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 14400, 28800)
+
+checkouts = registry.counter("db_pool_checkouts_total", "连接借出次数", ["pool"])
+checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "借出连接的等待时间（秒）", ["pool"], WAIT_BUCKETS
+)
+checkout_timeouts = registry.counter("db_pool_checkout_timeouts_total", "借出连接等待超时次数", ["pool"])
+hold_time = registry.histogram("db_pool_hold_seconds", "连接被借出的持有时长（秒）", ["pool"])
+connections_created = registry.counter("db_pool_connections_created_total", "新建数据库连接数", ["pool"])
+invalidations = registry.counter("db_pool_invalidations_total", "连接失效次数", ["pool", "soft"])
+connection_age = registry.histogram(
+    "db_pool_connection_age_seconds", "连接关闭时的存活时长（秒）", ["pool"], AGE_BUCKETS
+)
+pre_ping = registry.histogram(
+    "db_pool_pre_ping_seconds", "pre-ping 耗时（秒）", ["pool"], WAIT_BUCKETS
+)
+pool_state = registry.gauge("db_pool_connections", "当前连接数（按状态）", ["pool", "state"])
+
+# 已注册的连接池：名称 -> 引擎
+_engines: dict[str, AsyncEngine] = {}
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录借出等待时间的异步连接池。"""
+
+    # 由 instrument_engine 设置
+    metrics_name = "default"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # QueuePool._do_get 会在池满时递归重试，只在最外层计时
+        self._timing: set = set()
+
+    def _do_get(self):
+        current = getcurrent()
+        if current in self._timing:
+            return super()._do_get()
+
+        self._timing.add(current)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            checkout_timeouts.labels(self.metrics_name).inc()
+            raise
+        finally:
+            self._timing.discard(current)
+            checkout_wait.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """为引擎的连接池注册指标事件。
+
+    Args:
+        engine: 异步引擎
+        name: 指标中的连接池名称（如 primary、replica0）
+    """
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.metrics_name = name
+    _engines[name] = engine
+
+    checkout_count = checkouts.labels(name)
+    hold = hold_time.labels(name)
+    created = connections_created.labels(name)
+    age = connection_age.labels(name)
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        created.inc()
+        connection_record.info["created_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkout_count.inc()
+        connection_record.info["checkout_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        if started is not None:
+            hold.observe(time.monotonic() - started)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        invalidations.labels(name, "false").inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        invalidations.labels(name, "true").inc()
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        created_at = connection_record.info.pop("created_at", None)
+        if created_at is not None:
+            age.observe(time.monotonic() - created_at)
+
+    # pre-ping 没有对应事件，包装方言实例的 do_ping 计时
+    dialect = engine.sync_engine.dialect
+    original_ping = dialect.do_ping
+    ping = pre_ping.labels(name)
+
+    def timed_ping(dbapi_connection):
+        start = time.perf_counter()
+        try:
+            return original_ping(dbapi_connection)
+        finally:
+            ping.observe(time.perf_counter() - start)
+
+    dialect.do_ping = timed_ping
+
+
+def unregister_engine(name: str) -> None:
+    """引擎关闭后停止采集其连接池状态。"""
+    _engines.pop(name, None)
+
+
+def _collect_pool_state():
+    for name, engine in list(_engines.items()):
+        pool = engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        yield (name, "size"), pool.size()
+        yield (name, "checked_out"), pool.checkedout()
+        yield (name, "checked_in"), pool.checkedin()
+        # QueuePool.overflow() 在池未填满时为负数
+        yield (name, "overflow"), max(0, pool.overflow())
+
+
+pool_state.set_function(_collect_pool_state)
+
+
+def pool_stats() -> dict:
+    """汇总各连接池的当前状态与累计指标。
+
+    Returns:
+        以连接池名称为键的统计字典
+    """
+    state: dict[str, dict] = {}
+    for (name, key), value in _collect_pool_state():
+        state.setdefault(name, {})[key] = value
+
+    result = {}
+    for name, engine in _engines.items():
+        pool = engine.sync_engine.pool
+        result[name] = {
+            "config": {
+                "pool_size": pool.size() if hasattr(pool, "size") else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "timeout": getattr(pool, "_timeout", None),
+                "recycle": pool._recycle,
+                "pre_ping": pool._pre_ping,
+            },
+            "state": state.get(name, {}),
+            "checkouts": checkouts.labels(name).value,
+            "checkout_timeouts": checkout_timeouts.labels(name).value,
+            "connections_created": connections_created.labels(name).value,
+            "invalidations": invalidations.labels(name, "false").value,
+            "soft_invalidations": invalidations.labels(name, "true").value,
+            "checkout_wait_seconds": checkout_wait.labels(name).summary(),
+            "hold_seconds": hold_time.labels(name).summary(),
+            "connection_age_seconds": connection_age.labels(name).summary(),
+            "pre_ping_seconds": pre_ping.labels(name).summary(),
+        }
+    return result
@@ -0,0 +1,47 @@
+"""Redis 客户端模块。
+
+提供按事件循环缓存的异步 Redis 客户端。
+Celery 任务通过 run_async 为每次执行创建新的事件循环，
+异步连接不能跨循环复用，因此客户端与创建它的事件循环绑定。
+"""
+
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_client: Redis | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_redis() -> Redis:
+    """获取当前事件循环对应的异步 Redis 客户端。
+
+    Returns:
+        Redis: 异步 Redis 客户端（连接池按需建立连接）
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = Redis.from_url(settings.redis_url, decode_responses=True)
+        _client_loop = loop
+    return _client
+
+
+async def close_redis() -> None:
+    """关闭当前缓存的 Redis 客户端。"""
+    global _client, _client_loop
+
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning(f"Redis 连接关闭失败: {e}")
+        _client = None
+        _client_loop = None
@@ -0,0 +1,194 @@
+"""启动预热模块。
+
+应用启动后在后台并发执行以下预热，使部署后的第一个请求不再承担初始化开销：
+- mysql: 预先建立 WARMUP_DB_CONNECTIONS 个连接放入主库和各只读副本的连接池
+- milvus: 创建 MilvusService（连接、检查集合）并把集合加载到内存
+- llm: 创建 LLM 客户端（导入 LangChain / OpenAI SDK）
+
+/ready 在预热完成且所有必需依赖成功前返回 503，负载均衡据此决定何时转发流量；
+必需依赖失败时在后台按 WARMUP_RETRY_INTERVAL 重试，成功后恢复就绪。
+/health 只表示进程存活，不受预热影响。
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import app.infrastructure.database as database
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+OK = "ok"
+FAILED = "failed"
+
+
+class Warmup:
+    """启动预热与就绪状态。"""
+
+    def __init__(
+        self,
+        checks: dict[str, tuple[Callable[[], Awaitable], bool]],
+        timeout: float = 30,
+        retry_interval: float = 5,
+    ):
+        """初始化预热。
+
+        Args:
+            checks: 依赖名称 -> (预热协程函数, 是否为就绪的必需依赖)
+            timeout: 单个依赖的预热超时时间（秒）
+            retry_interval: 必需依赖失败后的重试间隔（秒）
+        """
+        self.checks = checks
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.done = False
+        self.results: dict[str, dict] = {
+            name: {"status": PENDING, "required": required} for name, (_, required) in checks.items()
+        }
+        self._task: asyncio.Task | None = None
+
+    async def _run_check(self, name: str, func: Callable[[], Awaitable]) -> None:
+        result = self.results[name]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(func(), timeout=self.timeout)
+            result["status"] = OK
+            result.pop("error", None)
+        except Exception as e:
+            result["status"] = FAILED
+            result["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            log = logger.error if result["required"] else logger.warning
+            log(f"预热失败: {name}, error={result['error']}")
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def run(self) -> None:
+        """并发执行所有预热，完成后标记就绪状态。"""
+        start = time.perf_counter()
+        await asyncio.gather(*(self._run_check(name, func) for name, (func, _) in self.checks.items()))
+        self.done = True
+        summary = ", ".join(f"{name}={r['status']}({r['duration_ms']}ms)" for name, r in self.results.items())
+        logger.info(f"启动预热完成: {(time.perf_counter() - start) * 1000:.0f}ms, {summary}")
+
+    def _failed_required(self) -> list[str]:
+        return [name for name, r in self.results.items() if r["required"] and r["status"] == FAILED]
+
+    async def run_until_ready(self) -> None:
+        """执行预热，之后按间隔重试失败的必需依赖，直到全部成功。
+
+        可选依赖失败不影响就绪，不重试。
+        """
+        await self.run()
+        while failed := self._failed_required():
+            await asyncio.sleep(self.retry_interval)
+            await asyncio.gather(*(self._run_check(name, self.checks[name][0]) for name in failed))
+            recovered = [name for name in failed if self.results[name]["status"] == OK]
+            if recovered:
+                logger.info(f"预热重试成功: {', '.join(recovered)}")
+
+    def start(self) -> None:
+        """在后台启动预热任务（含必需依赖的失败重试）。"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_until_ready())
+
+    async def stop(self) -> None:
+        """取消未完成的预热任务。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """预热已完成且所有必需依赖成功。"""
+        return self.done and all(r["status"] == OK for r in self.results.values() if r["required"])
+
+    def status(self) -> dict:
+        """获取就绪状态与各依赖的预热结果。
+
+        Returns:
+            dict: status 为 ready / starting / unavailable，checks 为各依赖结果
+        """
+        if self.ready:
+            status = "ready"
+        else:
+            status = "unavailable" if self.done else "starting"
+        return {"status": status, "checks": self.results}
+
+
+async def open_pool_connections(engine: AsyncEngine, count: int) -> None:
+    """同时借出 count 个连接并执行 SELECT 1，归还后留在连接池中。
+
+    连接同时持有，确保建立的是 count 个不同的连接，而不是反复复用同一个。
+
+    Args:
+        engine: 异步引擎
+        count: 连接数
+    """
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(count))
+        )
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
+
+
+async def warm_mysql() -> None:
+    """预先建立主库和只读副本的连接。"""
+    settings = get_settings()
+    if database.engine is None:
+        raise RuntimeError("MySQL 未初始化")
+    # 超过 pool_size 的连接归还时会被关闭，预热数量不超过常驻连接数
+    count = min(settings.warmup_db_connections, settings.db_pool_size)
+    engines = [database.engine]
+    if database.replica_router is not None:
+        engines.extend(database.replica_router.engines)
+    await asyncio.gather(*(open_pool_connections(e, count) for e in engines))
+
+
+async def warm_milvus() -> None:
+    """连接 Milvus、检查集合并加载到内存（同步调用，在线程中执行）。"""
+    from app.infrastructure.dependencies import get_milvus_service_obj
+
+    def _load() -> None:
+        get_milvus_service_obj().load()
+
+    await asyncio.to_thread(_load)
+
+
+async def warm_llm() -> None:
+    """创建 LLM 客户端单例。"""
+    from app.infrastructure.dependencies import get_llm_service
+
+    await asyncio.to_thread(get_llm_service)
+
+
+@lru_cache()
+def get_warmup() -> Warmup:
+    """获取预热单例。
+
+    MySQL 为就绪的必需依赖；Milvus 和 LLM 失败时仅影响语义记忆功能，
+    记录在就绪状态中但不阻止接收流量。
+
+    Returns:
+        Warmup: 当前进程的预热实例
+    """
+    settings = get_settings()
+    return Warmup(
+        {
+            "mysql": (warm_mysql, True),
+            "milvus": (warm_milvus, False),
+            "llm": (warm_llm, False),
+        },
+        timeout=settings.warmup_timeout,
+        retry_interval=settings.warmup_retry_interval,
+    )
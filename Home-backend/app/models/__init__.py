@@ -3,6 +3,6 @@
 from app.models.user import User
 from app.models.behavior import Behavior
 from app.models.action import UserActionLog
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationArchive
 
-__all__ = ["User", "Behavior", "UserActionLog", "Notification"]
\ No newline at end of file
+__all__ = ["User", "Behavior", "UserActionLog", "Notification", "NotificationArchive"]
\ No newline at end of file
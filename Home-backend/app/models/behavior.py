@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Text
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.infrastructure.database import Base
 
@@ -7,6 +7,12 @@ class Behavior(Base):
     """用户行为表模型。"""
 
     __tablename__ = "behaviors"
+    __table_args__ = (
+        # 行为列表游标分页: WHERE user_id = ? ORDER BY timestamp DESC, id DESC
+        Index("ix_behaviors_user_timestamp_id", "user_id", "timestamp", "id"),
+        # 语义记忆补处理: WHERE semantic_content IS NULL AND timestamp BETWEEN ? AND ? ORDER BY timestamp, id
+        Index("ix_behaviors_timestamp_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, comment="行为记录ID")
     user_id = Column(Integer, index=True, nullable=False, comment="用户ID")
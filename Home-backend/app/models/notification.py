@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Computed, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.infrastructure.database import Base
 
@@ -6,6 +6,12 @@ class Notification(Base):
     """Notification model for Message Center."""
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        # 消息列表游标分页: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+        # 同一用户同一折叠键最多一条未读通知，供 INSERT ... ON DUPLICATE KEY UPDATE 折叠重复提醒
+        Index("ux_notifications_user_unread_collapse", "user_id", "unread_collapse_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, comment="Notification ID")
     user_id = Column(Integer, index=True, nullable=False, comment="User ID")
@@ -14,6 +20,40 @@ class Notification(Base):
     content = Column(Text, nullable=True, comment="Notification Content")
     is_read = Column(Boolean, default=False, index=True, comment="Is Read")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, comment="Creation Time")
+    collapse_key = Column(String(100), nullable=True, comment="Collapse Key for repeated notifications")
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1", comment="Collapsed Occurrences")
+    updated_at = Column(DateTime(timezone=True), nullable=True, comment="Last Occurrence Time")
+    # 仅未读通知携带折叠键，标记已读后自动变为 NULL，下一次同类事件会新建一条通知
+    unread_collapse_key = Column(
+        String(100),
+        Computed("CASE WHEN is_read = 0 THEN collapse_key END", persisted=False),
+        comment="Collapse Key while unread"
+    )
 
     def __repr__(self) -> str:
         return f"<Notification(id={self.id}, user_id={self.user_id}, title={self.title})>"
+
+
+class NotificationArchive(Base):
+    """Archived notifications moved out of the live table by the retention job."""
+
+    __tablename__ = "notifications_archive"
+    __table_args__ = (
+        Index("ix_notifications_archive_user_created", "user_id", "created_at"),
+    )
+
+    # 保留原通知 ID，便于追溯
+    id = Column(Integer, primary_key=True, autoincrement=False, comment="Original Notification ID")
+    user_id = Column(Integer, nullable=False, comment="User ID")
+    category = Column(String(50), nullable=False, comment="Category: system, reminder, alert")
+    title = Column(String(255), nullable=False, comment="Notification Title")
+    content = Column(Text, nullable=True, comment="Notification Content")
+    is_read = Column(Boolean, default=False, comment="Is Read")
+    created_at = Column(DateTime(timezone=True), nullable=True, comment="Creation Time")
+    collapse_key = Column(String(100), nullable=True, comment="Collapse Key for repeated notifications")
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1", comment="Collapsed Occurrences")
+    updated_at = Column(DateTime(timezone=True), nullable=True, comment="Last Occurrence Time")
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), comment="Archive Time")
+
+    def __repr__(self) -> str:
+        return f"<NotificationArchive(id={self.id}, user_id={self.user_id}, title={self.title})>"
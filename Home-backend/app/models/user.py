@@ -1,6 +1,6 @@
 """用户数据模型。"""
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from app.infrastructure.database import Base
 
@@ -9,6 +9,10 @@ class User(Base):
     """用户表模型。"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # 用户列表游标分页: ORDER BY created_at DESC, id DESC
+        Index("ix_users_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, comment="用户ID")
     username = Column(String(50), unique=True, index=True, nullable=False, comment="用户名")
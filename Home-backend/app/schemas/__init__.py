@@ -1,10 +1,17 @@
 """Pydantic 数据模式模块。"""
 
-from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, UserListResponse
+from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, UserProfile, UserListResponse
 from app.schemas.behavior import BehaviorCreate, BehaviorResponse, BehaviorQuery
 from app.schemas.action import UserActionCreate, UserAction
-from app.schemas.notification import NotificationDTO, NotificationCategory
+from app.schemas.notification import (
+    NotificationDTO,
+    NotificationCategory,
+    NotificationCreate,
+    NotificationBroadcast,
+    NotificationReadRequest,
+)
 from app.schemas.llm import LLMRequest, LLMResponse
+from app.schemas.dashboard import DashboardResponse
 
 __all__ = [
     # User schemas
@@ -12,6 +19,7 @@ __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserProfile",
     "UserListResponse",
     # Behavior schemas
     "BehaviorCreate",
@@ -23,7 +31,12 @@ __all__ = [
     # Notification schemas
     "NotificationDTO",
     "NotificationCategory",
+    "NotificationCreate",
+    "NotificationBroadcast",
+    "NotificationReadRequest",
     # LLM schemas
     "LLMRequest",
     "LLMResponse",
+    # Dashboard schemas
+    "DashboardResponse",
 ]
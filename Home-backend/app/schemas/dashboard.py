@@ -0,0 +1,16 @@
+"""仪表盘聚合数据 Schema。"""
+
+from pydantic import BaseModel, Field
+
+from app.schemas.behavior import BehaviorResponse
+from app.schemas.notification import NotificationDTO
+from app.schemas.user import UserResponse
+
+
+class DashboardResponse(BaseModel):
+    """仪表盘首屏数据。"""
+
+    user: UserResponse = Field(..., description="用户信息")
+    recent_behaviors: list[BehaviorResponse] = Field(..., description="最近动态，按时间倒序")
+    unread_count: int = Field(..., description="未读通知数量")
+    latest_notifications: list[NotificationDTO] = Field(..., description="最新通知，按时间倒序")
@@ -15,3 +15,37 @@ class LLMResponse(BaseModel):
 
     response: str = Field(..., description="LLM 生成的回复")
     model: str = Field(..., description="使用的模型名称")
+
+
+class LLMBatchRequest(BaseModel):
+    """批量生成请求模型。"""
+
+    requests: list[LLMRequest] = Field(..., min_length=1, max_length=200, description="生成请求列表")
+
+
+class LLMBatchItem(BaseModel):
+    """批量生成中单个请求的结果。"""
+
+    index: int = Field(..., description="在请求列表中的位置")
+    response: str | None = Field(None, description="LLM 生成的回复，失败时为空")
+    error: str | None = Field(None, description="失败原因")
+    retry_after: float | None = Field(None, description="因繁忙或熔断失败时建议的重试等待时间（秒）")
+
+
+class LLMBatchResponse(BaseModel):
+    """批量生成响应模型。"""
+
+    model: str = Field(..., description="使用的模型名称")
+    results: list[LLMBatchItem] = Field(..., description="与请求列表顺序一致的结果")
+    succeeded: int = Field(..., description="成功数")
+    failed: int = Field(..., description="失败数")
+
+
+class LLMStreamStats(BaseModel):
+    """流式生成统计（SSE done 事件的数据）。"""
+
+    model: str = Field(..., description="使用的模型名称")
+    tokens: int = Field(0, description="生成的 token 数（服务商未返回用量时为文本片段数）")
+    ttft_ms: float | None = Field(None, description="首个 token 延迟（毫秒），含排队时间")
+    duration_ms: float = Field(0, description="生成总耗时（毫秒）")
+    tokens_per_second: float | None = Field(None, description="首个 token 之后的生成速度")
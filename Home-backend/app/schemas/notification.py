@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -17,6 +17,14 @@ class NotificationBase(BaseModel):
 class NotificationCreate(NotificationBase):
     user_id: int
 
+class NotificationBroadcast(BaseModel):
+    category: NotificationCategory = NotificationCategory.SYSTEM
+    title: str = Field(..., min_length=1, max_length=255)
+    content: Optional[str] = None
+
+class NotificationReadRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=1000)
+
 class NotificationUpdate(BaseModel):
     is_read: Optional[bool] = None
 
@@ -24,5 +32,7 @@ class NotificationDTO(NotificationBase):
     id: int
     user_id: int
     created_at: datetime
+    occurrence_count: int = 1
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
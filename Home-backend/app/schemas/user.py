@@ -43,10 +43,18 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserProfile(UserResponse):
+    """用户缓存条目模式（UserResponse 字段加上服务内部使用的字段）。"""
+
+    last_hydration_remind_at: Optional[datetime] = Field(None, description="上次喝水提醒时间")
+
+
 class UserListResponse(BaseModel):
     """用户列表响应模式。"""
 
     total: int = Field(..., description="总数")
+    total_estimated: bool = Field(False, description="总数是否为表统计信息估算值")
     items: list[UserResponse] = Field(..., description="用户列表")
     page: int = Field(..., description="当前页")
     page_size: int = Field(..., description="每页数量")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（没有更多数据时为空）")
@@ -1,12 +1,24 @@
 """行为处理服务模块。
 
 提供行为记录的语义处理等业务逻辑。
+
+语义描述可以逐条生成，也可以把多条行为合并到一次 LLM 调用中（合并模式）：
+系统提示词和要求只发送一次，模型按编号返回 JSON 数组。
+合并结果缺失或无效的条目改为逐条生成。
 """
 
+import asyncio
+import re
 import time
 import logging
 from sqlalchemy import update
 
+from app.core.admission import AdmissionRejectedError
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.json_codec import loads
+from app.core.tracing import start_span
+from app.infrastructure.config import get_settings
+from app.infrastructure.metrics import semantic_descriptions
 from app.services.llm_service import LLMService
 from app.services.embedding_service import EmbeddingService
 from app.services.milvus_service import MilvusService
@@ -14,6 +26,152 @@ from app.models.behavior import Behavior
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "你是一个智能家居管家。请描述用户的最新动作。"
+_REQUIREMENT = "要求：包含动词、设备名、状态及关键参数(如有)。例如：'陈先生开启了空调，温度设为24°C'。"
+
+
+def single_prompt(raw_content: str, details: dict) -> str:
+    """生成单条行为的语义描述提示词。"""
+    return (
+        f"根据以下信息，生成一句简洁、地道的中文自然语言描述：\n"
+        f"- 原始操作: {raw_content}\n"
+        f"- 详细参数: {details}\n"
+        f"{_REQUIREMENT}"
+    )
+
+
+def packed_prompt(items: list[tuple[str, dict]]) -> str:
+    """生成多条行为合并描述的提示词。
+
+    Args:
+        items: (原始行为描述, 行为细节参数) 列表
+
+    Returns:
+        要求模型按编号返回 JSON 数组的提示词
+    """
+    lines = [
+        f"为以下 {len(items)} 条用户动作分别生成一句简洁、地道的中文自然语言描述。",
+        _REQUIREMENT,
+        '只输出 JSON 数组，每条动作对应一个元素 {"id": 编号, "description": "描述"}，不要输出其他内容。',
+    ]
+    for i, (raw_content, details) in enumerate(items, start=1):
+        lines.append(f"{i}. 原始操作: {raw_content}；详细参数: {details}")
+    return "\n".join(lines)
+
+
+def _clean(text: str) -> str:
+    return text.strip().strip('"').strip("'").strip()
+
+
+def parse_packed_descriptions(text: str, count: int) -> list[str | None]:
+    """解析合并描述的模型输出。
+
+    兼容 Markdown 代码块包裹和纯字符串数组；编号越界、重复或描述为空的条目视为无效。
+
+    Args:
+        text: 模型输出
+        count: 条目数
+
+    Returns:
+        按编号顺序的描述，无效的条目为 None
+    """
+    results: list[str | None] = [None] * count
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        return results
+    try:
+        data = loads(match.group(0))
+    except ValueError:
+        return results
+    if not isinstance(data, list):
+        return results
+
+    if len(data) == count and all(isinstance(entry, str) for entry in data):
+        return [_clean(entry) or None for entry in data]
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        index, description = entry.get("id"), entry.get("description")
+        if (
+            isinstance(index, int) and 1 <= index <= count and results[index - 1] is None
+            and isinstance(description, str) and _clean(description)
+        ):
+            results[index - 1] = _clean(description)
+    return results
+
+
+async def describe_behavior(llm_service: LLMService, raw_content: str, details: dict) -> str:
+    """调用 LLM 为单条行为生成语义描述。
+
+    Raises:
+        AdmissionRejectedError: LLM 繁忙或熔断
+        Exception: LLM 调用失败
+    """
+    text = await llm_service.generate(single_prompt(raw_content, details), SYSTEM_PROMPT)
+    return _clean(text)
+
+
+async def describe_behaviors(
+    llm_service: LLMService,
+    items: list[tuple[str, dict]]
+) -> list[str | Exception]:
+    """在一次 LLM 调用中为多条行为生成语义描述。
+
+    合并调用失败（非繁忙原因）或结果中缺失、无效的条目改为逐条生成。
+
+    Args:
+        llm_service: LLM 服务
+        items: (原始行为描述, 行为细节参数) 列表
+
+    Returns:
+        与 items 顺序一致的描述，失败的位置为异常对象；
+        合并调用未获准入或熔断时所有位置都是该异常
+    """
+    if len(items) == 1:
+        try:
+            result = await describe_behavior(llm_service, *items[0])
+        except Exception as e:
+            return [e]
+        semantic_descriptions.labels("single").inc()
+        return [result]
+
+    try:
+        text = await llm_service.generate(packed_prompt(items), SYSTEM_PROMPT)
+        results: list[str | Exception | None] = list(parse_packed_descriptions(text, len(items)))
+    except AdmissionRejectedError as e:
+        return [e] * len(items)
+    except Exception as e:
+        logger.warning(f"合并语义描述失败，改为逐条生成: count={len(items)}, error={e}")
+        results = [None] * len(items)
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    semantic_descriptions.labels("packed").inc(len(items) - len(missing))
+    if missing:
+        retried = await asyncio.gather(
+            *(describe_behavior(llm_service, *items[i]) for i in missing),
+            return_exceptions=True
+        )
+        for i, result in zip(missing, retried):
+            results[i] = result
+        semantic_descriptions.labels("fallback").inc(sum(1 for r in retried if isinstance(r, str)))
+    return results
+
+
+def fallback_description(raw_content: str, details: dict) -> str:
+    """LLM 不可用时按模板生成语义描述。
+
+    Args:
+        raw_content: 原始行为描述
+        details: 行为细节参数
+
+    Returns:
+        确定性的描述文本，如 "set_temperature（temperature: 24，mode: cool）"
+    """
+    if not details:
+        return raw_content
+    params = "，".join(f"{key}: {value}" for key, value in details.items())
+    return f"{raw_content}（{params}）"
+
 
 class BehaviorService:
     """行为处理服务类。
@@ -57,6 +215,9 @@ class BehaviorService:
         3. 存入 Milvus 向量数据库
         4. 返回语义化内容供调用方更新 MySQL
 
+        每个步骤记录为当前跨度的子跨度。LLM 熔断且开启 semantic_fallback_template 时
+        使用 fallback_description 生成的模板描述。
+
         Args:
             behavior_id: 行为记录 ID
             user_id: 用户 ID
@@ -70,36 +231,48 @@ class BehaviorService:
             Exception: 处理失败时抛出异常
         """
         # 步骤 1: 使用 LLM 生成语义化描述
-        prompt = (
-            f"根据以下信息，生成一句简洁、地道的中文自然语言描述：\n"
-            f"- 原始操作: {raw_content}\n"
-            f"- 详细参数: {details}\n"
-            f"要求：包含动词、设备名、状态及关键参数(如有)。"
-            f"例如：'陈先生开启了空调，温度设为24°C'。"
-        )
-        system_prompt = "你是一个智能家居管家。请描述用户的最新动作。"
-
-        logger.info(f"开始 LLM 语义化处理: behavior_id={behavior_id}")
-        semantic_content = await self.llm_service.generate(prompt, system_prompt)
-        semantic_content = semantic_content.strip('"').strip("'").strip()
-        logger.info(
+        logger.debug(f"开始 LLM 语义化处理: behavior_id={behavior_id}")
+        with start_span("semantic_memory.llm", {"behavior.id": behavior_id}) as span:
+            try:
+                semantic_content = await describe_behavior(self.llm_service, raw_content, details)
+                semantic_descriptions.labels("single").inc()
+            except CircuitOpenError:
+                if not get_settings().semantic_fallback_template:
+                    raise
+                semantic_content = fallback_description(raw_content, details)
+                span.set_attribute("semantic_memory.fallback", "template")
+        logger.debug(
             f"LLM 语义化完成: behavior_id={behavior_id}, "
             f"content={semantic_content}"
         )
 
+        await self.index_semantic_memory(behavior_id, user_id, semantic_content)
+        return semantic_content
+
+    async def index_semantic_memory(self, behavior_id: int, user_id: int, semantic_content: str) -> None:
+        """为已生成的语义描述生成向量并存入 Milvus。
+
+        Args:
+            behavior_id: 行为记录 ID
+            user_id: 用户 ID
+            semantic_content: 语义化描述
+
+        Raises:
+            Exception: 处理失败时抛出异常
+        """
         # 步骤 2: 获取文本的 Embedding 向量
         logger.debug(f"开始生成 Embedding: behavior_id={behavior_id}")
-        vector = await self.embedding_service.get_embeddings(semantic_content)
+        with start_span("semantic_memory.embedding", {"behavior.id": behavior_id}):
+            vector = await self.embedding_service.get_embeddings(semantic_content)
 
         # 步骤 3: 存入 Milvus 向量数据库（用于语义搜索）
         timestamp = int(time.time())
-        await self.milvus_service.insert_behavior(
-            behavior_id=behavior_id,
-            user_id=user_id,
-            content=semantic_content,
-            vector=vector,
-            timestamp=timestamp
-        )
-        logger.info(f"向量已存入 Milvus: behavior_id={behavior_id}")
-
-        return semantic_content
+        with start_span("semantic_memory.milvus", {"behavior.id": behavior_id}):
+            await self.milvus_service.insert_behavior(
+                behavior_id=behavior_id,
+                user_id=user_id,
+                content=semantic_content,
+                vector=vector,
+                timestamp=timestamp
+            )
+        logger.debug(f"向量已存入 Milvus: behavior_id={behavior_id}")
@@ -0,0 +1,125 @@
+"""用户数据变更跟踪模块。
+
+为每个用户维护一个变更版本号（存放在缓存中，memory 或 redis），
+行为表、通知表的每次写入都会更新版本号并推送实时事件。
+另有一个全局版本号，用于影响所有用户的写入（如系统广播），避免逐个更新用户版本。
+轮询接口据此生成 ETag，数据未变化时直接返回 304，无需访问 MySQL。
+"""
+
+import logging
+import uuid
+from typing import Any
+
+from app.infrastructure.cache import get_cache
+from app.infrastructure.config import get_settings
+from app.infrastructure.event_bus import publish_user_event
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+GLOBAL_VERSION_KEY = "global_version"
+
+
+def _version_key(user_id: int) -> str:
+    return f"user_version:{user_id}"
+
+
+def _recent_write_key(user_id: int) -> str:
+    return f"recent_write:{user_id}"
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+async def get_user_version(user_id: int) -> str:
+    """获取用户当前的变更版本号（全局版本号 + 用户版本号）。
+
+    两个版本号通过一次批量读取获得。版本号不存在（首次访问或已过期）时生成新的随机版本号，
+    因此缓存过期只会让客户端多拉取一次完整数据，不会返回过期内容。
+
+    Args:
+        user_id: 用户 ID
+
+    Returns:
+        版本号字符串
+    """
+    cache = get_cache()
+    keys = [GLOBAL_VERSION_KEY, _version_key(user_id)]
+    try:
+        versions = await cache.get_many(keys)
+        for i, version in enumerate(versions):
+            if version is None:
+                versions[i] = _new_version()
+                await cache.set(keys[i], versions[i], ttl=settings.change_version_ttl)
+        return ":".join(versions)
+    except Exception as e:
+        # 缓存不可用时返回一次性版本号，相当于禁用 304
+        logger.warning(f"读取用户版本号失败: user_id={user_id}, error={e}")
+        return _new_version()
+
+
+async def bump_user_version(user_id: int) -> None:
+    """更新用户的变更版本号，使之前签发的 ETag 全部失效。
+
+    同时开启该用户的读己之写窗口，窗口内的只读查询走主库。
+
+    Args:
+        user_id: 用户 ID
+    """
+    try:
+        await get_cache().set(_version_key(user_id), _new_version(), ttl=settings.change_version_ttl)
+        if settings.read_your_writes_seconds:
+            await get_cache().set(_recent_write_key(user_id), "1", ttl=settings.read_your_writes_seconds)
+    except Exception as e:
+        logger.warning(f"更新用户版本号失败: user_id={user_id}, error={e}")
+
+
+async def has_recent_write(user_id: int) -> bool:
+    """判断用户是否处于读己之写窗口内（刚刚写入过数据）。
+
+    Args:
+        user_id: 用户 ID
+
+    Returns:
+        窗口内返回 True；缓存不可用时保守地返回 True
+    """
+    try:
+        return await get_cache().get(_recent_write_key(user_id)) is not None
+    except Exception as e:
+        logger.warning(f"读取写入窗口失败: user_id={user_id}, error={e}")
+        return True
+
+
+async def bump_global_version() -> None:
+    """更新全局版本号，使所有用户的 ETag 失效。"""
+    try:
+        await get_cache().set(GLOBAL_VERSION_KEY, _new_version(), ttl=settings.change_version_ttl)
+    except Exception as e:
+        logger.warning(f"更新全局版本号失败: error={e}")
+
+
+async def notify_user_change(user_id: int, event: str, data: dict[str, Any]) -> None:
+    """记录用户数据变更：更新版本号并推送实时事件。
+
+    应在写操作提交之后调用。
+
+    Args:
+        user_id: 用户 ID
+        event: 事件类型（如 notification.created）
+        data: 事件数据
+    """
+    await bump_user_version(user_id)
+    await publish_user_event(user_id, event, data)
+
+
+async def notify_global_change(event: str, data: dict[str, Any]) -> None:
+    """记录影响所有用户的数据变更：更新全局版本号并广播实时事件。
+
+    Args:
+        event: 事件类型（如 notification.broadcast）
+        data: 事件数据
+    """
+    await bump_global_version()
+    await publish_user_event(None, event, data)
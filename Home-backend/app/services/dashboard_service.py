@@ -0,0 +1,100 @@
+"""仪表盘聚合服务模块。
+
+一次性加载仪表盘首屏所需的数据：用户信息、最近动态、未读数和最新通知。
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import desc, select
+
+from app.models.behavior import Behavior
+from app.models.notification import Notification
+from app.models.user import User
+from app.schemas.user import UserProfile
+from app.services.notification_service import NotificationService
+from app.services.user_cache import get_user_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardService:
+    """仪表盘聚合服务类。
+
+    四个查询互不依赖。同一个 AsyncSession 不能并发执行语句，
+    因此每个查询使用独立会话（各自从连接池取连接），通过 asyncio.gather 并发执行，
+    总耗时约等于最慢的一个查询，而不是四次往返之和。
+    """
+
+    def __init__(self, session_maker):
+        """初始化仪表盘服务。
+
+        Args:
+            session_maker: 异步会话工厂
+        """
+        self.session_maker = session_maker
+
+    async def get_dashboard(
+        self,
+        user_id: int,
+        behavior_limit: int = 5,
+        notification_limit: int = 5
+    ) -> dict | None:
+        """并发加载仪表盘数据。
+
+        Args:
+            user_id: 用户 ID
+            behavior_limit: 最近动态条数
+            notification_limit: 最新通知条数
+
+        Returns:
+            仪表盘数据字典，用户不存在时返回 None
+        """
+        user, behaviors, unread_count, notifications = await asyncio.gather(
+            self._load_user(user_id),
+            self._load_behaviors(user_id, behavior_limit),
+            self._load_unread_count(user_id),
+            self._load_notifications(user_id, notification_limit),
+        )
+        if user is None:
+            return None
+
+        return {
+            "user": user,
+            "recent_behaviors": behaviors,
+            "unread_count": unread_count,
+            "latest_notifications": notifications,
+        }
+
+    async def _load_user(self, user_id: int) -> UserProfile | None:
+        # 命中用户资料缓存时不创建会话
+        async def loader():
+            async with self.session_maker() as session:
+                return await session.get(User, user_id)
+
+        return await get_user_cache().get(user_id, loader)
+
+    async def _load_behaviors(self, user_id: int, limit: int) -> list[Behavior]:
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Behavior)
+                .where(Behavior.user_id == user_id)
+                .order_by(desc(Behavior.timestamp), desc(Behavior.id))
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def _load_unread_count(self, user_id: int) -> int:
+        # 复用未读数缓存，命中时会话不会实际取连接
+        async with self.session_maker() as session:
+            return await NotificationService(session).get_unread_count(user_id)
+
+    async def _load_notifications(self, user_id: int, limit: int) -> list[Notification]:
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Notification)
+                .where(Notification.user_id == user_id)
+                .order_by(desc(Notification.created_at), desc(Notification.id))
+                .limit(limit)
+            )
+            return list(result.scalars().all())
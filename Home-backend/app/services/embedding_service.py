@@ -3,19 +3,38 @@
 import httpx
 import logging
 from typing import List
-from app.infrastructure.config import get_settings
+from app.core.admission import AdmissionRejectedError, get_limiter
+from app.core.circuit_breaker import get_breaker
+from app.core.provider_router import ProviderRouter
+from app.infrastructure.config import Settings, get_settings
+from app.infrastructure.metrics import track_dependency
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
 
 class EmbeddingService:
-    """Embedding 服务类, 直接调用 ZhipuAI API。"""
+    """Embedding 服务类, 直接调用 ZhipuAI API（OpenAI 兼容格式）。
+
+    配置了多个服务商（EMBEDDING_EXTRA_PROVIDERS）时，每次调用由 ProviderRouter 按延迟和错误率选择服务商。
+    """
 
-    def __init__(self):
-        self.api_key = settings.embedding_api_key
-        self.api_base = settings.embedding_api_base
-        self.model = settings.embedding_model
-        self.dimensions = settings.embedding_dimensions
+    def __init__(self, settings: Settings | None = None):
+        """初始化 Embedding 服务。
+
+        Args:
+            settings: 应用配置,如果不提供则使用默认配置
+        """
+        self.settings = settings or get_settings()
+        self.dimensions = self.settings.embedding_dimensions
+        self.router: ProviderRouter[dict] = ProviderRouter(
+            "embedding",
+            {provider["name"]: provider for provider in self.settings.embedding_provider_list},
+            alpha=self.settings.provider_ewma_alpha,
+            hedge=self.settings.embedding_hedge,
+            hedge_min_delay=self.settings.hedge_min_delay,
+            hedge_min_samples=self.settings.hedge_min_samples,
+            hedge_budget=self.settings.hedge_budget,
+        )
 
     async def get_embeddings(self, text: str) -> List[float]:
         """获取文本的 Embedding 向量。
@@ -25,30 +44,42 @@ class EmbeddingService:
 
         Returns:
             List[float]: 向量
+
+        Raises:
+            AdmissionRejectedError: 并发已满且排队超限或超时，或熔断器打开（CircuitOpenError）
         """
-        if not self.api_key:
+        if not any(provider["api_key"] for provider in self.router.providers.values()):
             logger.error("EMBEDDING_API_KEY 未配置")
             raise ValueError("EMBEDDING_API_KEY is not configured")
 
-        url = f"{self.api_base.rstrip('/')}/embeddings"
+        async with httpx.AsyncClient() as client:
+            try:
+                # 对冲请求与主请求共用一个并发名额
+                with get_breaker("embedding").call():
+                    async with get_limiter("embedding").slot():
+                        with track_dependency("embedding_get_embeddings"):
+                            return await self.router.call(lambda provider: self._request(client, provider, text))
+            except AdmissionRejectedError:
+                raise
+            except Exception as e:
+                logger.error(f"Embedding 调用失败: {e}")
+                raise
+
+    async def _request(self, client: httpx.AsyncClient, provider: dict, text: str) -> List[float]:
+        """向一个服务商请求 Embedding。"""
+        url = f"{provider['api_base'].rstrip('/')}/embeddings"
         headers = {
-            "Authorization": f"Bearer {self.api_key}",
+            "Authorization": f"Bearer {provider['api_key']}",
             "Content-Type": "application/json"
         }
         payload = {
-            "model": self.model,
+            "model": provider["model"],
             "input": text,
-            "dimensions": self.dimensions if "embedding-3" in self.model else None
+            "dimensions": self.dimensions if "embedding-3" in provider["model"] else None
         }
         # Remove dimensions if None
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, json=payload, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                data = response.json()
-                return data["data"][0]["embedding"]
-            except Exception as e:
-                logger.error(f"ZhipuAI Embedding 调用失败: {e}")
-                raise
+        response = await client.post(url, json=payload, headers=headers, timeout=30.0)
+        response.raise_for_status()
+        return response.json()["data"][0]["embedding"]
@@ -5,15 +5,18 @@
 
 import logging
 from datetime import datetime
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, update
 
 from app.models.user import User
-from app.models.notification import Notification
 from app.schemas.notification import NotificationCategory
+from app.services.notification_service import NotificationService
+from app.services.user_cache import get_user_cache, get_user_profile
 from app.utils.datetime import calculate_minutes_ago
 
 logger = logging.getLogger(__name__)
 
+HYDRATION_COLLAPSE_KEY = "hydration_reminder"
+
 
 class HydrationService:
     """喝水提醒服务类。
@@ -119,9 +122,7 @@ class HydrationService:
         Returns:
             上次提醒时间或 None
         """
-        query = select(User).where(User.id == user_id)
-        result = await self.db.execute(query)
-        user = result.scalars().first()
+        user = await get_user_profile(self.db, user_id)
         return user.last_hydration_remind_at if user else None
 
     async def _create_reminder(self, user_id: int, now: datetime) -> None:
@@ -134,22 +135,19 @@ class HydrationService:
         title = "饮水提醒"
         content = "温馨提醒：您已经10小时没喝水了，请记得补水哦！"
 
-        # 创建通知
-        notification = Notification(
+        # 更新用户最后提醒时间（随通知一起提交）
+        await self.db.execute(
+            update(User).where(User.id == user_id).values(last_hydration_remind_at=now)
+        )
+
+        # 用户一直没读的提醒折叠为一条，只累加次数
+        # （Celery 进程中需 redis 事件总线才能推送到 API 进程）
+        await NotificationService(self.db).create_notification(
             user_id=user_id,
-            category=NotificationCategory.REMINDER.value,
+            category=NotificationCategory.REMINDER,
             title=title,
             content=content,
-            is_read=False,
-            created_at=now
+            created_at=now,
+            collapse_key=HYDRATION_COLLAPSE_KEY
         )
-        self.db.add(notification)
-
-        # 更新用户最后提醒时间
-        query = select(User).where(User.id == user_id)
-        result = await self.db.execute(query)
-        user = result.scalars().first()
-        if user:
-            user.last_hydration_remind_at = now
-
-        await self.db.commit()
+        await get_user_cache().invalidate(user_id)
@@ -1,8 +1,26 @@
-"""LLM 服务模块。"""
+"""LLM 服务模块。
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+LangChain / OpenAI SDK 导入耗时较长，在首次创建 LLMService 时才加载，
+只导入本模块（如 Celery beat、依赖注入声明）不会加载它们。
+
+配置了多个服务商（LLM_EXTRA_PROVIDERS）时，每次调用由 ProviderRouter 按延迟和错误率选择服务商。
+"""
+
+import asyncio
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.core.admission import get_limiter
+from app.core.circuit_breaker import get_breaker, is_provider_failure
+from app.core.provider_router import ProviderRouter
 from app.infrastructure.config import Settings, get_settings
+from app.infrastructure.metrics import llm_time_to_first_token, llm_tokens_per_second, track_dependency
+from app.schemas.llm import LLMStreamStats
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_openai import ChatOpenAI
 
 
 class LLMService:
@@ -15,18 +33,31 @@ class LLMService:
             settings: 应用配置,如果不提供则使用默认配置
         """
         self.settings = settings or get_settings()
-        self.llm = self._create_llm()
+        self.router: "ProviderRouter[ChatOpenAI]" = ProviderRouter(
+            "llm",
+            {provider["name"]: self._create_llm(provider) for provider in self.settings.llm_provider_list},
+            alpha=self.settings.provider_ewma_alpha,
+            hedge=self.settings.llm_hedge,
+            hedge_min_delay=self.settings.hedge_min_delay,
+            hedge_min_samples=self.settings.hedge_min_samples,
+            hedge_budget=self.settings.hedge_budget,
+        )
 
-    def _create_llm(self) -> ChatOpenAI:
+    def _create_llm(self, provider: dict) -> "ChatOpenAI":
         """创建 LLM 实例。
 
+        Args:
+            provider: 服务商配置（api_base、api_key、model）
+
         Returns:
             ChatOpenAI 实例
         """
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
-            model=self.settings.llm_model,
-            api_key=self.settings.llm_api_key,
-            base_url=self.settings.llm_api_base,
+            model=provider["model"],
+            api_key=provider["api_key"],
+            base_url=provider["api_base"],
             temperature=self.settings.llm_temperature,
             max_tokens=self.settings.llm_max_tokens,
             timeout=self.settings.llm_timeout,
@@ -47,14 +78,123 @@ class LLMService:
             LLM 生成的回复文本
 
         Raises:
+            AdmissionRejectedError: 并发已满且排队超限或超时，或熔断器打开（CircuitOpenError）
             Exception: LLM 调用失败时
         """
-        messages: list[HumanMessage | SystemMessage | AIMessage] = []
+        messages = self._build_messages(prompt, system_prompt)
+
+        # 对冲请求与主请求共用一个并发名额
+        with get_breaker("llm").call():
+            async with get_limiter("llm").slot():
+                with track_dependency("llm_generate"):
+                    response = await self.router.call(lambda llm: llm.ainvoke(messages))
+        return response.content
+
+    async def generate_batch(
+        self,
+        requests: list[tuple[str, str | None]],
+        max_concurrency: int | None = None
+    ) -> list[str | Exception]:
+        """批量生成文本回复。
+
+        最多同时进行 max_concurrency 个调用，其余在本批次内等待，
+        不会一次性占满准入控制的等待队列。单个调用失败不影响其他调用。
+
+        Args:
+            requests: (用户提示词, 系统提示词) 列表
+            max_concurrency: 同时进行的调用数，默认为 llm_batch_concurrency
+
+        Returns:
+            与 requests 顺序一致的结果，失败的位置为异常对象
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.settings.llm_batch_concurrency)
+
+        async def run(prompt: str, system_prompt: str | None) -> str:
+            async with semaphore:
+                return await self.generate(prompt, system_prompt)
+
+        return await asyncio.gather(
+            *(run(prompt, system_prompt) for prompt, system_prompt in requests),
+            return_exceptions=True
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        stats: LLMStreamStats | None = None
+    ) -> AsyncIterator[str]:
+        """流式生成文本回复，逐段返回生成的内容。
+
+        整个生成过程占用一个并发名额，但准入控制只以首个 token 延迟作为延迟信号
+        （总耗时取决于输出长度，长回答不代表服务商过载）。
+        调用方提前关闭迭代器（如客户端断开）时会关闭上游的流式请求，服务商随之停止生成。
+        服务商由路由器选择，已开始输出后无法切换，因此流式生成不做对冲和故障转移。
+
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词(可选)
+            stats: 生成统计，传入时在生成过程中填写首个 token 延迟、token 数和生成速度
+
+        Yields:
+            生成的文本片段
+
+        Raises:
+            AdmissionRejectedError: 并发已满且排队超限或超时，或熔断器打开（CircuitOpenError）
+            Exception: LLM 调用失败时
+        """
+        messages = self._build_messages(prompt, system_prompt)
+        stats = stats if stats is not None else LLMStreamStats(model=self.settings.llm_model)
+
+        provider = self.router.order()[0]
+        llm = self.router.providers[provider]
+
+        # 首个 token 延迟从开始排队算起，与客户端感受到的一致
+        start = time.perf_counter()
+        with get_breaker("llm").call():
+            async with get_limiter("llm").slot(measure_latency=False) as timer:
+                with track_dependency("llm_stream"):
+                    first_token_at = None
+                    chunks = 0
+                    usage_tokens = None
+                    try:
+                        async with aclosing(llm.astream(messages, stream_usage=True)) as response:
+                            async for chunk in response:
+                                # 最后一个片段只带 token 用量，没有文本
+                                if chunk.usage_metadata:
+                                    usage_tokens = chunk.usage_metadata.get("output_tokens")
+                                if not chunk.content:
+                                    continue
+                                if first_token_at is None:
+                                    timer.mark()
+                                    first_token_at = time.perf_counter()
+                                    stats.ttft_ms = round((first_token_at - start) * 1000, 3)
+                                    llm_time_to_first_token.observe(first_token_at - start)
+                                chunks += 1
+                                yield chunk.content
+                    except Exception as e:
+                        if is_provider_failure(e):
+                            self.router.record(provider, None, False)
+                        raise
+                    # 流式耗时取决于输出长度，不计入路由的延迟估计
+                    self.router.record(provider, None, True)
+
+        end = time.perf_counter()
+        stats.tokens = usage_tokens or chunks
+        stats.duration_ms = round((end - start) * 1000, 3)
+        # 生成速度按首个 token 之后的时间计算，不含排队和首 token 延迟
+        if first_token_at is not None and stats.tokens > 1 and end > first_token_at:
+            stats.tokens_per_second = round((stats.tokens - 1) / (end - first_token_at), 3)
+            llm_tokens_per_second.observe(stats.tokens_per_second)
+
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: str | None) -> list["BaseMessage"]:
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        messages: list[BaseMessage] = []
 
         if system_prompt:
             messages.append(SystemMessage(content=system_prompt))
 
         messages.append(HumanMessage(content=prompt))
-
-        response = await self.llm.ainvoke(messages)
-        return response.content
+        return messages
@@ -1,17 +1,14 @@
-"""Milvus 服务模块。"""
+"""Milvus 服务模块。
+
+pymilvus 在首次创建 MilvusService 时才导入。
+"""
 
 import logging
 from typing import List, Dict, Any
-from pymilvus import (
-    Collection,
-    CollectionSchema,
-    FieldSchema,
-    DataType,
-    utility,
-    connections
-)
+from app.core.tracing import start_span
 from app.infrastructure.config import get_settings
 from app.infrastructure.database import init_milvus
+from app.infrastructure.metrics import track_dependency
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -27,6 +24,8 @@ class MilvusService:
 
     def _ensure_connection(self):
         """确保 Milvus 已连接。"""
+        from pymilvus import connections
+
         try:
             connections.get_connection("default")
         except Exception:
@@ -34,6 +33,8 @@ class MilvusService:
 
     def _init_collection(self):
         """初始化 Milvus 集合。"""
+        from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utility
+
         if utility.has_collection(self.collection_name):
             self.collection = Collection(self.collection_name)
             logger.info(f"Milvus 集合 {self.collection_name} 已存在")
@@ -59,6 +60,11 @@ class MilvusService:
             self.collection.create_index(field_name="vector", index_params=index_params)
             logger.info(f"Milvus 集合 {self.collection_name} 创建成功, 维度: {self.dim}")
 
+    def load(self):
+        """把集合加载到内存（已加载时很快返回），启动预热时调用。"""
+        with track_dependency("milvus_load"):
+            self.collection.load()
+
     async def insert_behavior(self, behavior_id: int, user_id: int, content: str, vector: List[float], timestamp: int):
         """插入行为向量。"""
         data = [
@@ -69,9 +75,13 @@ class MilvusService:
             [timestamp]
         ]
         try:
-            self.collection.insert(data)
-            self.collection.flush()
-            logger.info(f"行为向量已存储到 Milvus: behavior_id={behavior_id}")
+            with track_dependency("milvus_insert"):
+                with start_span("milvus.insert"):
+                    self.collection.insert(data)
+                # flush 等待数据段落盘，通常比 insert 本身慢得多，单独记录
+                with start_span("milvus.flush"):
+                    self.collection.flush()
+            logger.debug(f"行为向量已存储到 Milvus: behavior_id={behavior_id}")
         except Exception as e:
             logger.error(f"Milvus 插入失败: {e}")
             raise
@@ -80,15 +90,16 @@ class MilvusService:
         """搜索相似行为。"""
         search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
         try:
-            self.collection.load()
-            results = self.collection.search(
-                data=[query_vector],
-                anns_field="vector",
-                param=search_params,
-                limit=limit,
-                expr=f"user_id == {user_id}",
-                output_fields=["behavior_id", "content", "timestamp"]
-            )
+            with track_dependency("milvus_search"):
+                self.collection.load()
+                results = self.collection.search(
+                    data=[query_vector],
+                    anns_field="vector",
+                    param=search_params,
+                    limit=limit,
+                    expr=f"user_id == {user_id}",
+                    output_fields=["behavior_id", "content", "timestamp"]
+                )
             
             hits = []
             for hit in results[0]:
@@ -0,0 +1,139 @@
+"""通知保留策略服务模块。
+
+按保留策略把过期通知归档到 notifications_archive 并从通知表删除，
+使通知表及其索引保持在稳定规模，避免写入随表膨胀而变慢。
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+from app.infrastructure.cache import get_cache
+from app.models.notification import Notification, NotificationArchive
+from app.services.change_tracker import bump_global_version
+from app.services.notification_service import UNREAD_KEY_PREFIX
+
+logger = logging.getLogger(__name__)
+
+_ARCHIVE_COLUMNS = [
+    "id", "user_id", "category", "title", "content", "is_read", "created_at",
+    "collapse_key", "occurrence_count", "updated_at",
+]
+
+
+class NotificationRetentionService:
+    """通知保留策略服务类。
+
+    清理按主键顺序分批进行：每批先选出一段主键，在同一个事务里
+    复制到归档表并删除，然后提交并暂停片刻。单个事务只锁住少量行，
+    不会长时间阻塞在线写入；中途失败也只会回滚当前批次，下次运行继续。
+    """
+
+    def __init__(self, db_session):
+        """初始化通知保留策略服务。
+
+        Args:
+            db_session: 数据库会话
+        """
+        self.db = db_session
+
+    def _expired_condition(self, read_cutoff: datetime | None, unread_cutoff: datetime | None):
+        """构建过期通知的筛选条件。"""
+        conditions = []
+        if read_cutoff is not None:
+            conditions.append(and_(Notification.is_read.is_(True), Notification.created_at < read_cutoff))
+        if unread_cutoff is not None:
+            conditions.append(and_(Notification.is_read.is_(False), Notification.created_at < unread_cutoff))
+        return or_(*conditions)
+
+    async def purge_expired(
+        self,
+        read_retention_days: int,
+        unread_retention_days: int = 0,
+        batch_size: int = 1000,
+        pause_seconds: float = 0.0,
+        archive: bool = True,
+        max_batches: int | None = None,
+    ) -> dict[str, int]:
+        """归档并删除过期通知。
+
+        Args:
+            read_retention_days: 已读通知保留天数（0 表示不清理已读通知）
+            unread_retention_days: 未读通知保留天数（0 表示不清理未读通知）
+            batch_size: 每批处理的通知条数
+            pause_seconds: 批次之间的暂停时间（秒）
+            archive: 删除前是否复制到归档表
+            max_batches: 本次最多处理的批次数（None 表示处理完为止）
+
+        Returns:
+            统计信息：archived（归档条数）、deleted（删除条数）、batches（批次数）
+        """
+        now = datetime.now()
+        read_cutoff = now - timedelta(days=read_retention_days) if read_retention_days else None
+        unread_cutoff = now - timedelta(days=unread_retention_days) if unread_retention_days else None
+        stats = {"archived": 0, "deleted": 0, "batches": 0}
+        if read_cutoff is None and unread_cutoff is None:
+            return stats
+
+        expired = self._expired_condition(read_cutoff, unread_cutoff)
+
+        # 过期通知都早于最晚的截止时间，先用 created_at 索引求出主键上界，
+        # 避免最后一批沿主键扫描到表尾
+        latest_cutoff = max(c for c in (read_cutoff, unread_cutoff) if c is not None)
+        result = await self.db.execute(
+            select(func.max(Notification.id)).where(Notification.created_at < latest_cutoff)
+        )
+        upper_id = result.scalar()
+        if upper_id is None:
+            return stats
+
+        last_id = 0
+        while max_batches is None or stats["batches"] < max_batches:
+            result = await self.db.execute(
+                select(Notification.id)
+                .where(Notification.id > last_id, Notification.id <= upper_id, expired)
+                .order_by(Notification.id)
+                .limit(batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+
+            # 删除时重复过期条件，防止选出后被标记已读等并发修改改变归属
+            id_filter = and_(Notification.id.in_(ids), expired)
+            if archive:
+                archived = await self.db.execute(
+                    insert(NotificationArchive).from_select(
+                        _ARCHIVE_COLUMNS,
+                        select(*[getattr(Notification, c) for c in _ARCHIVE_COLUMNS]).where(id_filter)
+                    )
+                )
+                stats["archived"] += archived.rowcount
+            deleted = await self.db.execute(delete(Notification).where(id_filter))
+            await self.db.commit()
+
+            stats["deleted"] += deleted.rowcount
+            stats["batches"] += 1
+            last_id = ids[-1]
+
+            if len(ids) < batch_size:
+                break
+            if pause_seconds:
+                await asyncio.sleep(pause_seconds)
+
+        if stats["deleted"]:
+            if unread_cutoff is not None:
+                # 删除了未读通知，未读数缓存需要回源重新统计
+                try:
+                    await get_cache().delete_prefix(UNREAD_KEY_PREFIX)
+                except Exception as e:
+                    logger.warning(f"清空未读数缓存失败: {e}")
+            await bump_global_version()
+
+        logger.info(
+            f"通知清理完成: archived={stats['archived']}, deleted={stats['deleted']}, "
+            f"batches={stats['batches']}"
+        )
+        return stats
@@ -5,20 +5,99 @@
 
 import logging
 from datetime import datetime
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, desc, func, insert, literal, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from typing import List
 
+from app.infrastructure.cache import get_cache
+from app.infrastructure.config import get_settings
 from app.models.notification import Notification
-from app.schemas.notification import NotificationCategory
+from app.models.user import User
+from app.schemas.notification import NotificationCategory, NotificationCreate, NotificationDTO
+from app.services.change_tracker import notify_global_change, notify_user_change
 
 logger = logging.getLogger(__name__)
 
+UNREAD_KEY_PREFIX = "unread:"
+
+
+def _unread_key(user_id: int) -> str:
+    return f"{UNREAD_KEY_PREFIX}{user_id}"
+
+
+def build_collapse_upsert(
+    user_id: int,
+    category: str,
+    title: str,
+    content: str | None,
+    collapse_key: str,
+    now: datetime
+):
+    """构建折叠通知的单语句 upsert。
+
+    依赖 (user_id, unread_collapse_key) 唯一索引：同一折叠键已有未读通知时
+    只累加 occurrence_count 并刷新标题、内容和 updated_at，否则插入新行。
+    ``id = LAST_INSERT_ID(id)`` 使两种情况下 lastrowid 都是该通知的 ID；
+    rowcount 为 1 表示插入，为 2 表示折叠到已有通知。
+    created_at 保持不变，已签发的分页游标不受影响。
+
+    Args:
+        user_id: 用户 ID
+        category: 通知类别
+        title: 通知标题
+        content: 通知内容
+        collapse_key: 折叠键
+        now: 事件时间
+
+    Returns:
+        MySQL INSERT ... ON DUPLICATE KEY UPDATE 语句
+    """
+    stmt = mysql_insert(Notification).values(
+        user_id=user_id,
+        category=category,
+        title=title,
+        content=content,
+        is_read=False,
+        collapse_key=collapse_key,
+        occurrence_count=1,
+        created_at=now,
+        updated_at=now,
+    )
+    return stmt.on_duplicate_key_update(
+        id=func.last_insert_id(Notification.id),
+        title=stmt.inserted.title,
+        content=stmt.inserted.content,
+        occurrence_count=Notification.occurrence_count + 1,
+        updated_at=stmt.inserted.updated_at,
+    )
+
+
+async def adjust_unread_count(user_id: int, delta: int) -> None:
+    """按增量调整缓存中的未读数。
+
+    缓存中没有该用户的未读数时不做处理，下次查询会回源重新统计。
+    应在写操作提交之后调用。
+
+    Args:
+        user_id: 用户 ID
+        delta: 未读数增量（新通知为正，标记已读为负）
+    """
+    if not delta:
+        return
+    try:
+        value = await get_cache().incr_if_exists(_unread_key(user_id), delta)
+        if value is not None and value < 0:
+            # 计数出现偏差时丢弃，由下次查询回源修正
+            await get_cache().delete(_unread_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to adjust unread count cache: user_id={user_id}, error={e}")
+
 
 class NotificationService:
     """通知服务类。
 
     封装通知相关的业务逻辑，包括：
-    - 创建通知
+    - 创建通知（单条、批量、全员广播）
     - 查询通知
     - 标记通知为已读
     - 获取未读数量
@@ -38,23 +117,33 @@ class NotificationService:
         category: NotificationCategory,
         title: str,
         content: str,
-        created_at: datetime | None = None
+        created_at: datetime | None = None,
+        collapse_key: str | None = None
     ) -> Notification:
         """创建新通知。
 
+        指定 collapse_key 时，若该用户已有同一折叠键的未读通知，
+        则只累加其 occurrence_count，不新增行。
+
+        会话中尚未提交的其他修改会随通知一起提交。
+
         Args:
             user_id: 用户 ID
             category: 通知类别
             title: 通知标题
             content: 通知内容
             created_at: 创建时间（默认为当前时间）
+            collapse_key: 折叠键（如 hydration_reminder），None 表示不折叠
 
         Returns:
-            创建的通知对象
+            创建或折叠后的通知对象
         """
         if created_at is None:
             created_at = datetime.now()
 
+        if collapse_key is not None:
+            return await self._create_collapsed(user_id, category, title, content, collapse_key, created_at)
+
         notification = Notification(
             user_id=user_id,
             category=category.value,
@@ -71,8 +160,151 @@ class NotificationService:
             f"Notification created: id={notification.id}, "
             f"user_id={user_id}, category={category.value}"
         )
+        await adjust_unread_count(user_id, 1)
+        await notify_user_change(
+            user_id,
+            "notification.created",
+            NotificationDTO.model_validate(notification).model_dump(mode="json")
+        )
         return notification
 
+    async def _create_collapsed(
+        self,
+        user_id: int,
+        category: NotificationCategory,
+        title: str,
+        content: str,
+        collapse_key: str,
+        now: datetime
+    ) -> Notification:
+        """以单条 upsert 创建或折叠通知。"""
+        result = await self.db.execute(
+            build_collapse_upsert(user_id, category.value, title, content, collapse_key, now)
+        )
+        await self.db.commit()
+        inserted = result.rowcount == 1
+
+        notification = await self.db.get(Notification, result.lastrowid, populate_existing=True)
+
+        logger.info(
+            f"Notification {'created' if inserted else 'collapsed'}: id={notification.id}, "
+            f"user_id={user_id}, collapse_key={collapse_key}, count={notification.occurrence_count}"
+        )
+        if inserted:
+            await adjust_unread_count(user_id, 1)
+        await notify_user_change(
+            user_id,
+            "notification.created" if inserted else "notification.updated",
+            NotificationDTO.model_validate(notification).model_dump(mode="json")
+        )
+        return notification
+
+    async def create_many(self, items: List[NotificationCreate], chunk_size: int = 1000) -> int:
+        """批量创建通知。
+
+        每 chunk_size 条合并为一条多行 INSERT，全部写入后统一提交。
+
+        Args:
+            items: 待创建的通知列表
+            chunk_size: 每条 INSERT 语句包含的行数
+
+        Returns:
+            创建的通知数量
+        """
+        if not items:
+            return 0
+
+        now = datetime.now()
+        rows = [
+            {
+                "user_id": item.user_id,
+                "category": item.category.value,
+                "title": item.title,
+                "content": item.content,
+                "is_read": item.is_read,
+                "created_at": now,
+            }
+            for item in items
+        ]
+        for start in range(0, len(rows), chunk_size):
+            await self.db.execute(insert(Notification).values(rows[start:start + chunk_size]))
+        await self.db.commit()
+
+        counts: dict[int, int] = {}
+        for item in items:
+            if not item.is_read:
+                counts[item.user_id] = counts.get(item.user_id, 0) + 1
+        for user_id, count in counts.items():
+            await adjust_unread_count(user_id, count)
+            await notify_user_change(user_id, "notification.bulk_created", {"count": count})
+
+        logger.info(f"Notifications created in bulk: count={len(rows)}, users={len(counts)}")
+        return len(rows)
+
+    async def broadcast(
+        self,
+        category: NotificationCategory,
+        title: str,
+        content: str | None,
+        chunk_size: int | None = None
+    ) -> int:
+        """向所有活跃用户发送通知。
+
+        使用 INSERT ... SELECT 在数据库内按用户生成通知行，不把用户列表拉回应用。
+        按用户 ID 区间分批执行，每批单独提交，避免长时间持有 users 表和通知表的锁。
+
+        Args:
+            category: 通知类别
+            title: 通知标题
+            content: 通知内容
+            chunk_size: 每批覆盖的用户 ID 区间大小（默认读取配置）
+
+        Returns:
+            创建的通知数量
+        """
+        chunk_size = chunk_size or get_settings().notification_broadcast_chunk_size
+        now = datetime.now()
+
+        bounds = await self.db.execute(
+            select(func.min(User.id), func.max(User.id)).where(User.is_active.is_(True))
+        )
+        min_id, max_id = bounds.one()
+        if min_id is None:
+            return 0
+
+        columns = ["user_id", "category", "title", "content", "is_read", "created_at"]
+        total = 0
+        start = min_id
+        while start <= max_id:
+            end = start + chunk_size
+            stmt = insert(Notification).from_select(
+                columns,
+                select(
+                    User.id,
+                    literal(category.value),
+                    literal(title),
+                    literal(content),
+                    literal(False),
+                    literal(now),
+                ).where(User.is_active.is_(True), User.id >= start, User.id < end)
+            )
+            result = await self.db.execute(stmt)
+            await self.db.commit()
+            total += result.rowcount
+            start = end
+
+        # 所有用户的未读数都变了，直接清空未读数缓存
+        try:
+            await get_cache().delete_prefix(UNREAD_KEY_PREFIX)
+        except Exception as e:
+            logger.warning(f"Failed to clear unread count cache: {e}")
+        await notify_global_change(
+            "notification.broadcast",
+            {"category": category.value, "title": title, "content": content}
+        )
+        logger.info(f"Broadcast notification created: title={title}, count={total}")
+        return total
+
     async def get_user_notifications(
         self,
         user_id: int,
@@ -105,18 +337,35 @@ class NotificationService:
     async def get_unread_count(self, user_id: int) -> int:
         """获取用户未读通知数量。
 
+        优先读取缓存；未命中时统计数据库并写入缓存。
+        新通知和标记已读会按增量调整缓存，而不是删除后重新统计。
+
         Args:
             user_id: 用户 ID
 
         Returns:
             未读通知数量
         """
+        cache = get_cache()
+        try:
+            cached = await cache.get(_unread_key(user_id))
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Failed to read unread count cache: user_id={user_id}, error={e}")
+
         query = select(func.count()).select_from(Notification).where(
             Notification.user_id == user_id,
             Notification.is_read == False
         )
         result = await self.db.execute(query)
-        return result.scalar() or 0
+        count = result.scalar() or 0
+
+        try:
+            await cache.set(_unread_key(user_id), str(count), ttl=get_settings().unread_count_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to write unread count cache: user_id={user_id}, error={e}")
+        return count
 
     async def mark_as_read(
         self,
@@ -125,6 +374,9 @@ class NotificationService:
     ) -> Notification | None:
         """标记通知为已读。
 
+        使用一条 UPDATE 语句完成状态变更（不经过 ORM 加载和 refresh），
+        随后读取该行用于返回。
+
         Args:
             notification_id: 通知 ID
             user_id: 用户 ID
@@ -132,21 +384,69 @@ class NotificationService:
         Returns:
             更新后的通知对象，如果通知不存在则返回 None
         """
-        query = select(Notification).where(
-            Notification.id == notification_id,
-            Notification.user_id == user_id
+        result = await self.db.execute(
+            update(Notification)
+            .where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read.is_(False)
+            )
+            .values(is_read=True)
+        )
+        changed = result.rowcount
+
+        result = await self.db.execute(
+            select(Notification).where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id
+            )
         )
-        result = await self.db.execute(query)
         notification = result.scalars().first()
+        await self.db.commit()
 
-        if notification:
-            notification.is_read = True
-            await self.db.commit()
-            await self.db.refresh(notification)
+        if changed:
             logger.info(f"Notification marked as read: id={notification_id}")
+            await adjust_unread_count(user_id, -changed)
+            await notify_user_change(user_id, "notification.read", {"ids": [notification_id]})
 
         return notification
 
+    async def mark_many_as_read(self, user_id: int, notification_ids: List[int]) -> int:
+        """批量标记通知为已读。
+
+        使用一条 ``UPDATE ... WHERE id IN (...) AND user_id = ?`` 语句完成。
+
+        Args:
+            user_id: 用户 ID
+            notification_ids: 通知 ID 列表（不属于该用户的 ID 会被忽略）
+
+        Returns:
+            实际从未读变为已读的记录数
+        """
+        if not notification_ids:
+            return 0
+
+        result = await self.db.execute(
+            update(Notification)
+            .where(
+                Notification.id.in_(notification_ids),
+                Notification.user_id == user_id,
+                Notification.is_read.is_(False)
+            )
+            .values(is_read=True)
+        )
+        await self.db.commit()
+
+        updated_count = result.rowcount
+        logger.info(
+            f"Marked notifications as read: user_id={user_id}, "
+            f"requested={len(notification_ids)}, count={updated_count}"
+        )
+        if updated_count:
+            await adjust_unread_count(user_id, -updated_count)
+            await notify_user_change(user_id, "notification.read", {"ids": list(notification_ids)})
+        return updated_count
+
     async def mark_all_as_read(self, user_id: int) -> int:
         """标记用户所有通知为已读。
 
@@ -156,8 +456,6 @@ class NotificationService:
         Returns:
             更新的记录数
         """
-        from sqlalchemy import update
-
         stmt = update(Notification).where(
             Notification.user_id == user_id,
             Notification.is_read == False
@@ -171,4 +469,9 @@ class NotificationService:
             f"Marked all notifications as read: user_id={user_id}, "
             f"count={updated_count}"
         )
+        try:
+            await get_cache().set(_unread_key(user_id), "0", ttl=get_settings().unread_count_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to reset unread count cache: user_id={user_id}, error={e}")
+        await notify_user_change(user_id, "notification.read", {"all": True})
         return updated_count
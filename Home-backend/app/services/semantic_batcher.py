@@ -0,0 +1,103 @@
+"""语义描述凑批模块。
+
+合并模式（semantic_pack_size > 1）下，API 进程的语义处理后台任务不再各自调用 LLM，
+而是把行为提交给凑批器：凑满 semantic_pack_size 条或等待 semantic_pack_wait_ms 后
+一次调用 describe_behaviors 生成整批描述，再把结果分发给各个后台任务。
+负载越高批次越满，每条行为分摊的提示词 token 和请求数越少；
+低负载时最多增加 semantic_pack_wait_ms 的延迟。
+"""
+
+import asyncio
+import logging
+from functools import lru_cache
+
+from app.infrastructure.config import get_settings
+from app.services.behavior_service import describe_behaviors
+from app.services.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class DescriptionBatcher:
+    """把并发的语义描述请求合并为批量 LLM 调用。"""
+
+    def __init__(self, llm_service: LLMService, max_size: int, max_wait: float):
+        """初始化凑批器。
+
+        Args:
+            llm_service: LLM 服务
+            max_size: 每批最多的行为数
+            max_wait: 凑批最长等待时间（秒）
+        """
+        self.llm_service = llm_service
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[tuple[str, dict], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def describe(self, raw_content: str, details: dict) -> str:
+        """生成一条行为的语义描述（与其他并发请求合并调用）。
+
+        Args:
+            raw_content: 原始行为描述
+            details: 行为细节参数
+
+        Returns:
+            语义化描述
+
+        Raises:
+            AdmissionRejectedError: LLM 繁忙或熔断
+            Exception: 生成失败
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((raw_content, details), future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[tuple[str, dict], asyncio.Future]]) -> None:
+        try:
+            results = await describe_behaviors(self.llm_service, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            # 提交方已取消（如进程关闭）时跳过
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        logger.debug(f"语义描述批次完成: size={len(batch)}")
+
+
+@lru_cache()
+def get_description_batcher() -> DescriptionBatcher:
+    """获取 API 进程的语义描述凑批器单例。
+
+    Returns:
+        DescriptionBatcher: 使用共享 LLM 服务的凑批器
+    """
+    from app.infrastructure.dependencies import get_llm_service
+
+    settings = get_settings()
+    return DescriptionBatcher(
+        get_llm_service(),
+        max_size=settings.semantic_pack_size,
+        max_wait=settings.semantic_pack_wait_ms / 1000,
+    )
@@ -0,0 +1,253 @@
+"""用户资料缓存模块。
+
+仪表盘每次加载都会读取用户信息，喝水提醒检查也要读取用户的提醒时间。
+这里提供两级读穿缓存：
+- 本地层：进程内 TTL-LRU，命中时不产生任何网络往返
+- 共享层：Redis（仅 CACHE_BACKEND=redis 时启用），供多 worker 与 Celery 共享
+
+缓存值为 UserProfile 字段按固定顺序组成的紧凑 JSON 数组。
+同一进程内并发未命中同一用户时只有一个协程回源查询（single-flight），
+其余协程等待同一个结果，避免冷启动或失效瞬间的缓存击穿。
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from app.core.json_codec import dumps_str, loads
+from app.infrastructure.cache import MemoryCache, RedisCache
+from app.infrastructure.config import get_settings
+from app.schemas.user import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# 字段顺序即序列化格式，调整字段时需同时修改 KEY_PREFIX 中的版本号
+_FIELDS = (
+    "id", "username", "email", "full_name", "is_active", "is_superuser",
+    "created_at", "updated_at", "last_hydration_remind_at",
+)
+_DATETIME_FIELDS = {"created_at", "updated_at", "last_hydration_remind_at"}
+KEY_PREFIX = "user:v1:"
+# 不存在的用户也短暂缓存，防止反复查询不存在的 ID
+_MISSING = "-"
+_MISSING_TTL = 5.0
+
+
+def _key(user_id: int) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def serialize_user(user) -> str:
+    """把用户对象序列化为紧凑字符串。
+
+    Args:
+        user: User 模型或 UserProfile
+
+    Returns:
+        JSON 数组字符串
+    """
+    values = []
+    for field in _FIELDS:
+        value = getattr(user, field, None)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    return dumps_str(values)
+
+
+def deserialize_user(raw: str) -> UserProfile:
+    """从紧凑字符串还原用户资料。
+
+    Args:
+        raw: serialize_user 生成的字符串
+
+    Returns:
+        UserProfile: 用户资料
+    """
+    data = dict(zip(_FIELDS, loads(raw)))
+    for field in _DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return UserProfile.model_construct(**data)
+
+
+class UserCache:
+    """两级用户资料缓存。"""
+
+    def __init__(
+        self,
+        local_ttl: float = 30,
+        remote_ttl: int = 300,
+        max_entries: int = 10000,
+        remote: RedisCache | None = None
+    ):
+        """初始化用户缓存。
+
+        Args:
+            local_ttl: 进程内缓存有效期（秒）
+            remote_ttl: 共享缓存有效期（秒）
+            max_entries: 进程内缓存最大条目数
+            remote: 共享缓存层，None 表示只使用进程内缓存
+        """
+        self.local = MemoryCache(max_entries=max_entries)
+        self.local_ttl = local_ttl
+        self.remote = remote
+        self.remote_ttl = remote_ttl
+        self._inflight: dict[int, asyncio.Future] = {}
+        # 回源期间被失效的用户，查询结果可能是旧数据，不回填缓存
+        self._stale: set[int] = set()
+        self._stats = {
+            "local_hits": 0,
+            "remote_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "errors": 0,
+        }
+
+    async def get(
+        self,
+        user_id: int,
+        loader: Callable[[], Awaitable[object | None]]
+    ) -> UserProfile | None:
+        """读取用户资料，未命中时调用 loader 回源。
+
+        Args:
+            user_id: 用户 ID
+            loader: 回源函数，返回 User 模型或 None
+
+        Returns:
+            用户资料，用户不存在时返回 None
+        """
+        raw = self.local.get_nowait(_key(user_id))
+        if raw is not None:
+            self._stats["local_hits"] += 1
+            return None if raw == _MISSING else deserialize_user(raw)
+
+        inflight = self._inflight.get(user_id)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            profile = await self._load(user_id, loader)
+            future.set_result(profile)
+            return profile
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(user_id) is future:
+                del self._inflight[user_id]
+            self._stale.discard(user_id)
+
+    async def _load(self, user_id: int, loader) -> UserProfile | None:
+        """依次查询共享缓存和数据库，并回填缓存。"""
+        key = _key(user_id)
+        if self.remote is not None:
+            try:
+                raw = await self.remote.get(key)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"读取用户共享缓存失败: user_id={user_id}, error={e}")
+                raw = None
+            if raw is not None:
+                self._stats["remote_hits"] += 1
+                self.local.set_nowait(key, raw, self.local_ttl)
+                return deserialize_user(raw)
+
+        self._stats["misses"] += 1
+        self._stats["loads"] += 1
+        user = await loader()
+        if user_id in self._stale:
+            return deserialize_user(serialize_user(user)) if user is not None else None
+        if user is None:
+            self.local.set_nowait(key, _MISSING, _MISSING_TTL)
+            return None
+
+        raw = serialize_user(user)
+        self.local.set_nowait(key, raw, self.local_ttl)
+        if self.remote is not None:
+            try:
+                await self.remote.set(key, raw, ttl=self.remote_ttl)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"写入用户共享缓存失败: user_id={user_id}, error={e}")
+        return deserialize_user(raw)
+
+    async def invalidate(self, user_id: int) -> None:
+        """使用户资料缓存失效。应在写操作提交之后调用。
+
+        其他进程的本地缓存最多在 local_ttl 后过期。
+
+        Args:
+            user_id: 用户 ID
+        """
+        self._stats["invalidations"] += 1
+        if user_id in self._inflight:
+            self._stale.add(user_id)
+            # 之后的读取重新回源，不再等待可能读到旧数据的查询
+            del self._inflight[user_id]
+        await self.local.delete(_key(user_id))
+        if self.remote is not None:
+            try:
+                await self.remote.delete(_key(user_id))
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"删除用户共享缓存失败: user_id={user_id}, error={e}")
+
+    def stats(self) -> dict:
+        """获取缓存统计信息。
+
+        Returns:
+            命中、回源、合并等计数以及命中率
+        """
+        hits = self._stats["local_hits"] + self._stats["remote_hits"] + self._stats["coalesced"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "remote_enabled": self.remote is not None,
+        }
+
+
+@lru_cache()
+def get_user_cache() -> UserCache:
+    """获取用户缓存单例。
+
+    Returns:
+        UserCache: 根据配置创建的用户缓存
+    """
+    settings = get_settings()
+    return UserCache(
+        local_ttl=settings.user_cache_local_ttl,
+        remote_ttl=settings.user_cache_ttl,
+        max_entries=settings.user_cache_max_entries,
+        remote=RedisCache() if settings.cache_backend == "redis" else None,
+    )
+
+
+async def get_user_profile(session, user_id: int) -> UserProfile | None:
+    """通过缓存读取用户资料，未命中时使用给定会话按主键查询。
+
+    Args:
+        session: 异步数据库会话
+        user_id: 用户 ID
+
+    Returns:
+        用户资料，用户不存在时返回 None
+    """
+    from app.models.user import User
+
+    return await get_user_cache().get(user_id, lambda: session.get(User, user_id))
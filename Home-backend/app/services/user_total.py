@@ -0,0 +1,110 @@
+"""用户总数统计模块。
+
+InnoDB 上的 SELECT COUNT(*) 需要扫描整棵索引，用户表越大越慢。
+用户列表的总数改为读取缓存计数：
+- 创建、删除用户时按增量调整
+- 缓存过期或由定时任务重新统计时校准
+
+另提供基于 information_schema 表统计信息的估算值，完全不扫描表。
+"""
+
+import logging
+
+from sqlalchemy import func, select, text
+
+from app.infrastructure.cache import get_cache
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+USER_TOTAL_KEY = "user_total"
+
+_ESTIMATE_SQL = text(
+    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users'"
+)
+
+
+async def count_users(session) -> int:
+    """精确统计用户总数。
+
+    Args:
+        session: 异步数据库会话
+
+    Returns:
+        用户总数
+    """
+    from app.models.user import User
+
+    result = await session.execute(select(func.count()).select_from(User))
+    return result.scalar()
+
+
+async def estimate_users(session) -> int | None:
+    """读取 InnoDB 表统计信息中的估算行数。
+
+    估算值来自采样统计，误差可能达到百分之几十，只适合展示量级。
+
+    Args:
+        session: 异步数据库会话
+
+    Returns:
+        估算行数，无法读取统计信息时返回 None
+    """
+    try:
+        result = await session.execute(_ESTIMATE_SQL)
+        value = result.scalar()
+        return int(value) if value is not None else None
+    except Exception as e:
+        logger.warning(f"读取用户表统计信息失败: {e}")
+        return None
+
+
+async def get_user_total(session) -> int:
+    """获取用户总数（优先读取缓存计数）。
+
+    Args:
+        session: 异步数据库会话
+
+    Returns:
+        用户总数
+    """
+    try:
+        cached = await get_cache().get(USER_TOTAL_KEY)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.warning(f"读取用户总数缓存失败: {e}")
+
+    return await reconcile_user_total(session)
+
+
+async def reconcile_user_total(session) -> int:
+    """重新统计用户总数并写入缓存，修正增量维护产生的偏差。
+
+    Args:
+        session: 异步数据库会话
+
+    Returns:
+        用户总数
+    """
+    total = await count_users(session)
+    try:
+        await get_cache().set(USER_TOTAL_KEY, str(total), ttl=get_settings().user_total_ttl)
+    except Exception as e:
+        logger.warning(f"写入用户总数缓存失败: {e}")
+    return total
+
+
+async def adjust_user_total(delta: int) -> None:
+    """按增量调整缓存中的用户总数。应在写操作提交之后调用。
+
+    Args:
+        delta: 增量（创建为 1，删除为 -1）
+    """
+    try:
+        value = await get_cache().incr_if_exists(USER_TOTAL_KEY, delta)
+        if value is not None and value < 0:
+            await get_cache().delete(USER_TOTAL_KEY)
+    except Exception as e:
+        logger.warning(f"调整用户总数缓存失败: delta={delta}, error={e}")
@@ -4,13 +4,11 @@ import logging
 from datetime import datetime
 from app.infrastructure.celery_app import celery_app
 from app.core.async_helpers import run_async
-from app.models.notification import Notification
-from app.models.behavior import Behavior
-from app.schemas.notification import NotificationCategory
-import app.infrastructure.database as db
 
 logger = logging.getLogger(__name__)
 
+CARE_COLLAPSE_KEY = "late_night_care"
+
 @celery_app.task
 def send_late_night_care_notification(user_id: int):
     """发送深夜回家关怀通知。"""
@@ -23,27 +21,20 @@ def send_late_night_care_notification(user_id: int):
 
 async def _send_care_logic(user_id: int):
     """异步执行关怀通知逻辑。"""
+    # 任务执行时才导入数据库与服务模块，Celery beat 导入任务模块时不加载它们
+    import app.infrastructure.database as db
+    from app.models.behavior import Behavior
+    from app.schemas.behavior import BehaviorResponse
+    from app.schemas.notification import NotificationCategory
+    from app.services.change_tracker import notify_user_change
+    from app.services.notification_service import NotificationService
+
     logger.info(f"Executing _send_care_logic for user_id={user_id}")
     if db.async_session_maker is None:
         db.init_mysql()
 
     async with db.async_session_maker() as session:
-        # 1. 创建通知
-        title = "回家关怀"
-        content = "陈先生，检测到您深夜回家，空调为您开启，请注意休息。"
-        
-        notification = Notification(
-            user_id=user_id,
-            category=NotificationCategory.REMINDER.value,
-            title=title,
-            content=content,
-            is_read=False,
-            created_at=datetime.now()
-        )
-        session.add(notification)
-        logger.info(f"Notification added to session for user_id={user_id}")
-        
-        # 2. 模拟自动开启空调的行为记录
+        # 1. 模拟自动开启空调的行为记录
         ac_behavior = Behavior(
             user_id=user_id,
             device_id="ac",
@@ -54,6 +45,23 @@ async def _send_care_logic(user_id: int):
         )
         session.add(ac_behavior)
         logger.info(f"AC behavior added to session for user_id={user_id}")
-        
-        await session.commit()
+
+        # 2. 创建通知（与行为记录一起提交），未读的关怀通知折叠为一条
+        # 通知服务负责更新未读数缓存并推送到消息页
+        await NotificationService(session).create_notification(
+            user_id=user_id,
+            category=NotificationCategory.REMINDER,
+            title="回家关怀",
+            content="陈先生，检测到您深夜回家，空调为您开启，请注意休息。",
+            created_at=datetime.now(),
+            collapse_key=CARE_COLLAPSE_KEY
+        )
         logger.info(f"Care logic committed successfully for user_id={user_id}")
+
+        # 3. 推送行为记录到仪表盘
+        await session.refresh(ac_behavior)
+        await notify_user_change(
+            user_id,
+            "behavior.created",
+            BehaviorResponse.model_validate(ac_behavior).model_dump(mode="json")
+        )
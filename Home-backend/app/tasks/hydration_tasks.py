@@ -4,12 +4,8 @@
 """
 
 import logging
-from sqlalchemy import select
-
 from app.infrastructure.celery_app import celery_app
 from app.core.async_helpers import run_async
-from app.services.hydration_service import HydrationService
-import app.infrastructure.database as db
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +31,10 @@ async def _check_logic(user_id: int):
     Args:
         user_id: 用户 ID
     """
+    # 任务执行时才导入数据库与服务模块，Celery beat 导入任务模块时不加载它们
+    import app.infrastructure.database as db
+    from app.services.hydration_service import HydrationService
+
     # 确保数据库已初始化
     if db.async_session_maker is None:
         if not db.engine:
@@ -61,12 +61,15 @@ def trigger_daily_hydration_checks():
 
 async def _trigger_all_users():
     """异步触发所有用户的喝水提醒检查。"""
+    from sqlalchemy import select
+
+    import app.infrastructure.database as db
+    from app.models.user import User
+
     # 确保数据库已初始化
     if db.async_session_maker is None:
         db.init_mysql()
 
-    from app.models.user import User
-
     async with db.async_session_maker() as session:
         query = select(User.id).where(User.is_active == True)
         result = await session.execute(query)
@@ -0,0 +1,48 @@
+"""通知保留策略 Celery 任务模块。
+
+由 Celery Beat 每天调用，按配置归档并清理过期通知。
+"""
+
+import logging
+
+from app.core.async_helpers import run_async
+from app.infrastructure.celery_app import celery_app
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def purge_expired_notifications():
+    """归档并删除超过保留期的通知。
+
+    Returns:
+        统计信息：archived、deleted、batches
+    """
+    try:
+        return run_async(_purge_logic())
+    except Exception as e:
+        logger.error(f"Notification purge failed: {e}")
+        raise
+
+
+async def _purge_logic() -> dict[str, int]:
+    """异步执行通知清理。"""
+    # 任务执行时才导入数据库与服务模块，Celery beat 导入任务模块时不加载它们
+    import app.infrastructure.database as db
+    from app.services.notification_retention_service import NotificationRetentionService
+
+    # 确保数据库已初始化
+    if db.async_session_maker is None:
+        db.init_mysql()
+
+    settings = get_settings()
+    async with db.async_session_maker() as session:
+        service = NotificationRetentionService(session)
+        return await service.purge_expired(
+            read_retention_days=settings.notification_retention_days,
+            unread_retention_days=settings.notification_unread_retention_days,
+            batch_size=settings.notification_purge_batch_size,
+            pause_seconds=settings.notification_purge_pause_seconds,
+            archive=settings.notification_archive_enabled,
+        )
@@ -0,0 +1,133 @@
+"""语义记忆补处理 Celery 任务模块。
+
+行为记录的语义处理在 API 进程的后台任务中完成。LLM / Embedding 繁忙未获准入或
+进程重启导致处理中断时，记录的 semantic_content 保持为空，
+由 Celery Beat 定期调用本任务补处理。semantic_pack_size > 1 时每 semantic_pack_size 条
+行为合并为一次 LLM 调用生成描述。
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from app.core.async_helpers import run_async
+from app.infrastructure.celery_app import celery_app
+from app.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def backfill_semantic_memory_task():
+    """为缺少语义描述的行为记录补做语义处理。
+
+    Returns:
+        统计信息：pending、processed、deferred、failed
+    """
+    try:
+        return run_async(_backfill_logic())
+    except Exception as e:
+        logger.error(f"Semantic memory backfill failed: {e}")
+        raise
+
+
+async def _backfill_logic() -> dict[str, int]:
+    """异步执行语义记忆补处理。"""
+    # 任务执行时才导入数据库与服务模块，Celery beat 导入任务模块时不加载它们
+    from sqlalchemy import select, update
+
+    import app.infrastructure.database as db
+    from app.core.admission import AdmissionRejectedError
+    from app.core.circuit_breaker import OPEN, CircuitOpenError, get_breaker
+    from app.infrastructure.dependencies import (
+        get_embedding_service,
+        get_llm_service,
+        get_milvus_service_obj,
+    )
+    from app.infrastructure.metrics import deferred_work
+    from app.models.behavior import Behavior
+    from app.services.behavior_service import (
+        BehaviorService,
+        describe_behaviors,
+        fallback_description,
+    )
+    from app.services.change_tracker import notify_user_change
+
+    # 确保数据库已初始化
+    if db.async_session_maker is None:
+        db.init_mysql()
+
+    settings = get_settings()
+    # 服务商熔断期间本批次必然全部失败，直接跳过
+    if get_breaker("embedding").state == OPEN or (
+        get_breaker("llm").state == OPEN and not settings.semantic_fallback_template
+    ):
+        logger.info("Semantic memory backfill skipped: provider circuit open")
+        return {"pending": 0, "processed": 0, "deferred": 0, "failed": 0}
+
+    now = datetime.now()
+    async with db.async_session_maker() as session:
+        result = await session.execute(
+            select(Behavior.id, Behavior.user_id, Behavior.raw_content, Behavior.action_type, Behavior.details)
+            .where(
+                Behavior.semantic_content.is_(None),
+                Behavior.timestamp < now - timedelta(seconds=settings.semantic_backfill_delay),
+                Behavior.timestamp >= now - timedelta(hours=settings.semantic_backfill_max_age_hours),
+            )
+            # 按 (timestamp, id) 索引顺序扫描时间窗口，取满一批即停止
+            .order_by(Behavior.timestamp, Behavior.id)
+            .limit(settings.semantic_backfill_batch_size)
+        )
+        pending = result.all()
+
+    stats = {"pending": len(pending), "processed": 0, "deferred": 0, "failed": 0}
+    if not pending:
+        return stats
+
+    service = BehaviorService(get_llm_service(), get_embedding_service(), get_milvus_service_obj())
+
+    def item(row) -> tuple[str, dict]:
+        return str(row.raw_content or row.action_type), dict(row.details) if row.details else {}
+
+    async def process(row, description: str | Exception | None = None) -> None:
+        if isinstance(description, CircuitOpenError) and settings.semantic_fallback_template:
+            description = fallback_description(*item(row))
+        try:
+            if description is None:
+                semantic_content = await service.process_semantic_memory(row.id, row.user_id, *item(row))
+            elif isinstance(description, Exception):
+                raise description
+            else:
+                semantic_content = description
+                await service.index_semantic_memory(row.id, row.user_id, semantic_content)
+        except AdmissionRejectedError:
+            # 仍然繁忙，留到下次执行
+            stats["deferred"] += 1
+            deferred_work.labels("backfill_semantic_memory").inc()
+            return
+        except Exception as e:
+            stats["failed"] += 1
+            logger.warning(f"Semantic memory backfill failed: behavior_id={row.id}, error={e}")
+            return
+
+        async with db.async_session_maker() as session:
+            await session.execute(
+                update(Behavior).where(Behavior.id == row.id).values(semantic_content=semantic_content)
+            )
+            await session.commit()
+        await notify_user_change(row.user_id, "behavior.updated", {"id": row.id, "semantic_content": semantic_content})
+        stats["processed"] += 1
+
+    # 并发由 LLM / Embedding 的准入控制限制
+    pack_size = settings.semantic_pack_size
+    if pack_size > 1:
+        chunks = [pending[i:i + pack_size] for i in range(0, len(pending), pack_size)]
+        packed = await asyncio.gather(
+            *(describe_behaviors(service.llm_service, [item(row) for row in chunk]) for chunk in chunks)
+        )
+        descriptions = [description for chunk in packed for description in chunk]
+        await asyncio.gather(*(process(row, d) for row, d in zip(pending, descriptions)))
+    else:
+        await asyncio.gather(*(process(row) for row in pending))
+    logger.info(f"Semantic memory backfill finished: {stats}")
+    return stats
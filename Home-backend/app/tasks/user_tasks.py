@@ -0,0 +1,44 @@
+"""用户统计 Celery 任务模块。
+
+定期重新统计用户总数，校准创建/删除时增量维护的缓存计数。
+"""
+
+import logging
+
+from app.core.async_helpers import run_async
+from app.infrastructure.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def reconcile_user_total_task():
+    """重新统计用户总数并写入缓存。
+
+    CACHE_BACKEND=memory 时计数只存在于各进程内，本任务只能校准 Celery 进程，
+    API 进程依靠 USER_TOTAL_TTL 过期后自行校准。
+
+    Returns:
+        用户总数
+    """
+    try:
+        return run_async(_reconcile_logic())
+    except Exception as e:
+        logger.error(f"User total reconcile failed: {e}")
+        raise
+
+
+async def _reconcile_logic() -> int:
+    """异步执行用户总数校准。"""
+    # 任务执行时才导入数据库与服务模块，Celery beat 导入任务模块时不加载它们
+    import app.infrastructure.database as db
+    from app.services.user_total import reconcile_user_total
+
+    # 确保数据库已初始化
+    if db.async_session_maker is None:
+        db.init_mysql()
+
+    async with db.async_session_maker() as session:
+        total = await reconcile_user_total(session)
+    logger.info(f"User total reconciled: total={total}")
+    return total
@@ -4,8 +4,13 @@
 """
 
 from app.utils.datetime import calculate_minutes_ago, ensure_timezone_aware
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
 
 __all__ = [
     "calculate_minutes_ago",
     "ensure_timezone_aware",
+    "encode_cursor",
+    "decode_cursor",
+    "apply_keyset",
+    "split_page",
 ]
@@ -0,0 +1,94 @@
+"""游标分页工具模块。
+
+提供基于 (排序时间, id) 的键集（keyset）分页辅助函数。
+与 OFFSET 分页相比，每一页只需沿索引定位到游标位置再取 limit 行，
+页码再深查询成本也保持不变，且翻页期间新插入的记录不会造成重复。
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """将 (排序时间, id) 编码为不透明游标字符串。
+
+    Args:
+        sort_value: 当前页最后一行的排序时间
+        row_id: 当前页最后一行的 ID
+
+    Returns:
+        URL 安全的 base64 游标
+    """
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """解析游标字符串。
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (排序时间, id) 元组
+
+    Raises:
+        ValueError: 游标格式非法时
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_raw, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(sort_raw), int(row_id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def apply_keyset(query, sort_column, id_column, cursor: str | None, limit: int):
+    """为查询追加倒序键集分页条件。
+
+    排序固定为 (sort_column DESC, id_column DESC)，多取一行用于判断是否还有下一页。
+    条件展开为 ``sort < :s OR (sort = :s AND id < :i)``，以便 MySQL 使用复合索引做范围扫描。
+
+    Args:
+        query: SQLAlchemy Select 查询
+        sort_column: 排序时间列
+        id_column: 主键列
+        cursor: 上一页返回的游标（首页为 None）
+        limit: 页大小
+
+    Returns:
+        追加了游标条件、排序和 limit + 1 的查询
+
+    Raises:
+        ValueError: 游标格式非法时
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id),
+            )
+        )
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: list, limit: int, sort_attr: str) -> tuple[list, str | None]:
+    """拆分多取的一行，生成下一页游标。
+
+    Args:
+        rows: apply_keyset 查询返回的记录（最多 limit + 1 条）
+        limit: 页大小
+        sort_attr: 排序时间字段名
+
+    Returns:
+        (当前页记录, 下一页游标)，没有下一页时游标为 None
+    """
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_attr), last.id)
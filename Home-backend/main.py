@@ -3,18 +3,24 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 
+from app.core.json_response import default_response_class
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.security import shutdown_password_hasher, start_password_hasher
+from app.core.tracing import TracingMiddleware
 from app.infrastructure.config import get_settings
 from app.infrastructure.database import init_databases, close_databases
+from app.infrastructure.event_bus import get_event_bus
+from app.infrastructure.metrics import get_exporter
+from app.infrastructure.redis_client import close_redis
+from app.infrastructure.warmup import get_warmup
 from app.api.v1 import api_router
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 配置日志（经队列由后台线程写出）
+setup_logging()
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
@@ -30,13 +36,24 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 应用启动中...")
     await init_databases()
     logger.info("✅ 数据库连接已初始化")
+    await get_event_bus().start()
+    await start_password_hasher()
+    get_exporter().start()
+    # 后台预热连接池和外部服务客户端，完成前 /ready 返回 503
+    get_warmup().start()
 
     yield
 
     # 关闭时执行
     logger.info("🛑 应用关闭中...")
+    await get_warmup().stop()
+    await get_exporter().stop()
+    await get_event_bus().stop()
+    shutdown_password_hasher()
+    await close_redis()
     await close_databases()
     logger.info("✅ 数据库连接已关闭")
+    shutdown_logging()
 
 
 # 创建 FastAPI 应用
@@ -45,6 +62,8 @@ app = FastAPI(
     version=settings.app_version,
     description="基于 FastAPI 的后端服务",
     lifespan=lifespan,
+    # 旧版本 FastAPI 使用 orjson 编码响应；新版本保留 Pydantic 直接序列化
+    default_response_class=default_response_class(),
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
@@ -58,8 +77,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# 链路追踪（TRACING_EXPORTER=none 时直接透传；位于 CORS 外层，预检请求也有跨度）
+app.add_middleware(TracingMiddleware)
+
+# 请求指标（最后添加，位于最外层：统计包括 CORS 预检在内的全部请求，耗时包含链路追踪开销）
+app.add_middleware(RequestMetricsMiddleware)
+
 
 # 全局异常处理
 @app.exception_handler(Exception)
@@ -85,10 +111,32 @@ async def root():
 
 @app.get("/health", tags=["系统"])
 async def health_check():
-    """健康检查端点。"""
+    """健康检查端点（存活探针，进程可响应即返回 healthy）。"""
     return {"status": "healthy"}
 
 
+@app.get("/ready", tags=["系统"])
+async def readiness_check():
+    """就绪检查端点（就绪探针）。
+
+    启动预热完成且 MySQL 可用时返回 200，否则返回 503；MySQL 预热失败时在后台重试，
+    成功后恢复为 200。
+    响应中包含每个依赖的预热状态、耗时和错误信息。
+    """
+    warmup = get_warmup()
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.status())
+
+
+@app.get("/metrics", tags=["系统"], include_in_schema=False)
+async def metrics():
+    """Prometheus 指标端点。
+
+    配置了 METRICS_DIR 时合并所有 worker 进程的指标，否则只输出当前进程。
+    """
+    content = await get_exporter().collect()
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # 注册路由
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
@@ -101,5 +149,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        # 不使用 uvicorn 自带的同步日志配置，访问日志经应用的日志队列输出
+        log_config=None
     )
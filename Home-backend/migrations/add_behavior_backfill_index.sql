@@ -0,0 +1,5 @@
+-- 语义记忆补处理按时间窗口查询缺少语义描述的行为，添加 (timestamp, id) 索引避免全表扫描
+-- 执行方式：mysql -u your_user -p your_database < migrations/add_behavior_backfill_index.sql
+
+ALTER TABLE behaviors
+ADD INDEX ix_behaviors_timestamp_id (timestamp, id);
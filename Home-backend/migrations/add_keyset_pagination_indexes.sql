@@ -0,0 +1,11 @@
+-- 添加游标分页所需的复合索引
+-- 执行方式：mysql -u your_user -p your_database < migrations/add_keyset_pagination_indexes.sql
+
+ALTER TABLE notifications
+ADD INDEX ix_notifications_user_created_id (user_id, created_at, id);
+
+ALTER TABLE behaviors
+ADD INDEX ix_behaviors_user_timestamp_id (user_id, timestamp, id);
+
+ALTER TABLE users
+ADD INDEX ix_users_created_id (created_at, id);
@@ -0,0 +1,16 @@
+-- 通知折叠：同一用户同一折叠键的未读通知只保留一条，重复事件只累加次数
+-- 执行方式：mysql -u your_user -p your_database < migrations/add_notification_collapse.sql
+
+ALTER TABLE notifications
+ADD COLUMN collapse_key VARCHAR(100) NULL COMMENT 'Collapse Key for repeated notifications',
+ADD COLUMN occurrence_count INT NOT NULL DEFAULT 1 COMMENT 'Collapsed Occurrences',
+ADD COLUMN updated_at DATETIME NULL COMMENT 'Last Occurrence Time',
+ADD COLUMN unread_collapse_key VARCHAR(100)
+    GENERATED ALWAYS AS (CASE WHEN is_read = 0 THEN collapse_key END) VIRTUAL
+    COMMENT 'Collapse Key while unread',
+ADD UNIQUE INDEX ux_notifications_user_unread_collapse (user_id, unread_collapse_key);
+
+ALTER TABLE notifications_archive
+ADD COLUMN collapse_key VARCHAR(100) NULL COMMENT 'Collapse Key for repeated notifications',
+ADD COLUMN occurrence_count INT NOT NULL DEFAULT 1 COMMENT 'Collapsed Occurrences',
+ADD COLUMN updated_at DATETIME NULL COMMENT 'Last Occurrence Time';
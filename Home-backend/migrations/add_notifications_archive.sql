@@ -0,0 +1,15 @@
+-- 创建通知归档表，供通知保留策略任务使用
+-- 执行方式：mysql -u your_user -p your_database < migrations/add_notifications_archive.sql
+
+CREATE TABLE IF NOT EXISTS notifications_archive (
+    id INT NOT NULL COMMENT 'Original Notification ID',
+    user_id INT NOT NULL COMMENT 'User ID',
+    category VARCHAR(50) NOT NULL COMMENT 'Category: system, reminder, alert',
+    title VARCHAR(255) NOT NULL COMMENT 'Notification Title',
+    content TEXT NULL COMMENT 'Notification Content',
+    is_read TINYINT(1) DEFAULT 0 COMMENT 'Is Read',
+    created_at DATETIME NULL COMMENT 'Creation Time',
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Archive Time',
+    PRIMARY KEY (id),
+    INDEX ix_notifications_archive_user_created (user_id, created_at)
+);
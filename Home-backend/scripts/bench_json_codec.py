@@ -0,0 +1,112 @@
+"""JSON 编解码基准测试。
+
+以接近真实数据的 BehaviorResponse 列表为样本，比较标准库 json 与 json_codec（orjson）：
+- 响应编码：Pydantic 直接序列化（新版本 FastAPI）、dict + 标准库（旧版本 FastAPI 默认）、
+  dict + json_codec（旧版本 FastAPI 使用 FastJSONResponse）
+- JSON 列：Behavior.details 的编码与解码
+- Celery 消息：Celery 自带 json 序列化器与 fastjson 序列化器的编码与解码
+
+用法：
+    python scripts/bench_json_codec.py --rows 100 --repeat 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kombu.serialization import dumps as kombu_dumps  # noqa: E402
+from kombu.serialization import loads as kombu_loads  # noqa: E402
+from kombu.serialization import prepare_accept_content  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core import json_codec  # noqa: E402
+from app.schemas.behavior import BehaviorResponse  # noqa: E402
+
+DEVICES = [
+    ("air_conditioner", "set_temperature", {"temperature": 24, "mode": "cool", "fan": "auto", "room": "客厅"}),
+    ("door", "unlock_door", {"method": "fingerprint", "battery": 87}),
+    ("water_dispenser", "drink_water", {"volume_ml": 250, "temperature": "warm"}),
+    ("light", "turn_on", {"brightness": 80, "color_temp": 4000, "room": "卧室"}),
+]
+
+
+def _behaviors(rows: int) -> list[BehaviorResponse]:
+    """生成 rows 条行为记录。"""
+    now = datetime(2026, 1, 1, 21, 30)
+    result = []
+    for i in range(rows):
+        device, action, details = DEVICES[i % len(DEVICES)]
+        ts = now - timedelta(minutes=i)
+        result.append(BehaviorResponse(
+            id=100000 + i,
+            user_id=101,
+            device_id=device,
+            action_type=action,
+            details=details,
+            raw_content=f"{device} {action}",
+            semantic_content="陈先生开启了客厅空调，温度设为24°C，制冷模式。",
+            timestamp=ts,
+            created_at=ts,
+        ))
+    return result
+
+
+def _bench(label: str, func, repeat: int) -> float:
+    """执行 repeat 次并输出每次耗时（微秒）。"""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    per_call = (time.perf_counter() - start) / repeat * 1e6
+    print(f"  {label:<36} {per_call:10.1f} us")
+    return per_call
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON 编解码基准测试")
+    parser.add_argument("--rows", type=int, default=100, help="每个响应的行为记录数")
+    parser.add_argument("--repeat", type=int, default=2000, help="每项测试的重复次数")
+    args = parser.parse_args()
+
+    rows = _behaviors(args.rows)
+    adapter = TypeAdapter(list[BehaviorResponse])
+    payload = adapter.dump_python(rows, mode="json")
+    print(f"json_codec 实现: {json_codec.BACKEND}，每个响应 {args.rows} 条记录")
+
+    print("响应编码")
+    _bench("Pydantic dump_json（新版本 FastAPI）", lambda: adapter.dump_json(rows), args.repeat)
+    _bench("dict + 标准库 json（旧版默认）", lambda: _stdlib_dumps(adapter.dump_python(rows, mode="json")), args.repeat)
+    _bench("dict + json_codec（FastJSONResponse）", lambda: json_codec.dumps(adapter.dump_python(rows, mode="json")), args.repeat)
+
+    print(f"JSON 列（{args.rows} 行 details）")
+    details = [row["details"] for row in payload]
+    encoded = [json.dumps(d) for d in details]
+    _bench("标准库 编码", lambda: [json.dumps(d) for d in details], args.repeat)
+    _bench("json_codec 编码", lambda: [json_codec.dumps_str(d) for d in details], args.repeat)
+    _bench("标准库 解码", lambda: [json.loads(s) for s in encoded], args.repeat)
+    _bench("json_codec 解码", lambda: [json_codec.loads(s) for s in encoded], args.repeat)
+
+    print("Celery 消息（以行为列表为任务参数）")
+    json_codec.register_celery_serializer()
+    accept = prepare_accept_content(["json", json_codec.CELERY_SERIALIZER])
+    body = [[payload], {}, {"callbacks": None, "errbacks": None, "chain": None, "chord": None}]
+
+    def roundtrip(serializer: str):
+        content_type, encoding, data = kombu_dumps(body, serializer=serializer)
+        return kombu_loads(data.encode(), content_type, encoding, accept=accept)
+
+    _bench("json 序列化器", lambda: roundtrip("json"), args.repeat)
+    _bench("fastjson 序列化器", lambda: roundtrip(json_codec.CELERY_SERIALIZER), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""日志调用开销基准测试。
+
+在事件循环中模拟每个事件输出 4 条 INFO 日志，分别测量：
+- 同步 StreamHandler（改造前 logging.basicConfig 的方式）
+- 队列 + 后台线程输出，不采样
+- 队列 + 后台线程输出，按默认配置采样（改造后 setup_logging 的方式）
+事件循环线程在 logger.info 上花费的总时间。
+
+日志写入临时文件；--write-latency-us 为每次写入增加延迟，
+模拟 stderr 管道被容器日志驱动反压时 write 阻塞的情况。
+
+用法：
+    python scripts/bench_logging.py --events 20000 --write-latency-us 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import logging_config  # noqa: E402
+from app.core.logging_config import TEXT_FORMAT, setup_logging, shutdown_logging  # noqa: E402
+
+logger = logging.getLogger("bench.behavior")
+
+
+class SlowStream:
+    """每次写入前等待固定时间的输出流。"""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+async def _emit(events: int) -> float:
+    """每个事件输出 4 条日志，返回调用方耗时（秒）。"""
+    start = time.perf_counter()
+    for i in range(events):
+        logger.info(f"行为记录已创建: id={i}, user_id=101")
+        logger.info(f"后台任务已触发: behavior_id={i}")
+        logger.info("检查深夜回家模式: device_id=door, action_type=open, hour=21")
+        logger.info("深夜回家模式触发成功: 触发关怀任务 for user_id=101")
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+def _run_sync(events: int, stream) -> float:
+    root = logging.getLogger()
+    root.handlers.clear()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    return asyncio.run(_emit(events))
+
+
+def _run_queue(events: int, stream, sample_burst: int) -> float:
+    # setup_logging 把日志写到 sys.stderr，测试期间临时替换
+    stderr, sys.stderr = sys.stderr, stream
+    logging_config.get_settings().log_sample_burst = sample_burst
+    try:
+        setup_logging()
+        elapsed = asyncio.run(_emit(events))
+        shutdown_logging()
+    finally:
+        sys.stderr = stderr
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="日志调用开销基准测试")
+    parser.add_argument("--events", type=int, default=20000, help="模拟的事件数（每个事件 4 条日志）")
+    parser.add_argument("--write-latency-us", type=float, default=0, help="每次写入的附加延迟（微秒）")
+    args = parser.parse_args()
+
+    burst = logging_config.get_settings().log_sample_burst
+    cases = (
+        ("同步 StreamHandler", _run_sync),
+        ("队列", lambda events, stream: _run_queue(events, stream, 0)),
+        (f"队列 + 采样({burst}/窗口)", lambda events, stream: _run_queue(events, stream, burst)),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for i, (name, run) in enumerate(cases):
+            path = os.path.join(directory, f"{i}.log")
+            with open(path, "w", encoding="utf-8") as stream:
+                elapsed = run(args.events, SlowStream(stream, args.write_latency_us / 1e6))
+            lines = sum(1 for _ in open(path, encoding="utf-8"))
+            per_call = elapsed / (args.events * 4) * 1e6
+            print(f"{name:<24} 调用方耗时 {elapsed * 1000:8.1f} ms  ({per_call:.2f} us/条)  输出 {lines} 行")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""密码哈希事件循环延迟基准测试。
+
+模拟并发注册：同时发起 N 个密码哈希，同时运行一个每 10 ms 唤醒一次的探针协程，
+记录探针实际唤醒时间与预期时间的偏差（即事件循环被阻塞的时长）。
+分别测试在事件循环中直接调用 hash_password（改造前）和
+使用 hash_password_async 进程池（改造后）两种方式。
+
+用法：
+    python scripts/bench_password_hashing.py --signups 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.security import (  # noqa: E402
+    hash_password,
+    hash_password_async,
+    shutdown_password_hasher,
+    start_password_hasher,
+)
+
+PROBE_INTERVAL = 0.01
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    """周期性唤醒并记录事件循环延迟（毫秒）。"""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def _signup_inline(password: str) -> None:
+    """改造前：在协程中直接计算 bcrypt。"""
+    hash_password(password)
+
+
+async def _signup_pool(password: str) -> None:
+    """改造后：在进程池中计算 bcrypt。"""
+    await hash_password_async(password)
+
+
+async def _run(name: str, signup, signups: int) -> None:
+    """并发执行注册并输出事件循环延迟统计。"""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[signup(f"password-{i}") for i in range(signups)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    print(
+        f"{name:<8} signups={signups} total={elapsed:.2f}s "
+        f"loop_lag_p50={statistics.median(lags) if lags else 0.0:.1f}ms "
+        f"p99={p99:.1f}ms max={lags[-1] if lags else 0.0:.1f}ms samples={len(lags)}"
+    )
+
+
+async def main(signups: int) -> None:
+    await _run("inline", _signup_inline, signups)
+    await start_password_hasher()
+    try:
+        await _run("pool", _signup_pool, signups)
+    finally:
+        shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="密码哈希事件循环延迟基准测试")
+    parser.add_argument("--signups", type=int, default=16, help="并发注册数")
+    args = parser.parse_args()
+    asyncio.run(main(args.signups))
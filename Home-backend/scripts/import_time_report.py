@@ -0,0 +1,112 @@
+"""进程启动导入耗时报告。
+
+在子进程中运行 `python -X importtime -c "import <模块>"`，汇总各入口模块
+（API、Celery worker/beat）的总导入时间和累计耗时最高的模块，并检查：
+- 总导入时间是否超过预算（--budget-ms）
+- 是否导入了不应在启动时加载的重量级 SDK（LangChain、OpenAI、pymilvus、passlib）
+
+任一检查失败时以非零状态退出，可在 CI 或容器构建中使用。
+
+用法：
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --top 15 --budget-ms 1500
+    python scripts/import_time_report.py --target app.infrastructure.celery_app --budget-ms 500
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 入口模块 -> 启动时禁止导入的模块（首次使用时才应加载）
+DEFAULT_TARGETS = {
+    "main": ["langchain_openai", "openai", "pymilvus", "passlib"],
+    # Celery beat 只需要定时配置，worker 在执行任务时才加载服务
+    "app.infrastructure.celery_app": ["langchain_openai", "openai", "pymilvus", "passlib", "sqlalchemy"],
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def measure(target: str) -> list[tuple[str, int, int, int]]:
+    """在新进程中测量导入耗时。
+
+    Args:
+        target: 入口模块名
+
+    Returns:
+        [(模块名, 自身耗时 us, 累计耗时 us, 嵌套深度)]，按导入完成顺序
+
+    Raises:
+        RuntimeError: 导入失败时抛出
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {target} 失败:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def report(target: str, forbidden: list[str], top: int, budget_ms: float | None) -> bool:
+    """输出单个入口模块的导入报告。
+
+    Args:
+        target: 入口模块名
+        forbidden: 启动时禁止导入的顶层模块
+        top: 输出累计耗时最高的模块数
+        budget_ms: 总导入时间预算（毫秒），None 表示不检查
+
+    Returns:
+        是否通过全部检查
+    """
+    rows = measure(target)
+    total_ms = next((cumulative for name, _, cumulative, _ in rows if name == target), 0) / 1000
+
+    print(f"\n== {target}: {total_ms:.0f} ms, {len(rows)} 个模块")
+    # 只列出顶层包（深度 <= 1 的模块），避免同一条导入链重复出现
+    top_level = sorted((r for r in rows if r[3] <= 1 and r[0] != target), key=lambda r: r[2], reverse=True)
+    for name, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (自身 {self_us / 1000:6.1f} ms)  {name}")
+
+    ok = True
+    imported = {name for name, *_ in rows}
+    loaded = [m for m in forbidden if m in imported]
+    if loaded:
+        ok = False
+        print(f"  失败: 启动时导入了 {', '.join(loaded)}")
+    if budget_ms is not None and total_ms > budget_ms:
+        ok = False
+        print(f"  失败: 导入耗时 {total_ms:.0f} ms 超过预算 {budget_ms:.0f} ms")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="进程启动导入耗时报告")
+    parser.add_argument("--target", action="append", help="入口模块，可重复；默认检查 API 和 Celery")
+    parser.add_argument("--top", type=int, default=10, help="输出累计耗时最高的模块数")
+    parser.add_argument("--budget-ms", type=float, default=None, help="每个入口的导入时间预算（毫秒）")
+    args = parser.parse_args()
+
+    targets = {t: DEFAULT_TARGETS.get(t, []) for t in args.target} if args.target else DEFAULT_TARGETS
+    results = [report(target, forbidden, args.top, args.budget_ms) for target, forbidden in targets.items()]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""本地替身服务商：OpenAI 兼容的 Chat Completions 与 Embeddings 接口。
+
+可配置固定延迟、随机抖动和错误率，用于在本地验证多服务商路由、故障转移和对冲。
+测试中通过 serve() 在后台线程启动；也可以单独运行：
+
+    python -m tests.fake_provider --name slow --port 9001 --latency 0.5 --error-rate 0.1
+
+然后设置 LLM_API_BASE=http://127.0.0.1:9001/v1（或写入 LLM_EXTRA_PROVIDERS）。
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(name: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    """创建替身服务商应用。
+
+    app.state 上的 latency、jitter、error_rate 可在运行中修改，
+    calls 记录收到的请求数，cancelled 记录处理中途断开的请求数。
+
+    Args:
+        name: 服务商名称，会出现在回复内容中
+        latency: 每个请求的固定延迟（秒）
+        jitter: 额外的随机延迟上限（秒）
+        error_rate: 返回 503 的概率
+    """
+    app = FastAPI()
+    app.state.name = name
+    app.state.latency = latency
+    app.state.jitter = jitter
+    app.state.error_rate = error_rate
+    app.state.calls = 0
+    app.state.cancelled = 0
+
+    async def simulate() -> JSONResponse | None:
+        app.state.calls += 1
+        try:
+            await asyncio.sleep(app.state.latency + random.uniform(0, app.state.jitter))
+        except asyncio.CancelledError:
+            app.state.cancelled += 1
+            raise
+        if random.random() < app.state.error_rate:
+            return JSONResponse({"error": {"message": f"{name} unavailable"}}, status_code=503)
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await simulate()
+        if error is not None:
+            return error
+        content = f"{name}: {body['messages'][-1]['content']}"
+        created = int(time.time())
+        if not body.get("stream"):
+            return {
+                "id": f"chatcmpl-{name}",
+                "object": "chat.completion",
+                "created": created,
+                "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": len(content), "total_tokens": len(content) + 1},
+            }
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            data = {
+                "id": f"chatcmpl-{name}",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for char in content:
+                yield chunk({"content": char})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = await simulate()
+        if error is not None:
+            return error
+        dimensions = body.get("dimensions", 8)
+        # 向量首位标记服务商，便于测试判断请求由谁处理
+        vector = [float(len(name))] + [0.0] * (dimensions - 1)
+        return {
+            "object": "list",
+            "model": body["model"],
+            "data": [{"object": "embedding", "index": 0, "embedding": vector}],
+            "usage": {"prompt_tokens": 1, "total_tokens": 1},
+        }
+
+    return app
+
+
+@contextmanager
+def serve(app: FastAPI) -> Iterator[str]:
+    """在后台线程中启动应用，返回 API 地址（http://127.0.0.1:端口/v1）。"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地替身 LLM / Embedding 服务商")
+    parser.add_argument("--name", default="fake", help="服务商名称")
+    parser.add_argument("--port", type=int, default=9001, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.0, help="固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.name, args.latency, args.jitter, args.error_rate),
+        host="127.0.0.1",
+        port=args.port,
+    )
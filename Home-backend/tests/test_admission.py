@@ -0,0 +1,118 @@
+"""外部调用准入控制测试。"""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import (
+    AdaptiveLimiter,
+    AdmissionRejectedError,
+    classify_exception,
+)
+from app.infrastructure.metrics import admission_limit_decreases, admission_rejected
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+
+async def test_limit_and_fifo_queue():
+    """测试超出并发上限的调用按先后顺序排队。"""
+    limiter = AdaptiveLimiter("test_fifo", max_limit=2)
+    running = 0
+    peak = 0
+    order = []
+
+    async def call(i: int):
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            order.append(i)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call(i) for i in range(6)))
+
+    assert peak == 2
+    assert order == list(range(6))
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+async def test_reject_when_queue_full_or_timeout():
+    """测试等待队列已满和等待超时时拒绝调用并计数。"""
+    limiter = AdaptiveLimiter("test_reject", max_limit=1, max_queue=1, queue_timeout=0.05)
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejectedError) as exc:
+        await limiter.acquire()
+    assert exc.value.reason == "queue_full"
+
+    with pytest.raises(AdmissionRejectedError) as exc:
+        await waiting
+    assert exc.value.reason == "timeout"
+    assert admission_rejected.labels("test_reject", "queue_full").value == 1
+    assert admission_rejected.labels("test_reject", "timeout").value == 1
+    assert limiter.in_flight == 1
+
+
+async def test_aimd_adjustment():
+    """测试限流时上限减半（冷却期内只减一次），成功且未超时时缓慢恢复。"""
+    limiter = AdaptiveLimiter("test_aimd", max_limit=8, decrease_interval=60)
+
+    for _ in range(3):
+        with pytest.raises(_RateLimitError):
+            async with limiter.slot():
+                raise _RateLimitError()
+    assert limiter.capacity == 4
+    assert admission_limit_decreases.labels("test_aimd", "rate_limited").value == 1
+
+    # 约一轮（limit 次）成功调用后上限 +1
+    for _ in range(4):
+        async with limiter.slot():
+            pass
+    assert limiter.capacity == 4
+    async with limiter.slot():
+        pass
+    assert limiter.capacity == 5
+
+
+async def test_slow_calls_decrease_limit():
+    """测试调用耗时超过目标时下调上限，普通错误不下调。"""
+    limiter = AdaptiveLimiter("test_latency", max_limit=4, latency_target=0.1)
+
+    limiter.in_flight = 1
+    limiter.release("error", 0.01)
+    assert limiter.capacity == 4
+
+    limiter.in_flight = 1
+    limiter.release("success", 0.5)
+    assert limiter.capacity == 2
+    assert admission_limit_decreases.labels("test_latency", "latency").value == 1
+
+
+async def test_slot_latency_from_mark():
+    """测试 measure_latency=False 时只以标记的延迟调整上限，不以总耗时下调。"""
+    limiter = AdaptiveLimiter("test_mark", max_limit=4, latency_target=0.05)
+
+    async with limiter.slot(measure_latency=False) as timer:
+        timer.mark()
+        await asyncio.sleep(0.1)
+    assert limiter.capacity == 4
+
+    async with limiter.slot(measure_latency=False) as timer:
+        await asyncio.sleep(0.1)
+        timer.mark()
+    assert limiter.capacity == 2
+    assert limiter.in_flight == 0
+
+
+def test_classify_exception():
+    """测试根据异常识别限流和超时。"""
+    assert classify_exception(_RateLimitError()) == "rate_limited"
+    assert classify_exception(asyncio.TimeoutError()) == "timeout"
+    assert classify_exception(type("APITimeoutError", (Exception,), {})()) == "timeout"
+    assert classify_exception(ValueError()) == "error"
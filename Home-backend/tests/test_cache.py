@@ -0,0 +1,36 @@
+"""进程内缓存测试。"""
+
+import time
+
+from app.infrastructure.cache import MemoryCache
+
+
+async def test_ttl_and_lru_eviction():
+    """测试过期与 LRU 淘汰。"""
+    cache = MemoryCache(max_entries=2)
+    await cache.set("a", "1", ttl=0.05)
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+
+    # 访问 a 后 b 成为最久未使用的条目
+    await cache.set("c", "3")
+    assert await cache.get("b") is None
+    assert await cache.get_many(["a", "c", "x"]) == ["1", "3", None]
+
+    time.sleep(0.06)
+    assert await cache.get("a") is None
+
+
+async def test_incr_if_exists_and_delete_prefix():
+    """测试只调整已存在的计数，以及按前缀删除。"""
+    cache = MemoryCache()
+    assert await cache.incr_if_exists("unread:1", 1) is None
+    assert await cache.get("unread:1") is None
+
+    await cache.set("unread:1", "5", ttl=60)
+    await cache.set("unread:2", "1")
+    await cache.set("other", "x")
+    assert await cache.incr_if_exists("unread:1", -3) == 2
+
+    await cache.delete_prefix("unread:")
+    assert await cache.get_many(["unread:1", "unread:2", "other"]) == [None, None, "x"]
@@ -0,0 +1,94 @@
+"""外部服务熔断器测试。"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.core.admission import AdmissionRejectedError
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, is_provider_failure
+from app.infrastructure.metrics import circuit_transitions
+from app.services.behavior_service import fallback_description
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def _fail(breaker: CircuitBreaker, exc: Exception) -> None:
+    with pytest.raises(type(exc)):
+        with breaker.call():
+            raise exc
+
+
+def test_opens_after_consecutive_failures():
+    """测试连续失败达到阈值后熔断，熔断期间调用立即失败。"""
+    breaker = CircuitBreaker("test_open", failure_threshold=3, recovery_timeout=60)
+    _fail(breaker, ConnectionError())
+    _fail(breaker, _StatusError(503))
+    with breaker.call():
+        pass
+    for _ in range(3):
+        _fail(breaker, TimeoutError())
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as exc:
+        with breaker.call():
+            pytest.fail("熔断期间不应执行调用")
+    assert isinstance(exc.value, AdmissionRejectedError)
+    assert exc.value.reason == "circuit_open"
+    assert 0 < exc.value.retry_after <= 60
+    assert circuit_transitions.labels("test_open", "open").value == 1
+
+
+def test_half_open_probe():
+    """测试半开状态只放行一个探测调用，探测失败重新熔断、成功则恢复。"""
+    breaker = CircuitBreaker("test_probe", failure_threshold=1, recovery_timeout=0.01)
+    _fail(breaker, ConnectionError())
+    asyncio.run(asyncio.sleep(0.02))
+
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    asyncio.run(asyncio.sleep(0.02))
+    with breaker.call():
+        pass
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_client_errors_do_not_trip():
+    """测试 4xx、限流和准入拒绝不计为服务商故障。"""
+    assert is_provider_failure(ConnectionError())
+    assert is_provider_failure(_StatusError(502))
+    assert not is_provider_failure(_StatusError(400))
+    assert not is_provider_failure(_StatusError(429))
+    assert not is_provider_failure(AdmissionRejectedError("llm", "timeout", 1))
+    # 只有连接失败和超时类异常计为故障，调用方本地的错误不计入
+    request = httpx.Request("POST", "http://provider/v1/chat/completions")
+    assert is_provider_failure(httpx.ConnectError("refused", request=request))
+    assert is_provider_failure(httpx.ReadTimeout("timeout", request=request))
+    assert is_provider_failure(openai.APIConnectionError(request=request))
+    assert is_provider_failure(openai.APITimeoutError(request=request))
+    assert is_provider_failure(TimeoutError())
+    assert not is_provider_failure(ValueError("bad json"))
+    assert not is_provider_failure(KeyError("choices"))
+
+    breaker = CircuitBreaker("test_client", failure_threshold=1)
+    _fail(breaker, _StatusError(400))
+    assert breaker.state == "closed"
+
+
+def test_fallback_description():
+    """测试模板描述是确定性的。"""
+    assert fallback_description("drink_water", {}) == "drink_water"
+    assert (
+        fallback_description("set_temperature", {"temperature": 24, "mode": "cool"})
+        == "set_temperature（temperature: 24，mode: cool）"
+    )
@@ -0,0 +1,42 @@
+"""事件总线测试。"""
+
+import asyncio
+
+from app.infrastructure.event_bus import EventBus
+
+
+async def test_publish_to_user_subscribers():
+    """测试事件只投递给目标用户的订阅者。"""
+    bus = EventBus()
+    queue_a = bus.subscribe(1)
+    queue_b = bus.subscribe(2)
+
+    await bus.publish(1, "behavior.created", {"id": 10})
+
+    assert queue_a.get_nowait() == {"user_id": 1, "event": "behavior.created", "data": {"id": 10}}
+    assert queue_b.empty()
+
+
+async def test_broadcast_and_unsubscribe():
+    """测试广播事件和取消订阅。"""
+    bus = EventBus()
+    queue_a = bus.subscribe(1)
+    queue_b = bus.subscribe(2)
+    bus.unsubscribe(2, queue_b)
+
+    await bus.publish(None, "notification.created", {"id": 1})
+
+    assert queue_a.qsize() == 1
+    assert queue_b.empty()
+    assert bus.subscriber_count == 1
+
+
+async def test_slow_consumer_drops_events():
+    """测试慢消费者队列满时丢弃事件而不阻塞发布方。"""
+    bus = EventBus(queue_size=2)
+    queue = bus.subscribe(1)
+
+    for i in range(5):
+        await asyncio.wait_for(bus.publish(1, "behavior.created", {"id": i}), timeout=1)
+
+    assert queue.qsize() == 2
@@ -0,0 +1,42 @@
+"""条件 GET（ETag）测试。"""
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import conditional_response
+
+app = FastAPI()
+state = {"version": "v1", "queries": 0}
+
+
+@app.get("/items")
+async def list_items(request: Request, response: Response):
+    not_modified = conditional_response(request, response, state["version"])
+    if not_modified:
+        return not_modified
+    state["queries"] += 1
+    return [state["version"]]
+
+
+def test_etag_roundtrip():
+    """测试版本不变时返回 304，版本变化后重新返回数据。"""
+    client = TestClient(app)
+
+    first = client.get("/items?limit=5")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/items?limit=5", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert state["queries"] == 1
+
+    # 不同查询参数对应不同的 ETag
+    other = client.get("/items?limit=10", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    state["version"] = "v2"
+    changed = client.get("/items?limit=5", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
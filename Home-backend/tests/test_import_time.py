@@ -0,0 +1,35 @@
+"""启动导入测试：重量级 SDK 只在首次使用时加载。"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _loaded_modules(target: str, candidates: list[str]) -> list[str]:
+    """在新进程中导入 target，返回 candidates 中已被加载的模块。"""
+    code = (
+        f"import sys, {target}\n"
+        f"print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize("target", ["main", "app.infrastructure.celery_app"])
+def test_startup_does_not_load_heavy_sdks(target):
+    """测试 API 与 Celery 启动时不导入 LangChain、pymilvus 和 passlib。"""
+    assert _loaded_modules(target, ["langchain_openai", "openai", "pymilvus", "passlib"]) == []
+
+
+def test_celery_tasks_load_services_lazily():
+    """测试 beat 导入任务模块时不加载数据库和服务模块。"""
+    target = "app.infrastructure.celery_app, " + ", ".join(
+        f"app.tasks.{name}" for name in ("care_tasks", "hydration_tasks", "retention_tasks", "user_tasks", "semantic_tasks")
+    )
+    assert _loaded_modules(target, ["sqlalchemy", "app.services.notification_service"]) == []
@@ -0,0 +1,90 @@
+"""JSON 编解码测试。"""
+
+import importlib.util
+import sys
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from kombu.serialization import dumps as kombu_dumps
+from kombu.serialization import loads as kombu_loads
+from kombu.serialization import prepare_accept_content
+
+from app.core import json_codec, json_response
+from app.core.json_response import FastJSONResponse, default_response_class
+from app.schemas.behavior import BehaviorResponse
+
+SAMPLE = {"user_id": 101, "details": {"temperature": 24.5, "room": "客厅", "on": True, "tags": None}, 3: [1, 2]}
+
+
+def _load_fallback_codec(monkeypatch):
+    """在 orjson 不可用的情况下重新加载 json_codec。"""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    spec = importlib.util.spec_from_file_location("json_codec_fallback", json_codec.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_fallback_matches_fast_codec(monkeypatch):
+    """测试未安装 orjson 时退回标准库，输出与 orjson 相同。"""
+    fallback = _load_fallback_codec(monkeypatch)
+    assert fallback.BACKEND == "json"
+    assert fallback.dumps(SAMPLE) == json_codec.dumps(SAMPLE)
+    assert fallback.dumps_str(SAMPLE) == json_codec.dumps_str(SAMPLE)
+    assert fallback.loads(json_codec.dumps(SAMPLE)) == json_codec.loads(fallback.dumps_str(SAMPLE))
+    assert json_codec.loads(json_codec.dumps_str(SAMPLE))["details"]["room"] == "客厅"
+
+
+def test_default_response_class(monkeypatch):
+    """测试 FastAPI 不支持 Pydantic 直接序列化时才替换默认响应类。"""
+    monkeypatch.setattr(json_response, "fastapi_serializes_models", lambda: False)
+    assert default_response_class() is FastJSONResponse
+    monkeypatch.setattr(json_response, "fastapi_serializes_models", lambda: True)
+    assert default_response_class() is not FastJSONResponse
+
+
+def test_fast_json_response_encodes_routes(monkeypatch):
+    """测试 FastJSONResponse 使用 json_codec 编码 dict 与 response_model 响应。"""
+    calls = []
+
+    def spy(content):
+        calls.append(content)
+        return json_codec.dumps(content)
+
+    monkeypatch.setattr(json_response, "dumps", spy)
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    router = APIRouter()
+
+    @router.get("/stats")
+    async def stats():
+        return {"room": "客厅"}
+
+    @router.get("/behaviors", response_model=list[BehaviorResponse])
+    async def behaviors():
+        return [{
+            "id": 1, "user_id": 101, "device_id": "ac", "action_type": "on",
+            "details": {"t": 24}, "timestamp": "2026-01-01T08:00:00", "created_at": "2026-01-01T08:00:00",
+        }]
+
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+
+    response = client.get("/api/stats")
+    assert response.json() == {"room": "客厅"}
+    assert calls == [{"room": "客厅"}]
+
+    response = client.get("/api/behaviors")
+    assert response.json()[0]["details"] == {"t": 24}
+    assert response.json()[0]["timestamp"] == "2026-01-01T08:00:00"
+    assert len(calls) == 2
+
+
+def test_celery_serializer_roundtrip():
+    """测试 fastjson Celery 序列化器编解码任务消息。"""
+    json_codec.register_celery_serializer()
+    body = [[101], {"note": "深夜回家"}, {"callbacks": None}]
+    content_type, encoding, payload = kombu_dumps(body, serializer=json_codec.CELERY_SERIALIZER)
+    assert content_type == json_codec.CELERY_CONTENT_TYPE
+    accept = prepare_accept_content(["json", json_codec.CELERY_SERIALIZER])
+    assert kombu_loads(payload.encode(), content_type, encoding, accept=accept) == body
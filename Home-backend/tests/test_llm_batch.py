@@ -0,0 +1,76 @@
+"""LLM 批量生成测试。"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import llm
+from app.core.provider_router import ProviderRouter
+from app.infrastructure.config import get_settings
+from app.infrastructure.dependencies import get_llm_service
+from app.services.llm_service import LLMService
+
+
+class _FakeChatModel:
+    """回显提示词的模型，记录最大并发数；提示词为 fail 时抛出异常。"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+
+    async def ainvoke(self, messages):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            prompt = messages[-1].content
+            if prompt == "fail":
+                raise ValueError("bad prompt")
+            return SimpleNamespace(content=f"echo {prompt}")
+        finally:
+            self.running -= 1
+
+
+def _service(model: _FakeChatModel) -> LLMService:
+    service = LLMService.__new__(LLMService)
+    service.settings = get_settings()
+    service.router = ProviderRouter("llm", {"fake": model})
+    return service
+
+
+async def test_batch_runs_concurrently_in_order():
+    """测试批量生成按并发上限并行执行，结果保持请求顺序。"""
+    model = _FakeChatModel(delay=0.05)
+    requests = [(f"p{i}", None) for i in range(40)]
+
+    start = time.perf_counter()
+    results = await _service(model).generate_batch(requests, max_concurrency=8)
+    elapsed = time.perf_counter() - start
+
+    assert results == [f"echo p{i}" for i in range(40)]
+    assert model.peak == 8
+    # 串行需要 2 秒，8 并发约 0.25 秒
+    assert elapsed < 1.0
+
+
+def test_batch_endpoint_reports_item_errors():
+    """测试批量接口单个请求失败时其他结果照常返回。"""
+    app = FastAPI()
+    app.include_router(llm.router, prefix="/llm")
+    app.dependency_overrides[get_llm_service] = lambda: _service(_FakeChatModel(delay=0))
+
+    response = TestClient(app).post(
+        "/llm/batch",
+        json={"requests": [{"prompt": "a"}, {"prompt": "fail"}, {"prompt": "b", "system_prompt": "s"}]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [item["response"] for item in body["results"]] == ["echo a", None, "echo b"]
+    assert "bad prompt" in body["results"][1]["error"]
+    assert [item["index"] for item in body["results"]] == [0, 1, 2]
@@ -0,0 +1,102 @@
+"""LLM 流式生成测试。"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import llm
+from app.core.admission import get_limiter
+from app.core.provider_router import ProviderRouter
+from app.infrastructure.config import get_settings
+from app.infrastructure.dependencies import get_llm_service
+from app.infrastructure.metrics import admission_limit_decreases
+from app.schemas.llm import LLMStreamStats
+from app.services.llm_service import LLMService
+
+
+class _FakeChatModel:
+    """按固定间隔逐段返回文本的模型，记录流是否被关闭。"""
+
+    def __init__(self, parts: list[str], delay: float = 0.0):
+        self.parts = parts
+        self.delay = delay
+        self.closed = False
+
+    async def astream(self, messages, stream_usage=False):
+        try:
+            for part in self.parts:
+                await asyncio.sleep(self.delay)
+                yield SimpleNamespace(content=part, usage_metadata=None)
+            yield SimpleNamespace(content="", usage_metadata={"output_tokens": len(self.parts)})
+        finally:
+            self.closed = True
+
+
+def _service(model: _FakeChatModel) -> LLMService:
+    service = LLMService.__new__(LLMService)
+    service.settings = get_settings()
+    service.router = ProviderRouter("llm", {"fake": model})
+    return service
+
+
+async def test_stream_reports_stats():
+    """测试流式生成逐段返回文本并统计首个 token 延迟和生成速度。"""
+    service = _service(_FakeChatModel(["你", "好", "，", "世界"], delay=0.01))
+    stats = LLMStreamStats(model="test")
+
+    parts = [text async for text in service.stream("hi", stats=stats)]
+
+    assert parts == ["你", "好", "，", "世界"]
+    assert stats.tokens == 4
+    assert stats.ttft_ms >= 10
+    assert stats.duration_ms > stats.ttft_ms
+    assert stats.tokens_per_second > 0
+
+
+async def test_closing_stream_cancels_upstream():
+    """测试调用方提前关闭时关闭上游流并归还并发名额。"""
+    model = _FakeChatModel(["a", "b", "c"])
+    stream = _service(model).stream("hi")
+
+    assert await anext(stream) == "a"
+    await stream.aclose()
+
+    assert model.closed
+    assert get_limiter("llm").in_flight == 0
+
+
+async def test_long_stream_does_not_lower_limit(monkeypatch):
+    """测试总耗时超过目标的长回答不下调并发上限，准入控制只看首个 token 延迟。"""
+    limiter = get_limiter("llm")
+    monkeypatch.setattr(limiter, "latency_target", 0.05)
+    monkeypatch.setattr(limiter, "_last_decrease", -limiter.decrease_interval)
+    limit = limiter.limit
+    decreases = admission_limit_decreases.labels("llm", "latency").value
+
+    parts = [text async for text in _service(_FakeChatModel(list("abcdefgh"), delay=0.02)).stream("hi")]
+
+    assert parts == list("abcdefgh")
+    assert limiter.limit >= limit
+    assert admission_limit_decreases.labels("llm", "latency").value == decreases
+
+
+def test_stream_endpoint_sse():
+    """测试流式接口以 SSE 推送文本片段和生成统计。"""
+    app = FastAPI()
+    app.include_router(llm.router, prefix="/llm")
+    app.dependency_overrides[get_llm_service] = lambda: _service(_FakeChatModel(["晚上", "好"]))
+
+    response = TestClient(app).post("/llm/generate/stream", json={"prompt": "hi"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert events[:2] == [("token", {"text": "晚上"}), ("token", {"text": "好"})]
+    assert events[2][0] == "done"
+    assert events[2][1]["tokens"] == 2
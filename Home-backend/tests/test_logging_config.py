@@ -0,0 +1,96 @@
+"""日志队列、JSON 格式化与采样测试。"""
+
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app.core.logging_config import (
+    JsonFormatter,
+    LazyQueueHandler,
+    SamplingFilter,
+    setup_logging,
+    shutdown_logging,
+)
+from app.core.tracing import SpanContext, _current
+
+
+def _record(msg: str = "hello %s", args=("world",), level: int = logging.INFO, lineno: int = 10, **extra):
+    record = logging.LogRecord("app.test", level, "/app/test.py", lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_limits_each_call_site(monkeypatch):
+    """测试同一代码位置每个窗口最多放行 burst 条，下个窗口记录丢弃条数。"""
+    now = [100.0]
+    monkeypatch.setattr("app.core.logging_config.time.monotonic", lambda: now[0])
+    sampler = SamplingFilter(burst=3, window=1.0)
+
+    passed = [sampler.filter(_record()) for _ in range(10)]
+    assert passed.count(True) == 3
+    # 其他代码位置和 WARNING 不受影响
+    assert sampler.filter(_record(lineno=20))
+    assert all(sampler.filter(_record(level=logging.WARNING)) for _ in range(10))
+
+    now[0] += 1.5
+    record = _record()
+    assert sampler.filter(record)
+    assert record.sampled_dropped == 7
+
+
+def test_queue_handler_formats_in_listener():
+    """测试入队时不格式化消息，只附加链路上下文；监听线程输出 JSON。"""
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+
+    token = _current.set(SpanContext("a" * 32, "b" * 16))
+    try:
+        handler.handle(_record(user_id=7))
+    finally:
+        _current.reset(token)
+
+    record = log_queue.get_nowait()
+    assert record.msg == "hello %s" and record.args == ("world",)
+
+    lines = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            lines.append(self.format(record))
+
+    collector = Collect()
+    collector.setFormatter(JsonFormatter())
+    log_queue.put(record)
+    listener = QueueListener(log_queue, collector)
+    listener.start()
+    listener.stop()
+
+    data = json.loads(lines[0])
+    assert data["message"] == "hello world"
+    assert data["level"] == "INFO"
+    assert data["trace_id"] == "a" * 32
+    assert data["span_id"] == "b" * 16
+    assert data["user_id"] == 7
+
+
+def test_logs_after_shutdown_are_written(monkeypatch):
+    """测试停止监听线程后根 logger 改为直接输出，之后的日志不丢失。"""
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    stream = io.StringIO()
+    monkeypatch.setattr("app.core.logging_config.sys.stderr", stream)
+    try:
+        setup_logging()
+        logging.getLogger("app.test").warning("before shutdown")
+        shutdown_logging()
+        logging.getLogger("app.test").warning("after shutdown")
+
+        assert not any(isinstance(h, LazyQueueHandler) for h in root.handlers)
+        assert "before shutdown" in stream.getvalue()
+        assert "after shutdown" in stream.getvalue()
+    finally:
+        shutdown_logging()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
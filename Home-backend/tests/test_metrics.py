@@ -0,0 +1,143 @@
+"""指标端点与多进程快照合并测试。"""
+
+import json
+import os
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.infrastructure import database  # noqa: F401
+from app.infrastructure.metrics import (
+    MetricsRegistry,
+    SnapshotExporter,
+    circuit_state,
+    dependency_duration,
+    http_requests,
+    render_snapshots,
+    track_dependency,
+)
+
+
+def test_request_metrics_use_route_template():
+    """测试请求按路由模板统计，未匹配的路径归入同一标签。"""
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+    router = APIRouter()
+
+    @router.get("/{item_id}/detail")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.include_router(router, prefix="/api/items")
+
+    client = TestClient(app)
+    template = "/api/items/{item_id}/detail"
+    before = http_requests.labels("GET", template, "200").value
+    for i in range(3):
+        assert client.get(f"/api/items/{i}/detail").status_code == 200
+    assert client.get("/api/items/x/detail").status_code == 422
+    client.get("/nothing-here")
+
+    assert http_requests.labels("GET", template, "200").value == before + 3
+    assert http_requests.labels("GET", template, "422").value >= 1
+    assert http_requests.labels("GET", "<unmatched>", "404").value >= 1
+    assert ("GET", "/api/items/1/detail", "200") not in http_requests._children
+
+
+def test_preflight_requests_counted():
+    """测试请求指标位于最外层，CORS 预检请求也被统计。"""
+    from main import app
+
+    assert app.user_middleware[0].cls is RequestMetricsMiddleware
+    before = http_requests.labels("OPTIONS", "<unmatched>", "200").value
+    response = TestClient(app).options(
+        "/api/v1/users",
+        headers={"Origin": "http://localhost:3000", "Access-Control-Request-Method": "GET"},
+    )
+    assert response.status_code == 200
+    assert http_requests.labels("OPTIONS", "<unmatched>", "200").value == before + 1
+
+
+def test_track_dependency_outcome():
+    """测试外部依赖调用按成功/失败分别计时。"""
+    ok = dependency_duration.labels("test_dep", "success")
+    err = dependency_duration.labels("test_dep", "error")
+    ok_before, err_before = ok.count, err.count
+
+    with track_dependency("test_dep"):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_dependency("test_dep"):
+            raise RuntimeError("boom")
+
+    assert ok.count == ok_before + 1
+    assert err.count == err_before + 1
+
+
+def _worker_snapshot(requests: int, connections: int, age: float = 0) -> dict:
+    registry = MetricsRegistry()
+    registry.counter("req_total", "请求数", ["route"]).labels("/a").inc(requests)
+    registry.gauge("conn", "连接数").set(connections)
+    registry.histogram("lat", "延迟", buckets=(0.1, 1)).observe(0.5)
+    snap = registry.snapshot()
+    snap["time"] -= age
+    return snap
+
+
+def test_merge_snapshots_across_workers():
+    """测试多进程快照合并：计数和直方图累加，过期进程的仪表值不计入。"""
+    output = render_snapshots(
+        [_worker_snapshot(2, 3), _worker_snapshot(5, 4), _worker_snapshot(1, 100, age=60)],
+        gauge_max_age=15,
+    )
+    assert 'req_total{route="/a"} 8' in output
+    assert "conn 7" in output
+    assert 'lat_bucket{le="1"} 3' in output
+    assert "lat_count 3" in output
+
+
+def test_merge_state_gauges_across_workers():
+    """测试状态类仪表按合并方式合并：熔断器状态取最大值，不把各进程的状态相加。"""
+
+    def snapshot(pid: int, state: float, ratio: float) -> dict:
+        registry = MetricsRegistry()
+        registry.gauge("circuit_breaker_state", "熔断器状态", ["dependency"], merge="max").labels("llm").set(state)
+        registry.gauge("error_rate", "错误率", ["dependency"], merge="avg").labels("llm").set(ratio)
+        registry.gauge("weight", "权重", ["provider"], merge="pid").labels("a").set(ratio)
+        snap = registry.snapshot()
+        snap["pid"] = pid
+        return snap
+
+    output = render_snapshots([snapshot(1, 2, 0.25), snapshot(2, 2, 0.5), snapshot(3, 2, 0.75)])
+    lines = output.splitlines()
+    assert 'circuit_breaker_state{dependency="llm"} 2' in lines
+    assert 'error_rate{dependency="llm"} 0.5' in lines
+    assert 'weight{provider="a",pid="1"} 0.25' in lines
+    assert 'weight{provider="a",pid="3"} 0.75' in lines
+
+    output = render_snapshots([snapshot(1, 0, 0), snapshot(2, 2, 0), snapshot(3, 1, 0)])
+    assert 'circuit_breaker_state{dependency="llm"} 2' in output.splitlines()
+    assert circuit_state.merge == "max"
+
+
+async def test_exporter_reads_other_workers(tmp_path):
+    """测试导出器合并本进程与目录中其他进程的快照。"""
+    other = _worker_snapshot(4, 1)
+    other["pid"] = -1
+    (tmp_path / "metrics--1.json").write_text(json.dumps(other))
+    (tmp_path / "metrics-broken.json").write_text("{")
+
+    local = MetricsRegistry()
+    local.counter("req_total", "请求数", ["route"]).labels("/a").inc(1)
+    exporter = SnapshotExporter(str(tmp_path), interval=5, source=local)
+
+    output = await exporter.collect()
+    assert 'req_total{route="/a"} 5' in output
+
+    exporter.write()
+    written = json.loads((tmp_path / f"metrics-{os.getpid()}.json").read_text())
+    assert written["metrics"]["req_total"]["samples"] == [[["/a"], 1.0]]
+    assert time.time() - written["time"] < 5
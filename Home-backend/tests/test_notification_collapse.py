@@ -0,0 +1,31 @@
+"""通知折叠测试。"""
+
+from datetime import datetime
+
+from sqlalchemy.dialects import mysql
+
+from app.infrastructure import database  # noqa: F401
+from app.schemas.notification import NotificationDTO
+from app.services.notification_service import build_collapse_upsert
+
+
+def test_collapse_upsert_is_single_statement():
+    """测试折叠通知编译为单条 INSERT ... ON DUPLICATE KEY UPDATE。"""
+    stmt = build_collapse_upsert(1, "reminder", "饮水提醒", "喝水", "hydration_reminder", datetime(2024, 1, 1))
+    sql = str(stmt.compile(dialect=mysql.dialect()))
+
+    assert sql.startswith("INSERT INTO notifications")
+    assert "unread_collapse_key" not in sql.split("ON DUPLICATE KEY UPDATE")[0]
+    update_clause = sql.split("ON DUPLICATE KEY UPDATE")[1]
+    assert "id = last_insert_id(notifications.id)" in update_clause
+    assert "occurrence_count = (notifications.occurrence_count + " in update_clause
+    assert "created_at" not in update_clause
+
+
+def test_dto_defaults_occurrence_count():
+    """测试未折叠的通知次数默认为 1。"""
+    dto = NotificationDTO(
+        id=1, user_id=1, category="reminder", title="t", created_at=datetime(2024, 1, 1)
+    )
+    assert dto.occurrence_count == 1
+    assert dto.updated_at is None
@@ -0,0 +1,49 @@
+"""通知保留策略测试。"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.database import Base
+from app.models.notification import Notification, NotificationArchive
+from app.services.notification_retention_service import NotificationRetentionService
+
+
+async def test_purge_archives_expired_read_notifications():
+    """测试只归档并删除超期的已读通知，分批执行。"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Notification.__table__, NotificationArchive.__table__],
+        )
+
+    now = datetime.now()
+    old = now - timedelta(days=100)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        rows = [
+            Notification(user_id=1, category="system", title=f"old-read-{i}", is_read=True, created_at=old)
+            for i in range(5)
+        ]
+        rows.append(Notification(user_id=1, category="system", title="old-unread", is_read=False, created_at=old))
+        rows.append(Notification(user_id=1, category="system", title="new-read", is_read=True, created_at=now))
+        session.add_all(rows)
+        await session.commit()
+
+        stats = await NotificationRetentionService(session).purge_expired(
+            read_retention_days=90, batch_size=2
+        )
+        assert stats == {"archived": 5, "deleted": 5, "batches": 3}
+
+        remaining = (await session.execute(select(Notification.title))).scalars().all()
+        assert sorted(remaining) == ["new-read", "old-unread"]
+        archived = (await session.execute(select(NotificationArchive))).scalars().all()
+        assert {a.title for a in archived} == {f"old-read-{i}" for i in range(5)}
+
+        # 再次运行不会重复处理
+        stats = await NotificationRetentionService(session).purge_expired(read_retention_days=90)
+        assert stats["deleted"] == 0
+
+    await engine.dispose()
@@ -0,0 +1,55 @@
+"""游标分页工具测试。"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import DateTime, Integer, column, select, table
+from sqlalchemy.dialects import mysql
+
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
+
+
+def test_cursor_roundtrip():
+    """测试游标编码后可以原样解析。"""
+    created_at = datetime(2026, 2, 14, 20, 57, 3, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_decode_invalid_cursor():
+    """测试非法游标抛出 ValueError。"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_split_page_returns_next_cursor():
+    """测试多取一行时生成下一页游标。"""
+    rows = [
+        SimpleNamespace(id=i, created_at=datetime(2026, 1, 1, 0, 0, 10 - i))
+        for i in range(1, 5)
+    ]
+    page, next_cursor = split_page(rows, 3, "created_at")
+    assert [r.id for r in page] == [1, 2, 3]
+    assert decode_cursor(next_cursor) == (rows[2].created_at, 3)
+
+    page, next_cursor = split_page(rows[:3], 3, "created_at")
+    assert len(page) == 3
+    assert next_cursor is None
+
+
+def test_apply_keyset_builds_range_condition():
+    """测试游标条件展开为可走复合索引的范围条件。"""
+    notifications = table(
+        "notifications", column("id", Integer), column("created_at", DateTime)
+    )
+    cursor = encode_cursor(datetime(2026, 1, 1), 7)
+    query = apply_keyset(
+        select(notifications), notifications.c.created_at, notifications.c.id, cursor, 20
+    )
+    sql = str(query.compile(dialect=mysql.dialect()))
+    assert "notifications.created_at <" in sql
+    assert "notifications.id <" in sql
+    assert "ORDER BY notifications.created_at DESC, notifications.id DESC" in sql
+    assert "OFFSET" not in sql
@@ -0,0 +1,50 @@
+"""密码哈希进程池测试。"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.core import security
+from app.infrastructure.config import get_settings
+
+
+async def test_hash_and_verify_in_process_pool():
+    """测试进程池中的哈希结果可以被验证。"""
+    try:
+        hashed = await security.hash_password_async("secret123")
+        assert hashed != "secret123"
+        assert await security.verify_password_async("secret123", hashed)
+        assert not await security.verify_password_async("wrong", hashed)
+        assert security._pending == 0
+    finally:
+        security.shutdown_password_hasher()
+
+
+async def test_rejects_when_queue_is_full(monkeypatch):
+    """测试排队数达到上限时立即拒绝，不提交到进程池。"""
+    settings = get_settings()
+    monkeypatch.setattr(
+        security, "_pending", settings.password_hash_workers + settings.password_hash_queue_limit
+    )
+
+    with pytest.raises(security.PasswordHasherBusyError):
+        await security.hash_password_async("secret123")
+    assert security._executor is None
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+async def test_recovers_from_broken_pool():
+    """测试工作进程崩溃后进程池会被重建。"""
+    try:
+        loop = asyncio.get_running_loop()
+        with pytest.raises(Exception):
+            await loop.run_in_executor(security.get_password_executor(), _crash)
+
+        hashed = await security.hash_password_async("secret123")
+        assert security.verify_password("secret123", hashed)
+    finally:
+        security.shutdown_password_hasher()
@@ -0,0 +1,93 @@
+"""连接池指标测试。"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure import database  # noqa: F401
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.pool_metrics import (
+    InstrumentedAsyncQueuePool,
+    instrument_engine,
+    pool_stats,
+    unregister_engine,
+)
+
+
+def test_histogram_buckets_and_render():
+    """测试直方图分桶、分位数估算和 Prometheus 文本输出。"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "延迟", ["route"], buckets=(0.1, 1.0))
+    child = latency.labels("/a")
+    for value in (0.05, 0.5, 0.5, 5):
+        child.observe(value)
+
+    assert child.counts == [1, 2, 1]
+    assert child.quantile(0.5) == 1.0
+    assert child.quantile(0.99) == float("inf")
+
+    output = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in output
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in output
+    assert 'latency_seconds_count{route="/a"} 4' in output
+    assert registry.histogram("latency_seconds", "延迟") is latency
+    with pytest.raises(ValueError):
+        registry.counter("latency_seconds", "延迟")
+
+
+async def test_pool_checkout_metrics():
+    """测试借出、持有、溢出和等待超时的统计。"""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.2,
+        pool_pre_ping=True,
+    )
+    instrument_engine(engine, "test")
+    try:
+        async with engine.connect() as first:
+            await first.execute(text("SELECT 1"))
+            async with engine.connect() as second:
+                await second.execute(text("SELECT 1"))
+                state = pool_stats()["test"]["state"]
+                assert state["checked_out"] == 2
+                assert state["overflow"] == 1
+
+                # 池和溢出都已用满，第三个借出等待超时
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        stats = pool_stats()["test"]
+        assert stats["config"]["pool_size"] == 1
+        assert stats["state"]["checked_out"] == 0
+        assert stats["checkouts"] == 3
+        assert stats["checkout_timeouts"] == 1
+        assert stats["connections_created"] == 2
+        # 超时的借出也计入等待时间，且只记录一次
+        assert stats["checkout_wait_seconds"]["count"] == 4
+        assert stats["checkout_wait_seconds"]["p99"] >= 0.2
+        assert stats["hold_seconds"]["count"] == 3
+        # 复用池中连接时先 ping
+        assert stats["pre_ping_seconds"]["count"] >= 1
+
+        await engine.dispose()
+        await asyncio.sleep(0)
+        assert pool_stats()["test"]["connection_age_seconds"]["count"] >= 1
+    finally:
+        unregister_engine("test")
+        await engine.dispose()
+        os.remove(path)
+    assert "test" not in pool_stats()
@@ -0,0 +1,226 @@
+"""多服务商路由测试。"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+
+import pytest
+
+from app.core.provider_router import ProviderRouter
+from app.infrastructure.config import Settings
+from app.infrastructure.metrics import (
+    provider_failovers,
+    provider_hedges,
+    provider_hedges_throttled,
+    provider_requests,
+    render_snapshots,
+)
+from app.infrastructure.metrics import registry as metrics_registry
+from app.services.embedding_service import EmbeddingService
+from app.services.llm_service import LLMService
+from tests.fake_provider import create_app, serve
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class _Provider:
+    """按固定延迟返回名称的服务商；error 不为空时抛出该异常。"""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception | None = None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return self.name
+
+
+def _router(*providers: _Provider, **kwargs) -> ProviderRouter:
+    return ProviderRouter("test_router", {p.name: p for p in providers}, **kwargs)
+
+
+def test_weights_prefer_fast_and_healthy_providers():
+    """测试权重随延迟和错误率变化，故障服务商仍保留少量探测流量。"""
+    router = _router(_Provider("fast"), _Provider("slow"), _Provider("broken"))
+    for _ in range(20):
+        router.stats["fast"].record(0.1, True)
+        router.stats["slow"].record(0.5, True)
+        router.stats["broken"].record(None, False)
+
+    assert router.weight("fast") > 4 * router.weight("slow")
+    assert 0 < router.weight("broken") < router.weight("slow") / 10
+
+    primaries = Counter(router.order()[0] for _ in range(2000))
+    assert primaries["fast"] > 1500
+    assert primaries["broken"] < 50
+    assert router.order()[1:] in (["slow", "broken"], ["fast", "broken"])
+
+
+async def test_failover_on_provider_failure_only():
+    """测试服务端故障时改用下一个服务商，4xx 直接抛出。"""
+    down = _Provider("down", error=ConnectionError("refused"))
+    up = _Provider("up")
+    router = _router(down, up)
+    router.order = lambda: ["down", "up"]
+    before = provider_failovers.labels("test_router").value
+
+    assert await router.call(lambda provider: provider()) == "up"
+    assert provider_failovers.labels("test_router").value == before + 1
+    assert router.stats["down"].error_rate > 0
+
+    down.error = _StatusError(400)
+    with pytest.raises(_StatusError):
+        await router.call(lambda provider: provider())
+    assert up.calls == 1
+
+
+async def test_local_errors_do_not_fail_over():
+    """测试调用方本地错误（如解析响应失败）不触发故障转移，也不计入服务商错误率。"""
+    buggy = _Provider("buggy", error=KeyError("choices"))
+    up = _Provider("up")
+    router = _router(buggy, up)
+    router.order = lambda: ["buggy", "up"]
+
+    with pytest.raises(KeyError):
+        await router.call(lambda provider: provider())
+    assert up.calls == 0
+    assert router.stats["buggy"].error_rate == 0
+
+
+def test_routing_gauges_exported_per_process():
+    """测试路由估计值按进程输出，多进程快照合并时不相加。"""
+    router = _router(_Provider("a"), _Provider("b"))
+    router.stats["a"].record(None, False)
+    snapshots = []
+    for pid in (1, 2, 3):
+        snap = metrics_registry.snapshot()
+        snap["pid"] = pid
+        snapshots.append(snap)
+
+    lines = render_snapshots(snapshots).splitlines()
+    error_rate = router.stats["a"].error_rate
+    for pid in (1, 2, 3):
+        assert (
+            f'provider_routing{{dependency="test_router",provider="a",stat="error_rate",pid="{pid}"}} {error_rate}'
+            in lines
+        )
+
+
+async def test_hedge_after_primary_p95():
+    """测试主服务商超过其 p95 未返回时发送对冲请求，采用先返回的结果并取消另一个。"""
+    slow = _Provider("slow", delay=1.0)
+    fast = _Provider("fast", delay=0.01)
+    router = _router(slow, fast, hedge=True, hedge_min_delay=0.01, hedge_min_samples=5)
+    router.order = lambda: ["slow", "fast"]
+    for _ in range(5):
+        router.stats["slow"].record(0.05, True)
+    before = provider_hedges.labels("test_router", "hedge").value
+    cancelled = provider_requests.labels("test_router", "slow", "cancelled").value
+
+    start = time.perf_counter()
+    assert await router.call(lambda provider: provider()) == "fast"
+
+    assert time.perf_counter() - start < 0.5
+    assert slow.cancelled == 1
+    assert provider_hedges.labels("test_router", "hedge").value == before + 1
+    # 被取消的主请求按已等待的时间记录样本，p95 不因对冲而偏低
+    assert len(router.stats["slow"].samples) == 6
+    assert router.stats["slow"].samples[-1] >= 0.05
+    assert provider_requests.labels("test_router", "slow", "cancelled").value == cancelled + 1
+
+
+async def test_hedge_budget_limits_hedges():
+    """测试对冲预算用尽后不再对冲，只等待主服务商。"""
+    slow = _Provider("slow", delay=0.05)
+    fast = _Provider("fast")
+    router = _router(
+        slow, fast, hedge=True, hedge_min_delay=0.01, hedge_min_samples=1, hedge_budget=0, hedge_burst=1,
+    )
+    router.order = lambda: ["slow", "fast"]
+    router.stats["slow"].record(0.01, True)
+    throttled = provider_hedges_throttled.labels("test_router").value
+
+    assert await router.call(lambda provider: provider()) == "fast"
+    assert await router.call(lambda provider: provider()) == "slow"
+
+    assert fast.calls == 1
+    assert provider_hedges_throttled.labels("test_router").value == throttled + 1
+
+
+async def test_no_hedge_without_samples():
+    """测试主服务商样本不足时不对冲。"""
+    slow = _Provider("slow", delay=0.05)
+    fast = _Provider("fast")
+    router = _router(slow, fast, hedge=True, hedge_min_delay=0.0)
+    router.order = lambda: ["slow", "fast"]
+
+    assert await router.call(lambda provider: provider()) == "slow"
+    assert fast.calls == 0
+
+
+def _settings(kind: str, primary: str, extra: list[dict], **kwargs) -> Settings:
+    return Settings(
+        **{
+            f"{kind}_provider": "primary",
+            f"{kind}_api_base": primary,
+            f"{kind}_api_key": "test-key",
+            f"{kind}_extra_providers": json.dumps(extra),
+        },
+        **kwargs,
+    )
+
+
+async def test_llm_routes_around_slow_provider():
+    """测试 LLM 对接替身服务商：对冲绕过慢服务商，路由权重偏向快服务商。"""
+    slow_app = create_app("slow", latency=1.0)
+    fast_app = create_app("fast", latency=0.01)
+    with serve(slow_app) as slow_url, serve(fast_app) as fast_url:
+        service = LLMService(_settings(
+            "llm", slow_url, [{"name": "backup", "api_base": fast_url}],
+            llm_hedge=True, hedge_min_delay=0.05, hedge_min_samples=1, hedge_budget=1,
+        ))
+        router = service.router
+        # 固定主服务商为慢服务商，并预置一个样本使其开始对冲
+        router.order = lambda: ["primary", "backup"]
+        router.stats["primary"].record(0.05, True)
+        hedges = provider_hedges.labels("llm", "hedge").value
+        cancelled = provider_requests.labels("llm", "primary", "cancelled").value
+        backup_ok = provider_requests.labels("llm", "backup", "success").value
+
+        replies = [await service.generate(f"q{i}") for i in range(5)]
+
+    assert replies == [f"fast: q{i}" for i in range(5)]
+    assert provider_hedges.labels("llm", "hedge").value == hedges + 5
+    assert provider_requests.labels("llm", "primary", "cancelled").value == cancelled + 5
+    assert provider_requests.labels("llm", "backup", "success").value == backup_ok + 5
+    # 被取消的主请求耗时总大于对冲请求，路由权重偏向快服务商
+    assert router.weight("backup") > router.weight("primary")
+
+
+async def test_embedding_fails_over_to_healthy_provider():
+    """测试 Embedding 主服务商返回 503 时由其他服务商完成，并降低故障服务商权重。"""
+    broken_app = create_app("broken", error_rate=1.0)
+    healthy_app = create_app("healthy")
+    with serve(broken_app) as broken_url, serve(healthy_app) as healthy_url:
+        service = EmbeddingService(_settings(
+            "embedding", broken_url, [{"name": "healthy", "api_base": healthy_url}],
+            embedding_dimensions=8,
+        ))
+        vectors = [await service.get_embeddings(f"t{i}") for i in range(10)]
+
+    assert all(vector[0] == len("healthy") for vector in vectors)
+    assert service.router.weight("primary") < service.router.weight("healthy")
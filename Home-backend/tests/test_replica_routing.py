@@ -0,0 +1,65 @@
+"""只读副本路由测试。"""
+
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.infrastructure.database as database
+from app.infrastructure.cache import MemoryCache
+from app.infrastructure.database import ReplicaRouter
+from app.infrastructure.dependencies import resolve_read_session_maker
+from app.services import change_tracker
+
+
+async def test_round_robin_and_health_check():
+    """测试轮询分配，健康检查失败的副本被移出，恢复后加回。"""
+    good = create_async_engine("sqlite+aiosqlite://")
+    bad = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+    router = ReplicaRouter([good, bad])
+
+    picks = {router.pick() for _ in range(4)}
+    assert picks == set(router.session_makers)
+
+    await router.check()
+    assert router.healthy == [True, False]
+    assert {router.pick() for _ in range(4)} == {router.session_makers[0]}
+
+    router.mark_unhealthy(router.session_makers[0])
+    assert router.pick() is None
+
+    await router.check()
+    assert router.healthy == [True, False]
+    await router.close()
+
+
+async def test_recent_writer_reads_from_primary(monkeypatch):
+    """测试用户写入后的读己之写窗口内走主库。"""
+    primary = async_sessionmaker(create_async_engine("sqlite+aiosqlite://"))
+    router = ReplicaRouter([create_async_engine("sqlite+aiosqlite://")])
+    monkeypatch.setattr(database, "async_session_maker", primary)
+    monkeypatch.setattr(database, "replica_router", router)
+
+    with patch.object(change_tracker, "get_cache", return_value=MemoryCache()):
+        assert await resolve_read_session_maker(1) is router.session_makers[0]
+        await change_tracker.bump_user_version(1)
+        assert await resolve_read_session_maker(1) is primary
+        assert await resolve_read_session_maker(2) is router.session_makers[0]
+
+    await router.close()
+
+
+async def test_warns_when_replicas_without_shared_cache(monkeypatch, caplog):
+    """测试配置了副本但缓存后端不是 redis 时启动记录警告。"""
+    monkeypatch.setattr(
+        database,
+        "settings",
+        database.settings.model_copy(update={"mysql_replica_urls": "sqlite+aiosqlite://", "cache_backend": "memory"}),
+    )
+    monkeypatch.setattr(database, "_create_engine", lambda url, name: create_async_engine("sqlite+aiosqlite://"))
+    for name in ("engine", "async_session_maker", "replica_router"):
+        monkeypatch.setattr(database, name, None)
+
+    database.init_mysql()
+
+    assert "CACHE_BACKEND=memory" in caplog.text
+    await database.replica_router.close()
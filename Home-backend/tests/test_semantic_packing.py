@@ -0,0 +1,85 @@
+"""语义描述合并生成测试。"""
+
+import asyncio
+import re
+
+from app.core.admission import AdmissionRejectedError
+from app.core.json_codec import dumps_str
+from app.services.behavior_service import (
+    describe_behaviors,
+    packed_prompt,
+    parse_packed_descriptions,
+)
+from app.services.semantic_batcher import DescriptionBatcher
+
+
+class _FakeLLM:
+    """合并提示词按编号返回描述（skip 中的编号不返回），单条提示词直接返回描述。"""
+
+    def __init__(self, skip: tuple[int, ...] = (), error: Exception | None = None):
+        self.skip = skip
+        self.error = error
+        self.prompts: list[str] = []
+
+    async def generate(self, prompt: str, system_prompt: str | None = None) -> str:
+        self.prompts.append(prompt)
+        if self.error:
+            raise self.error
+        actions = re.findall(r"^(\d+)\. 原始操作: (\S+)；", prompt, re.MULTILINE)
+        if actions:
+            entries = [{"id": int(i), "description": f"用户{a}"} for i, a in actions if int(i) not in self.skip]
+            return f"```json\n{dumps_str(entries)}\n```"
+        action = re.search(r"- 原始操作: (\S+)", prompt).group(1)
+        return f'"用户{action}"'
+
+
+def test_parse_packed_descriptions():
+    """测试解析合并输出：无效、越界和重复的条目为 None。"""
+    text = '结果如下：[{"id": 2, "description": "B"}, {"id": 1, "description": " A "}, {"id": 2, "description": "X"}, {"id": 9, "description": "Z"}]'
+    assert parse_packed_descriptions(text, 3) == ["A", "B", None]
+    assert parse_packed_descriptions('["甲", "乙"]', 2) == ["甲", "乙"]
+    assert parse_packed_descriptions("抱歉，我无法完成", 2) == [None, None]
+    assert parse_packed_descriptions("[1, 2", 2) == [None, None]
+
+
+def test_packed_prompt_numbers_items():
+    """测试合并提示词按顺序编号列出所有行为。"""
+    prompt = packed_prompt([("开灯", {"room": "卧室"}), ("关门", {})])
+    assert "2 条用户动作" in prompt
+    assert "1. 原始操作: 开灯；详细参数: {'room': '卧室'}" in prompt
+    assert "2. 原始操作: 关门；详细参数: {}" in prompt
+
+
+async def test_describe_behaviors_packs_and_falls_back():
+    """测试一次调用生成整批描述，缺失的条目逐条补生成。"""
+    llm = _FakeLLM(skip=(2,))
+    items = [("开灯", {}), ("关门", {}), ("喝水", {"ml": 200})]
+
+    results = await describe_behaviors(llm, items)
+
+    assert results == ["用户开灯", "用户关门", "用户喝水"]
+    assert len(llm.prompts) == 2
+    assert "3 条用户动作" in llm.prompts[0]
+    assert "- 原始操作: 关门" in llm.prompts[1]
+
+
+async def test_describe_behaviors_busy():
+    """测试合并调用未获准入时整批返回该异常，不再逐条重试。"""
+    busy = AdmissionRejectedError("llm", "queue_full", 10)
+    llm = _FakeLLM(error=busy)
+
+    assert await describe_behaviors(llm, [("开灯", {}), ("关门", {})]) == [busy, busy]
+    assert len(llm.prompts) == 1
+
+
+async def test_batcher_groups_concurrent_requests():
+    """测试凑批器把并发请求按批次上限合并，不满的批次等待超时后发送。"""
+    llm = _FakeLLM()
+    batcher = DescriptionBatcher(llm, max_size=3, max_wait=0.02)
+
+    results = await asyncio.gather(*(batcher.describe(f"动作{i}", {}) for i in range(5)))
+
+    assert results == [f"用户动作{i}" for i in range(5)]
+    assert len(llm.prompts) == 2
+    assert "3 条用户动作" in llm.prompts[0]
+    assert "2 条用户动作" in llm.prompts[1]
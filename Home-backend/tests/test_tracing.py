@@ -0,0 +1,122 @@
+"""链路追踪测试。"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.core.tracing import (
+    Tracer,
+    TracingMiddleware,
+    current_traceparent,
+    parse_traceparent,
+    start_span,
+)
+from app.infrastructure import database  # noqa: F401
+
+
+@pytest.fixture
+def spans(tmp_path, monkeypatch):
+    """启用文件导出，返回读取已导出跨度的函数。"""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer("file", str(path), service_name="test")
+    monkeypatch.setattr(tracing, "get_tracer", lambda: tracer)
+
+    def read() -> dict[str, dict]:
+        if not path.exists():
+            return {}
+        return {s["name"]: s for s in map(json.loads, path.read_text().splitlines())}
+
+    return read
+
+
+def test_traceparent_roundtrip():
+    """测试 traceparent 解析与格式化，非法值返回 None。"""
+    value = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    context = parse_traceparent(value)
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.sampled
+    assert context.to_traceparent() == value
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+
+
+def test_disabled_tracer_is_noop():
+    """测试未启用追踪时不生成上下文。"""
+    with start_span("noop") as span:
+        assert current_traceparent() is None
+        span.set_attribute("ignored", 1)
+
+
+def test_nested_spans_and_errors(spans):
+    """测试嵌套跨度的父子关系与异常记录。"""
+    with pytest.raises(RuntimeError):
+        with start_span("outer", {"behavior.id": 1}):
+            with start_span("inner"):
+                pass
+            raise RuntimeError("boom")
+
+    exported = spans()
+    assert exported["inner"]["parent_id"] == exported["outer"]["context"]["span_id"]
+    assert exported["inner"]["context"]["trace_id"] == exported["outer"]["context"]["trace_id"]
+    assert exported["outer"]["status"]["status_code"] == "ERROR"
+    assert exported["outer"]["attributes"] == {"behavior.id": 1}
+    assert exported["inner"]["status"]["status_code"] == "OK"
+    assert current_traceparent() is None
+
+
+def test_request_context_reaches_background_task(spans):
+    """测试请求链路通过 traceparent 传入后台任务，并沿用调用方的链路。"""
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    async def background(traceparent: str | None):
+        with start_span("background", parent=traceparent):
+            with start_span("background.stage"):
+                pass
+
+    @app.post("/items/{item_id}")
+    async def create_item(item_id: int, background_tasks: BackgroundTasks):
+        background_tasks.add_task(background, current_traceparent())
+        return {"id": item_id}
+
+    incoming = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    response = TestClient(app).post("/items/1", headers={"traceparent": incoming})
+    assert response.status_code == 200
+
+    exported = spans()
+    server = exported["POST /items/{item_id}"]
+    assert server["kind"] == "SpanKind.SERVER"
+    assert server["parent_id"] == "0x00f067aa0ba902b7"
+    assert server["attributes"]["http.status_code"] == 200
+    assert response.headers["traceparent"].split("-")[2] == server["context"]["span_id"][2:]
+    assert exported["background"]["parent_id"] == server["context"]["span_id"]
+    assert exported["background.stage"]["parent_id"] == exported["background"]["context"]["span_id"]
+    assert exported["background"]["context"]["trace_id"] == "0x4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_celery_headers_carry_context(spans):
+    """测试发布任务时写入 traceparent，worker 以其为父上下文创建跨度。"""
+    from app.infrastructure import celery_tracing
+
+    headers = {}
+    with start_span("publisher") as publisher:
+        celery_tracing._inject_trace_context(headers=headers)
+    assert parse_traceparent(headers["traceparent"]).span_id == publisher.context.span_id
+
+    task = SimpleNamespace(name="app.tasks.demo.run", request=SimpleNamespace(traceparent=headers["traceparent"]))
+    celery_tracing._start_task_span(task_id="t1", task=task)
+    with start_span("task.stage"):
+        pass
+    celery_tracing._record_task_failure(task_id="t1", exception=ValueError("bad"))
+    celery_tracing._finish_task_span(task_id="t1", state="FAILURE")
+
+    exported = spans()
+    consumer = exported["celery.task run"]
+    assert consumer["parent_id"] == exported["publisher"]["context"]["span_id"]
+    assert consumer["status"]["status_code"] == "ERROR"
+    assert exported["task.stage"]["parent_id"] == consumer["context"]["span_id"]
+    assert current_traceparent() is None
@@ -0,0 +1,71 @@
+"""用户资料缓存测试。"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.infrastructure import database  # noqa: F401
+from app.services.user_cache import UserCache, deserialize_user, serialize_user
+
+
+def _user(full_name: str = "陈先生"):
+    return SimpleNamespace(
+        id=101, username="mr_chen", email="chen@example.com", full_name=full_name,
+        is_active=True, is_superuser=False, created_at=datetime(2024, 1, 1, 8, 0),
+        updated_at=None, last_hydration_remind_at=datetime(2024, 1, 2, 9, 30),
+    )
+
+
+def test_serialize_roundtrip():
+    """测试紧凑序列化往返。"""
+    profile = deserialize_user(serialize_user(_user()))
+    assert profile.full_name == "陈先生"
+    assert profile.last_hydration_remind_at == datetime(2024, 1, 2, 9, 30)
+    assert profile.updated_at is None
+
+
+async def test_concurrent_misses_load_once():
+    """测试并发未命中只回源一次，之后命中本地缓存。"""
+    cache = UserCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _user()
+
+    results = await asyncio.gather(*[cache.get(101, loader) for _ in range(10)])
+    assert calls == 1
+    assert all(r.username == "mr_chen" for r in results)
+
+    await cache.get(101, loader)
+    stats = cache.stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 9
+    assert stats["local_hits"] == 1
+
+
+async def test_invalidate_and_missing_user():
+    """测试失效后重新回源，不存在的用户也会被短暂缓存。"""
+    cache = UserCache()
+    name = "旧名字"
+
+    async def loader():
+        return _user(name)
+
+    assert (await cache.get(101, loader)).full_name == "旧名字"
+    name = "新名字"
+    await cache.invalidate(101)
+    assert (await cache.get(101, loader)).full_name == "新名字"
+
+    calls = 0
+
+    async def missing():
+        nonlocal calls
+        calls += 1
+        return None
+
+    assert await cache.get(999, missing) is None
+    assert await cache.get(999, missing) is None
+    assert calls == 1
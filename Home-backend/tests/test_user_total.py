@@ -0,0 +1,34 @@
+"""用户总数缓存测试。"""
+
+from unittest.mock import AsyncMock, patch
+
+from app.infrastructure import database  # noqa: F401
+from app.infrastructure.cache import MemoryCache
+from app.services import user_total
+
+
+async def test_total_counts_once_then_adjusts():
+    """测试总数只在缓存缺失时 COUNT，之后按增量调整。"""
+    cache = MemoryCache()
+    count = AsyncMock(return_value=10)
+    with patch.object(user_total, "get_cache", return_value=cache), \
+            patch.object(user_total, "count_users", count):
+        assert await user_total.get_user_total(None) == 10
+        await user_total.adjust_user_total(1)
+        await user_total.adjust_user_total(1)
+        await user_total.adjust_user_total(-1)
+        assert await user_total.get_user_total(None) == 11
+        assert count.await_count == 1
+
+        # 校准以数据库为准
+        count.return_value = 12
+        assert await user_total.reconcile_user_total(None) == 12
+        assert await user_total.get_user_total(None) == 12
+
+
+async def test_adjust_without_cached_total_is_noop():
+    """测试缓存中没有总数时增量调整不创建计数。"""
+    cache = MemoryCache()
+    with patch.object(user_total, "get_cache", return_value=cache):
+        await user_total.adjust_user_total(1)
+        assert await cache.get(user_total.USER_TOTAL_KEY) is None
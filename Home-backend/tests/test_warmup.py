@@ -0,0 +1,81 @@
+"""启动预热与就绪检查测试。"""
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure import database  # noqa: F401
+from app.infrastructure.warmup import Warmup, open_pool_connections
+
+
+async def test_ready_after_required_checks():
+    """测试预热完成前为 starting，必需依赖成功、可选依赖失败时仍为就绪。"""
+    release = asyncio.Event()
+
+    async def mysql():
+        await release.wait()
+
+    async def milvus():
+        raise ConnectionError("milvus down")
+
+    warmup = Warmup({"mysql": (mysql, True), "milvus": (milvus, False)})
+    warmup.start()
+    await asyncio.sleep(0)
+    assert not warmup.ready
+    assert warmup.status()["status"] == "starting"
+    assert warmup.status()["checks"]["mysql"]["status"] == "pending"
+
+    release.set()
+    await warmup._task
+    status = warmup.status()
+    assert warmup.ready
+    assert status["status"] == "ready"
+    assert status["checks"]["mysql"]["status"] == "ok"
+    assert status["checks"]["milvus"]["status"] == "failed"
+    assert "milvus down" in status["checks"]["milvus"]["error"]
+
+
+async def test_required_failure_or_timeout_not_ready():
+    """测试必需依赖超时后不就绪。"""
+    async def slow():
+        await asyncio.sleep(10)
+
+    warmup = Warmup({"mysql": (slow, True)}, timeout=0.01)
+    await warmup.run()
+    assert not warmup.ready
+    assert warmup.status()["status"] == "unavailable"
+    assert warmup.status()["checks"]["mysql"]["error"] == "TimeoutError"
+
+
+async def test_required_failure_retried_until_ready():
+    """测试必需依赖失败后在后台重试，成功后恢复就绪；可选依赖失败不重试。"""
+    calls = {"mysql": 0, "milvus": 0}
+
+    async def mysql():
+        calls["mysql"] += 1
+        if calls["mysql"] < 3:
+            raise ConnectionError("mysql down")
+
+    async def milvus():
+        calls["milvus"] += 1
+        raise ConnectionError("milvus down")
+
+    warmup = Warmup({"mysql": (mysql, True), "milvus": (milvus, False)}, retry_interval=0.01)
+    warmup.start()
+    await asyncio.wait_for(warmup._task, timeout=1)
+
+    assert warmup.ready
+    assert calls == {"mysql": 3, "milvus": 1}
+    assert "error" not in warmup.status()["checks"]["mysql"]
+    await warmup.stop()
+
+
+async def test_open_pool_connections_fills_pool(tmp_path):
+    """测试预热建立指定数量的不同连接并留在连接池中。"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", pool_size=5)
+    try:
+        await open_pool_connections(engine, 3)
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
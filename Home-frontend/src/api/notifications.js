@@ -50,6 +50,21 @@ export async function markAsRead(notificationId, userId) {
     return handleResponse(response);
 }
 
+/**
+ * 批量标记消息为已读
+ * @param {number[]} notificationIds - 消息ID列表
+ * @param {number} userId - 用户ID
+ */
+export async function markManyAsRead(notificationIds, userId) {
+    const params = new URLSearchParams({ user_id: userId });
+    const response = await fetch(`${API_BASE_URL}/notifications/read?${params.toString()}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids: notificationIds })
+    });
+    return handleResponse(response);
+}
+
 /**
  * 标记所有消息为已读
  * @param {number} userId - 用户ID
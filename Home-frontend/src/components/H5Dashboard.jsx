@@ -19,38 +19,21 @@ const H5Dashboard = () => {
     const updateAction = useDashboardStore((state) => state.updateAction);
     const toggleAction = useDashboardStore((state) => state.toggleAction);
 
-    const [logs, setLogs] = useState([]);
+    // 最近动态（后端原始记录，最多保留 5 条）
+    const [behaviors, setBehaviors] = useState([]);
     const [userInfo, setUserInfo] = useState({ full_name: '加载中...', id: 101 });
 
-    // 获取用户信息
-    const fetchUserInfo = async () => {
+    // 首屏数据：用户信息 + 最近动态，一次请求返回
+    const fetchDashboard = async () => {
         try {
-            const response = await fetch(`${API_BASE_URL}/users/101`);
+            const response = await fetch(`${API_BASE_URL}/dashboard?user_id=101&behavior_limit=5`);
             if (response.ok) {
                 const data = await response.json();
-                setUserInfo(data);
+                setUserInfo(data.user);
+                setBehaviors(data.recent_behaviors);
             }
         } catch (error) {
-            console.error('Failed to fetch user info:', error);
-        }
-    };
-
-    // 获取最近动态
-    const fetchLogs = async () => {
-        try {
-            const response = await fetch(`${API_BASE_URL}/behavior/?user_id=101&limit=5`);
-            if (response.ok) {
-                const data = await response.json();
-                const formattedLogs = data.map(item => ({
-                    time: new Date(item.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
-                    icon: getIconByActionType(item.action_type),
-                    text: item.semantic_content || item.raw_content || item.action_type,
-                    iconColor: getIconColorByActionType(item.action_type)
-                }));
-                setLogs(formattedLogs);
-            }
-        } catch (error) {
-            console.error('Failed to fetch logs:', error);
+            console.error('Failed to fetch dashboard:', error);
         }
     };
 
@@ -78,12 +61,48 @@ const H5Dashboard = () => {
         return mapping[type] || 'text-slate-400';
     };
 
+    const formatLog = (item) => ({
+        time: new Date(item.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+        icon: getIconByActionType(item.action_type),
+        text: item.semantic_content || item.raw_content || item.action_type,
+        iconColor: getIconColorByActionType(item.action_type)
+    });
+
+    const logs = behaviors.map(formatLog);
+
     useEffect(() => {
-        fetchUserInfo();
-        fetchLogs();
-        // 轮询更新动态
-        const interval = setInterval(fetchLogs, 5000);
-        return () => clearInterval(interval);
+        fetchDashboard();
+
+        // 不支持 SSE 的环境退回轮询
+        if (!window.EventSource) {
+            const interval = setInterval(fetchDashboard, 5000);
+            return () => clearInterval(interval);
+        }
+
+        // 通过 SSE 接收新动态和语义描述更新，空闲时不产生请求
+        const source = new EventSource(`${API_BASE_URL}/stream?user_id=101`);
+        let reconnecting = false;
+
+        source.addEventListener('behavior.created', (event) => {
+            const item = JSON.parse(event.data);
+            setBehaviors(prev => [item, ...prev.filter(b => b.id !== item.id)].slice(0, 5));
+        });
+        source.addEventListener('behavior.updated', (event) => {
+            const { id, semantic_content } = JSON.parse(event.data);
+            setBehaviors(prev => prev.map(b => b.id === id ? { ...b, semantic_content } : b));
+        });
+        source.onerror = () => {
+            reconnecting = true;
+        };
+        source.onopen = () => {
+            // 断线重连后补拉一次，避免遗漏断线期间的事件
+            if (reconnecting) {
+                reconnecting = false;
+                fetchDashboard();
+            }
+        };
+
+        return () => source.close();
     }, []);
 
     const handleActionClick = async (action) => {
@@ -115,8 +134,8 @@ const H5Dashboard = () => {
                     }),
                 });
 
-                if (response.ok) {
-                    setTimeout(fetchLogs, 1000);
+                if (!response.ok) {
+                    console.error('Failed to record behavior:', response.statusText);
                 }
             } catch (error) {
                 console.error('Failed to record behavior:', error);
@@ -155,8 +174,8 @@ const H5Dashboard = () => {
                     }),
                 });
 
-                if (response.ok) {
-                    setTimeout(fetchLogs, 1000);
+                if (!response.ok) {
+                    console.error('Failed to record behavior:', response.statusText);
                 }
             } catch (error) {
                 console.error('Failed to record behavior:', error);
@@ -51,18 +51,8 @@ const MessagesPage = () => {
         setLoading(true);
         try {
             const data = await fetchNotifications(userId);
-            // 这里后端返回的数据字段需要处理一下以匹配 UI
-            // 后端: category, title, content, created_at
-            // 前端: type, title, content, time
-
-            const formatted = data.map(item => ({
-                id: item.id,
-                type: item.category, // system, reminder, alert
-                title: item.title,
-                content: item.content,
-                time: formatTime(item.created_at),
-                is_read: item.is_read
-            }));
+            // 这里后端返回的数据字段需要处理一下以匹配 UI（见 toMessage）
+            const formatted = data.map(toMessage);
             setMessages(formatted);
         } catch (error) {
             console.error("Failed to load notifications:", error);
@@ -75,14 +65,48 @@ const MessagesPage = () => {
         // 初始加载
         loadMessages();
 
-        // 每10秒轮询一次
-        const interval = setInterval(() => {
-            loadMessages();
-        }, 10000);
+        // 不支持 SSE 的环境退回每10秒轮询一次
+        if (!window.EventSource) {
+            const interval = setInterval(() => {
+                loadMessages();
+            }, 10000);
+            return () => {
+                clearInterval(interval);
+            };
+        }
+
+        // 新通知和已读状态通过 SSE 推送
+        const source = new EventSource(`/api/v1/stream?user_id=${userId}`);
+        let reconnecting = false;
+
+        // 新通知与折叠到已有通知的重复提醒都移到列表顶部
+        const upsertMessage = (event) => {
+            const item = toMessage(JSON.parse(event.data));
+            setMessages(prev => [item, ...prev.filter(msg => msg.id !== item.id)]);
+        };
+        source.addEventListener('notification.created', upsertMessage);
+        source.addEventListener('notification.updated', upsertMessage);
+        // 批量创建和系统广播只携带摘要，重新拉取列表
+        source.addEventListener('notification.bulk_created', () => loadMessages());
+        source.addEventListener('notification.broadcast', () => loadMessages());
+        source.addEventListener('notification.read', (event) => {
+            const { ids, all } = JSON.parse(event.data);
+            setMessages(prev => prev.map(msg => (all || ids.includes(msg.id)) ? { ...msg, is_read: true } : msg));
+        });
+        source.onerror = () => {
+            reconnecting = true;
+        };
+        source.onopen = () => {
+            // 断线重连后补拉一次，避免遗漏断线期间的通知
+            if (reconnecting) {
+                reconnecting = false;
+                loadMessages();
+            }
+        };
 
         // 清理函数
         return () => {
-            clearInterval(interval);
+            source.close();
         };
     }, []); // 空依赖数组 = 仅在挂载时运行一次
 
@@ -121,6 +145,19 @@ const MessagesPage = () => {
         }
     };
 
+    // 后端: category, title, content, created_at, updated_at, occurrence_count
+    // 前端: type, title, content, time, count
+    const toMessage = (item) => ({
+        id: item.id,
+        type: item.category, // system, reminder, alert
+        title: item.title,
+        content: item.content,
+        // 折叠的重复提醒显示最近一次发生的时间
+        time: formatTime(item.updated_at || item.created_at),
+        count: item.occurrence_count || 1,
+        is_read: item.is_read
+    });
+
     // Filter Logic matching original
     const filteredMessages = activeFilter === 'all'
         ? messages
@@ -204,6 +241,9 @@ const MessagesPage = () => {
                                             <div className="flex justify-between items-start mb-1">
                                                 <h3 className={`font-bold text-slate-800 text-sm ${!message.is_read ? 'text-blue-600' : ''}`}>
                                                     {message.title}
+                                                    {message.count > 1 && (
+                                                        <span className="ml-1.5 text-[10px] font-medium text-slate-400">×{message.count}</span>
+                                                    )}
                                                 </h3>
                                                 <span className="text-[10px] text-slate-300 font-medium shrink-0 ml-2">{message.time}</span>
                                             </div>